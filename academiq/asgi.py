@@ -0,0 +1,14 @@
+"""
+ASGI config for academiq project.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academiq.settings')
+
+from django.core.asgi import get_asgi_application
+application = get_asgi_application()
+
+# Pay the first-request costs now, before the server forks or takes traffic.
+from core.warmup import warm_up
+warm_up()
@@ -36,7 +36,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.HTMLCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SessionRefreshMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,7 +53,8 @@ ROOT_URLCONF = 'academiq.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, with render times reported to core.timing.
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -63,6 +68,7 @@ TEMPLATES = [
             ],
             'libraries': {
                 'i18n_extras': 'core.templatetags.i18n_extras',
+                'assets': 'core.templatetags.assets',
             }
         },
     },
@@ -75,9 +81,75 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep each worker's connection (and its pragmas and page cache) open.
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Applied to every new SQLite connection (see core.sqlite).
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('DJANGO_SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.environ.get('DJANGO_SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT', 10000)),  # ms
+    'cache_size': -16000,  # KiB per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+# How atomic blocks begin: IMMEDIATE takes the write lock up front, so
+# concurrent writers wait out busy_timeout instead of failing.
+SQLITE_TRANSACTION_MODE = os.environ.get('DJANGO_SQLITE_TRANSACTION_MODE', 'IMMEDIATE')
+
+# Compile templates, load translations and resolve URLs when a worker boots
+# (see core.warmup); /ready/ answers 503 until that is done.
+WARMUP_ENABLED = os.environ.get('DJANGO_WARMUP', 'True') == 'True'
+
+# Per-request SQL/template/mail timings (see core.middleware.ServerTimingMiddleware).
+# DJANGO_SERVER_TIMING_HEADER: send the Server-Timing header to 'staff', 'all' or 'none'.
+SERVER_TIMING_ENABLED = os.environ.get('DJANGO_SERVER_TIMING', 'True') == 'True'
+SERVER_TIMING_HEADER = os.environ.get('DJANGO_SERVER_TIMING_HEADER', 'staff')
+# Log one line of timings per request to the console.
+SERVER_TIMING_LOG = os.environ.get('DJANGO_SERVER_TIMING_LOG', 'False') == 'True'
+# Minify rendered HTML and gzip/Brotli it per Accept-Encoding (see core.compression).
+HTML_MINIFY = os.environ.get('DJANGO_HTML_MINIFY', 'True') == 'True'
+HTML_COMPRESSION_MIN_SIZE = 512  # bytes; smaller pages are sent as they are
+HTML_COMPRESSION_CACHE_BYTES = 16 * 1024 * 1024  # memoized bodies per worker
+HTML_BROTLI_QUALITY = 5  # fast enough per request, close to gzip -9 in size
+
+# Prometheus metrics at /metrics (see core.metrics). Each worker writes its
+# counts to METRICS_DIR, which every worker of the site must share.
+METRICS_ENABLED = os.environ.get('DJANGO_METRICS', 'True') == 'True'
+METRICS_DIR = os.environ.get('DJANGO_METRICS_DIR', str(BASE_DIR / 'metrics'))
+METRICS_FLUSH_INTERVAL = 1.0  # seconds between writes of a worker's counts
+# Bearer token scrapers must send; empty leaves /metrics open.
+METRICS_TOKEN = os.environ.get('DJANGO_METRICS_TOKEN', '')
+# Profiles of single requests, asked for with the X-Profile header (see core.profiling).
+PROFILE_TOKEN_MAX_AGE = 3600  # seconds a header token stays valid
+PROFILE_KEEP = 100  # newest profiles kept
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO' if SERVER_TIMING_LOG else 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Optional single writer for form submissions (see core.writequeue); run
+# `manage.py run_write_queue` next to the web workers before enabling it.
+WRITE_QUEUE_ENABLED = os.environ.get('DJANGO_WRITE_QUEUE', 'False') == 'True'
+WRITE_QUEUE_SOCKET = os.environ.get('DJANGO_WRITE_QUEUE_SOCKET', str(BASE_DIR / 'writequeue.sock'))
+WRITE_QUEUE_BATCH_SIZE = 50
+WRITE_QUEUE_MAX_WAIT = 0.002  # seconds a batch waits for more submissions
+WRITE_QUEUE_TIMEOUT = 30  # seconds a worker waits for the writer's reply
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -110,16 +182,178 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed names plus .gz/.br siblings, which
+# core.middleware.StaticFilesMiddleware serves with immutable caching.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+    # Order attachments: deduplicated by content hash, text types gzipped.
+    'attachments': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+        'OPTIONS': {'url_name': 'admin:core_orderrequest_attachment'},
+    },
+}
+STATIC_SERVE = os.environ.get('DJANGO_STATIC_SERVE', 'True') == 'True'
+STATIC_MAX_AGE = 60 * 60  # Cache lifetime for files without a content hash
+
+# Serve the bundles built by `manage.py vendor_assets` instead of CDN links.
+ASSET_BUNDLES_ENABLED = os.environ.get('DJANGO_ASSET_BUNDLES', 'False') == 'True'
+
+# Use the stylesheet built by `manage.py build_utility_css` instead of the
+# in-browser Tailwind runtime.
+UTILITY_CSS_ENABLED = os.environ.get('DJANGO_UTILITY_CSS', 'False') == 'True'
+UTILITY_CSS_PATH = 'css/utilities.css'
+
+# Responsive images: widths (px) and formats generated for static images at
+# collectstatic time and for Testimonial photos after upload (see core.images).
+RESPONSIVE_IMAGE_WIDTHS = [96, 320, 640, 960, 1280, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp', 'jpeg']
+RESPONSIVE_IMAGE_QUALITY = {'avif': 55, 'webp': 78, 'jpeg': 80}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hand attachment downloads to the front web server: '' (Django streams the
+# file, with sendfile() under servers that support wsgi.file_wrapper),
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd). For nginx,
+# map ATTACHMENT_ACCEL_PREFIX to MEDIA_ROOT in an `internal` location.
+ATTACHMENT_SENDFILE_MODE = os.environ.get('DJANGO_ATTACHMENT_SENDFILE', '')
+ATTACHMENT_ACCEL_PREFIX = '/protected-media/'
+
+# Caching
+# DJANGO_PAGE_CACHE_BACKEND selects where rendered public pages are stored:
+# 'locmem' (per process), 'file' (shared by all workers on one host) or
+# 'redis' (shared across hosts, requires DJANGO_REDIS_URL).
+PAGE_CACHE_BACKEND = os.environ.get('DJANGO_PAGE_CACHE_BACKEND', 'locmem')
+PAGE_CACHE_ENABLED = os.environ.get('DJANGO_PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('DJANGO_PAGE_CACHE_TIMEOUT', 600))
+PAGE_CACHE_ALIAS = 'pages'
+
+# Small values every worker must see the same: the catalog version stamp
+# (core.catalog) and the page cache generation and stats baseline
+# (core.page_cache), which stay shared when the pages themselves are in
+# locmem.
+# DJANGO_SHARED_CACHE_BACKEND is 'file' (one host) or 'redis' (several
+# hosts); never per process, or an edit would only reach the worker that
+# saved it.
+SHARED_CACHE_BACKEND = os.environ.get('DJANGO_SHARED_CACHE_BACKEND', 'file')
+SHARED_CACHE_ALIAS = 'shared'
+CATALOG_CACHE_ALIAS = SHARED_CACHE_ALIAS
+PAGE_CACHE_SHARED_ALIAS = SHARED_CACHE_ALIAS
+
+_PAGE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'academiq-pages',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'pages',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('DJANGO_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+_SHARED_CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'shared',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('DJANGO_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': 'shared',
+    },
+}
+
+# Row counts and date drill-downs of the large admin changelists are cached
+# this long (see core.changelist), so their totals may lag by as much.
+ADMIN_CHANGELIST_CACHE_ALIAS = PAGE_CACHE_ALIAS
+ADMIN_CHANGELIST_CACHE_TIMEOUT = int(os.environ.get('DJANGO_ADMIN_CHANGELIST_CACHE_TIMEOUT', 300))
+
+# Token buckets of the submission throttle (see core.throttle). They must be
+# shared by all workers, so DJANGO_THROTTLE_CACHE_BACKEND is 'file' (one
+# host) or 'redis' (several hosts); 'locmem' gives each worker its own limits.
+THROTTLE_ENABLED = os.environ.get('DJANGO_THROTTLE', 'True') == 'True'
+THROTTLE_CACHE_BACKEND = os.environ.get('DJANGO_THROTTLE_CACHE_BACKEND', 'file')
+THROTTLE_CACHE_ALIAS = 'throttle'
+# request.META key holding the client address; 'HTTP_X_REAL_IP' or similar
+# behind a reverse proxy that sets it. From a list such as
+# 'HTTP_X_FORWARDED_FOR' the last entry, the one the proxy appended, is used.
+THROTTLE_IP_HEADER = os.environ.get('DJANGO_THROTTLE_IP_HEADER', 'REMOTE_ADDR')
+# (burst, seconds to refill the burst) per bucket. 'ip' and 'email' are per
+# client; 'service_type' is shared by everyone asking for that service,
+# with '*' for service types without their own limit.
+THROTTLE_LIMITS = {
+    'contact': {
+        'ip': (5, 600),
+        'email': (3, 3600),
+        'service_type': {'*': (60, 3600)},
+    },
+    'order': {
+        'ip': (5, 600),
+        'email': (3, 3600),
+        'service_type': {'*': (60, 3600)},
+    },
+}
+# Every submission, all endpoints together.
+THROTTLE_GLOBAL_LIMIT = (120, 60)
+
+_THROTTLE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'academiq-throttle',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'throttle',
+        # One entry per recent client address and email.
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('DJANGO_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': 'throttle',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    PAGE_CACHE_ALIAS: _PAGE_CACHE_BACKENDS[PAGE_CACHE_BACKEND],
+    SHARED_CACHE_ALIAS: _SHARED_CACHE_BACKENDS[SHARED_CACHE_BACKEND],
+    THROTTLE_CACHE_ALIAS: _THROTTLE_CACHE_BACKENDS[THROTTLE_CACHE_BACKEND],
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_HOST_USER = os.environ.get('EMAIL_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_PASSWORD', '')
+EMAIL_TIMEOUT = 30
 DEFAULT_FROM_EMAIL = 'noreply@academiq.com'
+ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@academiq.com')
+
+# Email outbox: form notifications are queued and sent by `manage.py send_outbox`.
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_INTERVAL = 5  # seconds
+OUTBOX_MAX_ATTEMPTS = 8  # then the message becomes a dead letter
+OUTBOX_RETRY_BASE = 60  # seconds; doubled after every failed attempt
+OUTBOX_RETRY_MAX = 6 * 60 * 60
+OUTBOX_CLAIM_TIMEOUT = 10 * 60  # re-queue messages claimed by a worker that died
 
 # Security Settings
 SECURE_BROWSER_XSS_FILTER = True
@@ -128,8 +362,10 @@ X_FRAME_OPTIONS = 'DENY'
 SESSION_COOKIE_HTTPONLY = True
 
 # CSRF Settings
+# The token travels in its own cookie, set only by the pages that render a
+# form, so anonymous visitors never need a session.
 CSRF_COOKIE_HTTPONLY = False
-CSRF_USE_SESSIONS = True  
+CSRF_USE_SESSIONS = False
 
 # Base CSRF trusted origins
 CSRF_TRUSTED_ORIGINS = [
@@ -143,7 +379,12 @@ if os.environ.get('DJANGO_CSRF_TRUSTED_ORIGINS'):
 
 # Session settings
 SESSION_COOKIE_AGE = 3600
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are only written when they change; core.middleware.SessionRefreshMiddleware
+# slides the expiry of a session in use at most once per interval.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = int(os.environ.get('DJANGO_SESSION_REFRESH_INTERVAL', 300))  # seconds
+# Flash messages go in a cookie, falling back to the session only when too large.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.fallback.FallbackStorage'
 
 # Message tags
 from django.contrib.messages import constants as messages
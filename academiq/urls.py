@@ -10,10 +10,14 @@ from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
 from django.views.i18n import set_language
 
+from core.views import metrics_view, readiness
+
 # Non-translated URLs
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('i18n/setlang/', set_language, name='set_language'),
+    path('ready/', readiness, name='readiness'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Translated URLs (with language prefix)
@@ -15,3 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academiq.settings')
 
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Pay the first-request costs now, before the server forks or takes traffic.
+from core.warmup import warm_up
+warm_up()
@@ -2,13 +2,25 @@
 Admin configuration for ACADEMIQ core models.
 """
 
+import posixpath
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from .models import ContactMessage, OrderRequest, Testimonial, Service
+from . import profiling
+from .changelist import KeysetPaginationMixin
+from .downloads import serve_file
+from .models import ContactMessage, OrderRequest, OutboundEmail, RequestProfile, Testimonial, Service
+from .search import ORDER_NUMBER_RE, FullTextSearchMixin
 
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(KeysetPaginationMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['full_name', 'email', 'subject', 'service_type', 'created_at', 'is_read']
     list_filter = ['service_type', 'is_read', 'created_at']
     search_fields = ['full_name', 'email', 'subject', 'message']
@@ -29,10 +41,11 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
 
 @admin.register(OrderRequest)
-class OrderRequestAdmin(admin.ModelAdmin):
+class OrderRequestAdmin(KeysetPaginationMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['get_order_number', 'full_name', 'email', 'service_type', 'status', 'created_at']
     list_filter = ['service_type', 'status', 'created_at']
     search_fields = ['full_name', 'email', 'message', 'id']
+    search_pk_with = ORDER_NUMBER_RE
     readonly_fields = ['get_order_number', 'created_at', 'updated_at']
     date_hierarchy = 'created_at'
     list_per_page = 25
@@ -57,6 +70,31 @@ class OrderRequestAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_urls(self):
+        urls = [
+            path(
+                'attachment/<path:name>',
+                self.admin_site.admin_view(self.attachment_view),
+                name='core_orderrequest_attachment',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def attachment_view(self, request, name):
+        """
+        Download an order attachment; the storage's ``url()`` points here.
+        Supports resumable ``Range`` requests (see ``core.downloads``).
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if not OrderRequest.objects.filter(attachment=name).exists():
+            raise Http404
+        storage = OrderRequest._meta.get_field('attachment').storage
+        try:
+            return serve_file(request, storage, name, posixpath.basename(name))
+        except FileNotFoundError:
+            raise Http404
+
 
 @admin.register(Testimonial)
 class TestimonialAdmin(admin.ModelAdmin):
@@ -74,4 +112,88 @@ class ServiceAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'short_description']
     list_editable = ['is_active', 'display_order']
     prepopulated_fields = {'slug': ('title',)}
+    # pk last, so the changelist sort is total without a '-pk' the indexes can't serve.
+    ordering = ['display_order', 'title', 'pk']
     list_per_page = 25
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'body', 'last_error']
+    readonly_fields = [
+        'subject', 'body', 'from_email', 'recipients', 'status', 'attempts',
+        'next_attempt_at', 'claimed_at', 'last_error', 'created_at', 'sent_at',
+    ]
+    date_hierarchy = 'created_at'
+    ordering = ['created_at', 'pk']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_QUEUED, attempts=0, next_attempt_at=timezone.now(), claimed_at=None,
+        )
+        self.message_user(request, _('%(count)d email(s) queued for delivery.') % {'count': updated})
+    requeue.short_description = _("Retry selected emails")
+
+    actions = ['requeue']
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['path', 'method', 'status_code', 'duration_ms', 'queries', 'requested_by', 'created_at', 'download_link']
+    search_fields = ['path', 'requested_by']
+    readonly_fields = ['method', 'path', 'status_code', 'duration_ms', 'queries', 'requested_by', 'created_at', 'download_link']
+    fields = readonly_fields + ['summary']
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at', '-pk']
+    list_per_page = 25
+    change_list_template = 'admin/core/requestprofile/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('summary', 'stats')
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='core_requestprofile_download',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_link(self, obj):
+        url = reverse('admin:core_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, _('Download'))
+    download_link.short_description = _('Profile')
+
+    def download_view(self, request, pk):
+        """The stats as a .prof file, for ``python -m pstats`` or snakeviz."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        profile = RequestProfile.objects.filter(pk=pk).values_list('stats', flat=True).first()
+        if profile is None:
+            raise Http404
+        response = HttpResponse(bytes(profile), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="request-{pk}.prof"'
+        return response
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            'profile_header': profiling.HEADER,
+            'profile_token': profiling.make_token(request.user),
+            'profile_token_minutes': settings.PROFILE_TOKEN_MAX_AGE // 60,
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
@@ -0,0 +1,57 @@
+"""
+Front-end asset configuration for ACADEMIQ.
+
+Third-party libraries are pinned here. ``manage.py vendor_assets`` downloads
+them into ``static/vendor/`` and builds one CSS bundle per text direction
+plus one JS bundle into ``static/bundles/``; the ``{% asset_bundle %}`` tag
+emits either those bundles or, until they are built, the CDN links.
+"""
+
+FONT_AWESOME_VERSION = '6.4.0'
+AOS_VERSION = '2.3.1'
+
+FONT_AWESOME_CSS_URL = (
+    f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FONT_AWESOME_VERSION}/css/all.min.css'
+)
+FONT_AWESOME_WEBFONTS_URL = (
+    f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FONT_AWESOME_VERSION}/webfonts/'
+)
+FONT_AWESOME_WEBFONTS = [
+    'fa-solid-900.woff2',
+    'fa-regular-400.woff2',
+    'fa-brands-400.woff2',
+    'fa-v4compatibility.woff2',
+]
+AOS_CSS_URL = f'https://unpkg.com/aos@{AOS_VERSION}/dist/aos.css'
+AOS_JS_URL = f'https://unpkg.com/aos@{AOS_VERSION}/dist/aos.js'
+GOOGLE_FONTS_CSS_URL = (
+    'https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700;800'
+    '&family=Tajawal:wght@300;400;500;700;800&display=swap'
+)
+
+# Paths below are relative to the static/ directory.
+VENDOR_DIR = 'vendor'
+BUNDLE_DIR = 'bundles'
+
+CSS_BUNDLES = {
+    'ltr': 'bundles/site-ltr.css',
+    'rtl': 'bundles/site-rtl.css',
+}
+JS_BUNDLE = 'bundles/site.js'
+
+# Project sources appended after the vendored libraries, per direction.
+PROJECT_CSS = {
+    'ltr': ['css/style.css'],
+    'rtl': ['css/style.css', 'css/style-rtl.css'],
+}
+PROJECT_JS = ['js/main.js']
+
+# Emitted by {% asset_bundle %} while ASSET_BUNDLES_ENABLED is False.
+CDN_CSS = [
+    GOOGLE_FONTS_CSS_URL,
+    FONT_AWESOME_CSS_URL,
+    AOS_CSS_URL,
+]
+CDN_JS = [
+    AOS_JS_URL,
+]
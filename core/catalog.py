@@ -0,0 +1,114 @@
+"""
+Shared catalog of active Services and Testimonials.
+
+The public pages only ever need the active rows, so they are loaded once
+into immutable records and reused across requests. A version stamp kept in
+the ``shared`` cache alias (a file or Redis store that every worker sees,
+see ``SHARED_CACHE_BACKEND``) is bumped whenever a Service or Testimonial
+changes (see ``core.signals``); a worker reloads its snapshot only when the
+stamp it holds is out of date, so the steady-state read path runs no SQL.
+
+Each bump also records when it happened. That time, not the newest
+``updated_at`` of the active rows, is the catalog's ``last_modified``: a
+deactivated or deleted row changes the pages too, and would otherwise move
+``Last-Modified`` backwards.
+"""
+
+import hashlib
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from . import metrics
+from .models import Service, Testimonial
+
+VERSION_KEY = 'catalog:version'
+CHANGED_KEY = 'catalog:changed_at'
+
+ServiceRecord = namedtuple('ServiceRecord', [
+    'id', 'title', 'slug', 'short_description', 'description', 'icon',
+    'price_starting_at', 'display_order', 'updated_at',
+])
+
+TestimonialRecord = namedtuple('TestimonialRecord', [
+    'id', 'name', 'title', 'institution', 'content', 'image', 'image_variants',
+    'rating', 'updated_at',
+])
+
+Catalog = namedtuple('Catalog', [
+    'version', 'services', 'testimonials', 'digest', 'last_modified',
+])
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_version():
+    return _get_cache().get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def get_changed_at():
+    """When the catalog last changed, or first asked for when the cache is new."""
+    return _get_cache().get_or_set(CHANGED_KEY, timezone.now, timeout=None)
+
+
+def bump_version():
+    """Mark every worker's catalog snapshot as stale."""
+    cache = _get_cache()
+    # Before the version, so a worker that sees the new version sees this too.
+    cache.set(CHANGED_KEY, timezone.now(), timeout=None)
+    cache.add(VERSION_KEY, 1, timeout=None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def _load(version):
+    services = tuple(
+        ServiceRecord(*row) for row in
+        Service.objects.filter(is_active=True)
+        .order_by('display_order', 'title')
+        .values_list(*ServiceRecord._fields)
+    )
+    testimonials = tuple(
+        TestimonialRecord(*row) for row in
+        Testimonial.objects.filter(is_active=True)
+        .order_by('-created_at')
+        .values_list(*TestimonialRecord._fields)
+    )
+    digest = hashlib.md5(repr((services, testimonials)).encode('utf-8')).hexdigest()
+    last_modified = max(
+        [get_changed_at()] + [record.updated_at for record in services + testimonials],
+    )
+    return Catalog(version, services, testimonials, digest, last_modified)
+
+
+def get_catalog():
+    """Return the current catalog, reloading it only if the version changed."""
+    global _snapshot
+    version = get_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        metrics.inc('academiq_cache_requests_total', cache='catalog', result='hit')
+        return snapshot
+    metrics.inc('academiq_cache_requests_total', cache='catalog', result='miss')
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _load(version)
+        return _snapshot
+
+
+def active_services():
+    return get_catalog().services
+
+
+def active_testimonials():
+    return get_catalog().testimonials
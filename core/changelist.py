@@ -0,0 +1,165 @@
+"""
+Admin changelists that stay fast on large tables.
+
+``KeysetPaginationMixin`` swaps the changelist of a ``ModelAdmin`` for one
+that pages through its default ``-created_at, -pk`` ordering with a cursor
+(``?after=`` / ``?before=`` the edge row of the current page) instead of
+an ``OFFSET``, so every page is an index range read however deep it is.
+Sorting by a column or searching falls back to numbered pages.
+
+Row counts and the ``date_hierarchy`` drill-down are cached for
+``ADMIN_CHANGELIST_CACHE_TIMEOUT`` seconds per filter combination, and the
+unfiltered total is not counted at all, so a page load runs no ``COUNT(*)``
+or ``SELECT DISTINCT`` over the table while the cache is warm. The totals
+shown are therefore approximate by up to that many seconds of new rows.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import get_language
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+CURSOR_VARS = (AFTER_VAR, BEFORE_VAR)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_changelist_cache():
+    return caches[settings.ADMIN_CHANGELIST_CACHE_ALIAS]
+
+
+def changelist_cache_key(kind, opts, query_string):
+    """Cache key for ``kind`` of a changelist, per filter query string and language."""
+    digest = hashlib.md5(query_string.encode('utf-8')).hexdigest()
+    return f'changelist:{kind}:{opts.label_lower}:{get_language()}:{digest}'
+
+
+def encode_cursor(value, pk):
+    """``<microseconds since the epoch>.<pk>``: short, and exact for ordering."""
+    return f'{(value - EPOCH) // timedelta(microseconds=1)}.{pk}'
+
+
+def decode_cursor(token):
+    try:
+        micros, pk = token.split('.')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (TypeError, ValueError, OverflowError):
+        raise IncorrectLookupParameters(f'Invalid cursor: {token!r}')
+
+
+class CachedCountPaginator(Paginator):
+    """``Paginator`` whose ``count`` is cached under ``cache_key``."""
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if not self.cache_key:
+            return Paginator.count.func(self)
+        return get_changelist_cache().get_or_set(
+            self.cache_key, lambda: Paginator.count.func(self), settings.ADMIN_CHANGELIST_CACHE_TIMEOUT,
+        )
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ``ChangeList`` that pages by ``(keyset_field, pk)`` when the list is in
+    its default newest-first order, and by page number otherwise.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for var in CURSOR_VARS:
+            lookup_params.pop(var, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Links to another filter, sort or date level start from the top.
+        return super().get_query_string(new_params, [*(remove or ()), *CURSOR_VARS])
+
+    def get_results(self, request):
+        field = self.model_admin.keyset_field
+        self.keyset = (
+            not self.query and self.get_ordering(request, self.root_queryset) == [f'-{field}', '-pk']
+        )
+        if not self.keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        after = request.GET.get(AFTER_VAR)
+        before = request.GET.get(BEFORE_VAR)
+        queryset = self.queryset
+        if before:
+            # Step back one page from the cursor, then read forwards from its newest row.
+            newer = list(
+                queryset.filter(self.newer_than(*decode_cursor(before)))
+                .reverse().values_list(field, 'pk')[:self.list_per_page]
+            )
+            if newer:
+                queryset = queryset.filter(self.older_than(*newer[-1], inclusive=True))
+        elif after:
+            queryset = queryset.filter(self.older_than(*decode_cursor(after)))
+        result_list = queryset[:self.list_per_page]
+
+        rows = list(result_list)
+        self.older_url = self.newer_url = None
+        if rows:
+            first, last = rows[0], rows[-1]
+            first_key = (getattr(first, field), first.pk)
+            last_key = (getattr(last, field), last.pk)
+            if (after or before) and self.queryset.filter(self.newer_than(*first_key)).exists():
+                self.newer_url = self.get_query_string({BEFORE_VAR: encode_cursor(*first_key)})
+            if len(rows) == self.list_per_page and self.queryset.filter(self.older_than(*last_key)).exists():
+                self.older_url = self.get_query_string({AFTER_VAR: encode_cursor(*last_key)})
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.older_url or self.newer_url)
+        self.paginator = paginator
+
+    def older_than(self, value, pk, inclusive=False):
+        # The leading range on the field alone is what lets the index seek.
+        field = self.model_admin.keyset_field
+        pk_lookup = 'pk__lte' if inclusive else 'pk__lt'
+        return Q(**{f'{field}__lte': value}) & (Q(**{f'{field}__lt': value}) | Q(**{pk_lookup: pk}))
+
+    def newer_than(self, value, pk):
+        field = self.model_admin.keyset_field
+        return Q(**{f'{field}__gte': value}) & (Q(**{f'{field}__gt': value}) | Q(pk__gt=pk))
+
+
+class KeysetPaginationMixin:
+    """
+    ``ModelAdmin`` mixin for tables too large to count or offset into.
+    The admin's ordering must be ``-keyset_field``.
+    """
+
+    keyset_field = 'created_at'
+    show_full_result_count = False
+    change_list_template = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        params = request.GET.copy()
+        for var in (PAGE_VAR, *CURSOR_VARS):
+            params.pop(var, None)
+        return CachedCountPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cache_key=changelist_cache_key('count', self.model._meta, params.urlencode()),
+        )
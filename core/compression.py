@@ -0,0 +1,182 @@
+"""
+HTML minification and compression of rendered pages.
+
+``minify_html()`` collapses whitespace between and inside tags and drops
+comments. ``<pre>``, ``<textarea>``, ``<script>`` and ``<style>`` blocks,
+conditional comments and attribute values other than ``class`` are copied
+unchanged. A run of whitespace becomes one newline when it contained one,
+otherwise one space, so the rendered text and inline spacing stay the same.
+
+``HTMLCompressionMiddleware`` (in ``core.middleware``) minifies ``text/html``
+responses and compresses them with Brotli or gzip according to
+``Accept-Encoding``. Results are memoized by a hash of the response body,
+so a page that many clients receive (a page-cache hit, say) is minified
+and compressed once per worker. Pages rendered for one client only (logged
+in, or setting a cookie) are processed without being memoized. gzip output
+carries Django's random-length filename padding against BREACH.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available.
+    brotli = None
+
+# Blocks whose whitespace is significant or that are not HTML.
+PRESERVED_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>|<!--\[if.*?<!\[endif\]-->)',
+    re.IGNORECASE | re.DOTALL,
+)
+COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+TAG_RE = re.compile(r'''<(?:[^<>"']|"[^"]*"|'[^']*')+>''')
+WHITESPACE_RE = re.compile(r'\s+')
+# Inside a tag: quoted attribute values are kept, whitespace between attributes collapsed.
+TAG_PART_RE = re.compile(r'''(\bclass\s*=\s*)("[^"]*"|'[^']*')|("[^"]*"|'[^']*')|(\s+)''', re.IGNORECASE)
+
+ENCODINGS = ['br', 'gzip'] if brotli is not None else ['gzip']
+# Random padding added to gzip output, as django.middleware.gzip does.
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def _minify_tag_part(match):
+    class_prefix, class_value, quoted, whitespace = match.groups()
+    if class_prefix is not None:
+        quote = class_value[0]
+        return 'class=' + quote + ' '.join(class_value[1:-1].split()) + quote
+    if quoted is not None:
+        return quoted
+    return ' '
+
+
+def _minify_tag(match):
+    tag = TAG_PART_RE.sub(_minify_tag_part, match.group(0))
+    if tag.endswith(' >'):
+        return tag[:-2] + '>'
+    if tag.endswith(' />'):
+        return tag[:-3] + '/>'
+    return tag
+
+
+def _minify_markup(markup):
+    markup = COMMENT_RE.sub('', markup)
+    parts = []
+    position = 0
+    for match in TAG_RE.finditer(markup):
+        parts.append(WHITESPACE_RE.sub(_collapse, markup[position:match.start()]))
+        parts.append(_minify_tag(match))
+        position = match.end()
+    parts.append(WHITESPACE_RE.sub(_collapse, markup[position:]))
+    return ''.join(parts)
+
+
+def minify_html(html):
+    """``html`` with redundant whitespace and comments removed."""
+    parts = PRESERVED_RE.split(html)
+    # split() yields text, block, tag name, text, block, tag name, ...
+    return ''.join(
+        part if index % 3 == 1 else _minify_markup(part)
+        for index, part in enumerate(parts) if index % 3 != 2 and part
+    )
+
+
+def accepted_encodings(request):
+    """The content codings ``request`` accepts, lower-cased, without those refused with q=0."""
+    accepted = set()
+    for token in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = token.partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def encode(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.HTML_BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return compress_string(data, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+    return data
+
+
+class CompressedPages:
+    """A per-process LRU of minified and compressed bodies, bounded in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _key, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+_pages = None
+
+
+def _get_pages():
+    global _pages
+    if _pages is None:
+        _pages = CompressedPages(settings.HTML_COMPRESSION_CACHE_BYTES)
+    return _pages
+
+
+def _process(body, charset, encoding):
+    minified = minify_html(body.decode(charset)).encode(charset) if settings.HTML_MINIFY else body
+    return minified, encode(minified, encoding) if encoding else minified
+
+
+def process(body, charset, encoding, memoize=True):
+    """
+    ``(minified, encoded)`` bodies for ``body``, where ``encoded`` is
+    ``minified`` compressed with ``encoding`` (or itself for None).
+    """
+    if not memoize:
+        return _process(body, charset, encoding)
+    pages = _get_pages()
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    minified = pages.get((digest, None))
+    if minified is None:
+        minified, encoded = _process(body, charset, encoding)
+        pages.put((digest, None), minified)
+    elif encoding is None:
+        return minified, minified
+    else:
+        encoded = pages.get((digest, encoding))
+        if encoded is None:
+            encoded = encode(minified, encoding)
+    if encoding is not None:
+        pages.put((digest, encoding), encoded)
+    return minified, encoded
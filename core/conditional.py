@@ -0,0 +1,92 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for the public pages.
+
+The validators are derived from the catalog snapshot (``core.catalog``), a
+hash of everything else a page is rendered from (templates, compiled
+translations and the asset settings) and the active language, so an
+unchanged page is answered with ``304 Not Modified`` before the view
+renders anything.
+"""
+
+import datetime
+import hashlib
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from . import catalog
+from .page_cache import is_cacheable_request
+
+
+def _build_files():
+    for engine in settings.TEMPLATES:
+        for directory in engine.get('DIRS', []):
+            for path in sorted(Path(directory).rglob('*.html')):
+                yield directory, path
+    for directory in settings.LOCALE_PATHS:
+        for path in sorted(Path(directory).rglob('*.mo')):
+            yield directory, path
+
+
+@lru_cache(maxsize=None)
+def page_build():
+    """
+    Return ``(hash, mtime)`` of what the pages are built from besides the
+    catalog: the project templates, the compiled translations and the
+    settings that choose which stylesheets and scripts a page links.
+
+    Computed once per process; deployments reload workers when any of
+    them change.
+    """
+    digest = hashlib.md5(repr((settings.UTILITY_CSS_ENABLED, settings.ASSET_BUNDLES_ENABLED)).encode('utf-8'))
+    latest = 0.0
+    for directory, path in _build_files():
+        digest.update(str(path.relative_to(directory)).encode('utf-8'))
+        digest.update(path.read_bytes())
+        latest = max(latest, path.stat().st_mtime)
+    modified = datetime.datetime.fromtimestamp(int(latest), tz=datetime.timezone.utc)
+    return digest.hexdigest(), modified
+
+
+def page_etag(request, *args, **kwargs):
+    if not is_cacheable_request(request):
+        return None
+    build_hash, _ = page_build()
+    # Pages embed hashed asset URLs, so a new collectstatic manifest changes them.
+    assets_hash = getattr(staticfiles_storage, 'manifest_hash', '')[:8]
+    # Weak: the bytes of the 200 depend on HTMLCompressionMiddleware, and a
+    # 304 must repeat the validator the 200 would have carried.
+    return f'W/"{catalog.get_catalog().digest[:16]}-{build_hash[:16]}{assets_hash}-{get_language()}"'
+
+
+def page_last_modified(request, *args, **kwargs):
+    if not is_cacheable_request(request):
+        return None
+    _, build_modified = page_build()
+    catalog_modified = catalog.get_catalog().last_modified
+    if timezone.is_naive(catalog_modified):
+        catalog_modified = timezone.make_aware(catalog_modified, datetime.timezone.utc)
+    return max(catalog_modified, build_modified)
+
+
+def conditional_page(view_func):
+    """
+    Answer conditional GETs for a public page with ``304`` when its content
+    version is unchanged. The response varies on the language and on cookies
+    (flash messages and logins change the rendered page).
+    """
+    conditional_view = condition(etag_func=page_etag, last_modified_func=page_last_modified)(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+        return response
+
+    return wrapper
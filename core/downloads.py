@@ -0,0 +1,183 @@
+"""
+Ranged file downloads for ACADEMIQ.
+
+``serve_file()`` answers ``Range``/``If-Range`` requests for one file of a
+storage. Plain files go out as ``FileResponse`` over a real file descriptor
+positioned at the start of the range, so a WSGI server with
+``wsgi.file_wrapper`` (gunicorn, uWSGI, mod_wsgi) transfers them with
+``sendfile()`` and the worker never copies the bytes. With
+``ATTACHMENT_SENDFILE_MODE`` set, the transfer is handed to the front web
+server instead through ``X-Accel-Redirect`` (nginx) or ``X-Sendfile``
+(Apache, lighttpd), which handles ranges itself.
+
+Gzipped blobs of ``ContentAddressedStorage`` are decompressed on the fly
+and streamed without ``sendfile()``; they are text documents and small
+enough for that.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeFile:
+    """
+    Read at most ``length`` bytes of ``file`` from its current position.
+
+    It has no ``fileno()``, so ``wsgi.file_wrapper`` reads it rather than
+    sending the descriptor with ``sendfile()``: that is what a decompressing
+    ``file`` needs, as its descriptor is the one of the gzip file.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class SendfileRangeFile(RangeFile):
+    """
+    ``RangeFile`` over a plain file, exposing ``fileno()`` so
+    ``wsgi.file_wrapper`` can use ``sendfile()``; servers bound it by the
+    Content-Length header.
+    """
+
+    def fileno(self):
+        return self.file.fileno()
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single byte range, None when
+    the header should be ignored (absent, malformed or multi-range), or
+    ``False`` when it cannot be satisfied.
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return False
+    return start, end
+
+
+def _etag(storage, name, stat):
+    key = getattr(storage, 'blob_key', lambda name: None)(name)
+    if key:
+        # The key is derived from the content, so it is a strong validator.
+        return f'"{key}"'
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    parsed = parse_http_date_safe(if_range)
+    return parsed is not None and parsed == int(mtime)
+
+
+def serve_file(request, storage, name, filename):
+    """Download ``name`` from ``storage`` as ``filename``, honouring ``Range``."""
+    path = storage.path(name)
+    stat = os.stat(path)
+    blob = storage.get_blob(name) if hasattr(storage, 'get_blob') else None
+    compressed = bool(blob and blob.compressed)
+    size = blob.size if blob else stat.st_size
+    etag = _etag(storage, name, stat)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    if _if_range_matches(request, etag, stat.st_mtime):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+    start, end = byte_range or (0, size - 1)
+    length = max(0, end - start + 1)
+
+    mode = settings.ATTACHMENT_SENDFILE_MODE
+    if mode and not compressed:
+        # The front server reads the file, applies Range and sets the length.
+        response = HttpResponse(content_type=content_type)
+        relative = os.path.relpath(path, storage.location).replace(os.sep, '/')
+        if mode == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.ATTACHMENT_ACCEL_PREFIX + quote(relative)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        if compressed:
+            handle = storage.open(name)
+            _skip(handle, start)
+            body = RangeFile(handle, length)
+        else:
+            handle = open(path, 'rb')
+            handle.seek(start)
+            body = SendfileRangeFile(handle, length)
+        response = FileResponse(body, content_type=content_type)
+        response.block_size = CHUNK_SIZE
+        response['Content-Length'] = str(length)
+        if byte_range:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Content-Disposition'] = _content_disposition(filename)
+    response['Cache-Control'] = 'private, no-transform'
+    return response
+
+
+def _skip(handle, count):
+    while count > 0:
+        data = handle.read(min(count, CHUNK_SIZE))
+        if not data:
+            break
+        count -= len(data)
+
+
+def _content_disposition(filename):
+    try:
+        filename.encode('ascii')
+        return 'attachment; filename="{}"'.format(filename.replace('\\', '\\\\').replace('"', r'\"'))
+    except UnicodeEncodeError:
+        return "attachment; filename*=utf-8''{}".format(quote(filename))
@@ -7,6 +7,7 @@ from django import forms
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 from .models import ContactMessage, OrderRequest
+from .uploads import INVALID_TYPE_ERROR, MAX_UPLOAD_SIZE, TOO_LARGE_ERROR, extension_allowed
 
 
 class ContactForm(forms.ModelForm):
@@ -50,7 +51,12 @@ class ContactForm(forms.ModelForm):
 
 
 class OrderForm(forms.ModelForm):
-    """Order form for service requests with file upload."""
+    """
+    Order form for service requests with file upload.
+
+    ``upload_handler`` is the ``AttachmentUploadHandler`` that screened the
+    request body; its verdict is reported on the attachment field.
+    """
     
     phone = forms.CharField(
         max_length=20,
@@ -86,3 +92,19 @@ class OrderForm(forms.ModelForm):
                 'accept': '.pdf,.doc,.docx,.txt,.zip,.rar',
             }),
         }
+    
+    def __init__(self, *args, upload_handler=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_handler = upload_handler
+    
+    def clean_attachment(self):
+        if self.upload_handler is not None and self.upload_handler.error:
+            raise forms.ValidationError(self.upload_handler.error)
+        attachment = self.cleaned_data.get('attachment')
+        # Also checked here for uploads that bypassed the screening handler.
+        if attachment and hasattr(attachment, 'size'):
+            if not extension_allowed(attachment.name):
+                raise forms.ValidationError(INVALID_TYPE_ERROR)
+            if attachment.size > MAX_UPLOAD_SIZE:
+                raise forms.ValidationError(TOO_LARGE_ERROR)
+        return attachment
@@ -0,0 +1,243 @@
+"""
+Responsive image variants for ACADEMIQ.
+
+Every source image is resized to the widths in ``RESPONSIVE_IMAGE_WIDTHS``
+(never upscaled) and encoded in each of ``RESPONSIVE_IMAGE_FORMATS``.
+Variant names carry a digest of the source bytes, so they can be cached
+forever and are only regenerated when the source itself changes.
+
+* Static images are processed by ``CompressedManifestStaticFilesStorage``
+  during ``collectstatic``; their variants are listed in
+  ``responsive/index.json`` inside ``STATIC_ROOT``.
+* ``Testimonial.image`` uploads are processed after the admin save has been
+  committed, on a background thread, and the result is stored in
+  ``Testimonial.image_variants``.
+
+``{% responsive_image %}`` turns either listing into a ``<picture>`` element
+with ``srcset``/``sizes``.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is needed for ImageField anyway; without it no variants are built.
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'responsive'
+STATIC_INDEX = posixpath.join(VARIANT_DIR, 'index.json')
+STATIC_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {'avif': '.avif', 'webp': '.webp', 'jpeg': '.jpg'}
+# Best compression first: the browser takes the first <source> it supports.
+FORMAT_ORDER = ['avif', 'webp', 'jpeg']
+
+# One worker keeps image processing from competing with request threads.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='images')
+
+
+def available_formats():
+    """The configured formats this Pillow build can encode, best first."""
+    if Image is None:
+        return []
+    formats = []
+    for fmt in FORMAT_ORDER:
+        if fmt not in settings.RESPONSIVE_IMAGE_FORMATS:
+            continue
+        if fmt in ('avif', 'webp') and not features.check(fmt):
+            continue
+        formats.append(fmt)
+    return formats
+
+
+def source_digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def variant_prefix(name):
+    """``images/background.jpeg`` -> ``responsive/images/background``."""
+    return posixpath.join(VARIANT_DIR, posixpath.splitext(name)[0])
+
+
+def target_widths(width):
+    """Configured widths below the source width, plus the source width itself (capped)."""
+    widths = [w for w in settings.RESPONSIVE_IMAGE_WIDTHS if w < width]
+    largest = min(width, max(settings.RESPONSIVE_IMAGE_WIDTHS))
+    if largest not in widths:
+        widths.append(largest)
+    return sorted(widths)
+
+
+def _encode(image, fmt):
+    quality = settings.RESPONSIVE_IMAGE_QUALITY.get(fmt, 80)
+    options = {'quality': quality}
+    if fmt == 'jpeg':
+        if image.mode != 'RGB':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'webp':
+        options['method'] = 4
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_variants(name, data, storage, existing=None):
+    """
+    Write the variants of the image ``data`` (stored as ``name``) to
+    ``storage`` and return their listing::
+
+        {'source': name, 'digest': ..., 'width': ..., 'height': ...,
+         'variants': {'webp': [[320, 'responsive/...320w.webp'], ...], ...}}
+
+    Nothing is re-encoded when ``existing`` is the listing for the same
+    bytes and every file in it is still present, nor for variant files that
+    already exist. Stale variants are left for the caller to delete.
+    """
+    digest = source_digest(data)
+    if existing and existing.get('digest') == digest and existing.get('source') == name and all(
+        storage.exists(path) for paths in existing['variants'].values() for _w, path in paths
+    ):
+        return existing
+
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+    width, height = image.size
+
+    prefix = variant_prefix(name)
+    listing = {'source': name, 'digest': digest, 'width': width, 'height': height, 'variants': {}}
+    for w in target_widths(width):
+        resized = image if w == width else image.resize(
+            (w, max(1, round(height * w / width))), Image.Resampling.LANCZOS,
+        )
+        for fmt in available_formats():
+            path = f'{prefix}.{digest}.{w}w{EXTENSIONS[fmt]}'
+            if not storage.exists(path):
+                storage.save(path, ContentFile(_encode(resized, fmt)))
+            listing['variants'].setdefault(fmt, []).append([w, path])
+    return listing
+
+
+def delete_variants(listing, storage, keep=None):
+    kept = set()
+    if keep:
+        kept = {path for paths in keep['variants'].values() for _w, path in paths}
+    for paths in listing.get('variants', {}).values():
+        for _w, path in paths:
+            if path not in kept:
+                storage.delete(path)
+
+
+# Static images
+
+def build_static_variants(storage, names):
+    """
+    Build variants for the static images ``names`` inside ``storage`` (the
+    collectstatic target) and write the index. Returns the variant paths.
+    """
+    if not available_formats():
+        return []
+    index = {}
+    if storage.exists(STATIC_INDEX):
+        with storage.open(STATIC_INDEX) as f:
+            index = json.loads(f.read().decode('utf-8'))
+
+    for name in sorted(names):
+        with storage.open(name) as f:
+            data = f.read()
+        existing = index.get(name)
+        index[name] = build_variants(name, data, storage, existing=existing)
+        if existing:
+            delete_variants(existing, storage, keep=index[name])
+    for name in set(index) - set(names):
+        delete_variants(index.pop(name), storage)
+
+    if storage.exists(STATIC_INDEX):
+        storage.delete(STATIC_INDEX)
+    storage.save(STATIC_INDEX, ContentFile(json.dumps(index, sort_keys=True).encode('utf-8')))
+    static_variants.cache_clear()
+    return [path for listing in index.values() for paths in listing['variants'].values() for _w, path in paths]
+
+
+@lru_cache(maxsize=None)
+def static_variants():
+    """The collectstatic index, loaded once per process like the manifest."""
+    try:
+        with staticfiles_storage.open(STATIC_INDEX) as f:
+            return json.loads(f.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+# Uploaded images
+
+def schedule_testimonial_variants(pk):
+    """Queue variant generation for a Testimonial photo on the background worker."""
+    _executor.submit(_run_logged, process_testimonial_image, pk)
+
+
+def _run_logged(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Building responsive images failed for %r', args)
+    finally:
+        close_old_connections()
+
+
+def process_testimonial_image(pk, force=False):
+    """
+    Build (or drop) the variants of one Testimonial photo and store the
+    listing. With ``force`` a listing that is already current is checked
+    against the files on disk too. Returns True when the listing changed.
+    """
+    from .catalog import bump_version
+    from .models import Testimonial
+    from .page_cache import invalidate_page_cache
+
+    row = Testimonial.objects.filter(pk=pk).values('image', 'image_variants').first()
+    if row is None:
+        return False
+    name, existing = row['image'], row['image_variants'] or {}
+
+    if not name:
+        listing = {}
+    elif existing.get('source') == name and not force:
+        return False
+    elif Image is None or not available_formats():
+        return False
+    else:
+        with default_storage.open(name) as f:
+            listing = build_variants(name, f.read(), default_storage, existing=existing)
+
+    if listing == existing:
+        return False
+    # Only store the listing if the photo was not replaced meanwhile.
+    updated = Testimonial.objects.filter(pk=pk, image=name).update(image_variants=listing)
+    if updated:
+        delete_variants(existing, default_storage, keep=listing)
+        bump_version()
+        invalidate_page_cache()
+    else:
+        delete_variants(listing, default_storage, keep=existing)
+    return bool(updated)
@@ -0,0 +1,80 @@
+"""
+Language-switch URLs and ``hreflang`` alternates for the public pages.
+
+Django's ``translate_url()`` resolves the path and reverses it again under
+the other language on every call, and ``base.html`` calls it for each
+language in both menus. Instead, the first lookup walks the URLconf once
+and maps every path of the ``i18n_patterns`` routes that take no arguments
+to its version in each language. Any other path (one with arguments, or a
+404) goes through ``translate_url()`` once and is kept in an LRU cache, so
+every later lookup is a dictionary hit.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver, get_urlconf, reverse, translate_url
+from django.urls.resolvers import LocalePrefixPattern
+from django.utils import translation
+
+
+def _route_names(patterns, namespace=None, localized=False):
+    """Names of the argument-free routes inside ``i18n_patterns``."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            inner = namespace
+            if pattern.namespace:
+                inner = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from _route_names(
+                pattern.url_patterns, inner, localized or isinstance(pattern.pattern, LocalePrefixPattern),
+            )
+        elif isinstance(pattern, URLPattern) and localized and pattern.name:
+            if pattern.pattern.regex.groups == 0:
+                yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+@lru_cache(maxsize=None)
+def route_map(urlconf=None):
+    """``{path: {language: path}}`` for every path of the translated routes."""
+    languages = [code for code, _name in settings.LANGUAGES]
+    routes = {}
+    for name in set(_route_names(get_resolver(urlconf).url_patterns)):
+        versions = {}
+        for code in languages:
+            with translation.override(code):
+                versions[code] = reverse(name, urlconf=urlconf)
+        for path in versions.values():
+            routes[path] = versions
+    return routes
+
+
+@lru_cache(maxsize=1024)
+def _translate_path(urlconf, path, language):
+    return translate_url(path, language)
+
+
+def translate_path(path, language):
+    """``translate_url()`` for a request path, memoized."""
+    urlconf = get_urlconf()
+    versions = route_map(urlconf).get(path)
+    if versions is not None:
+        return versions.get(language, path)
+    return _translate_path(urlconf, path, language)
+
+
+def alternates(path):
+    """
+    ``{language: path}`` for the page at ``path``, or ``{}`` when it has no
+    translated versions (a 404, a page outside ``i18n_patterns``).
+    """
+    versions = route_map(get_urlconf()).get(path)
+    if versions is None:
+        versions = {code: translate_path(path, code) for code, _name in settings.LANGUAGES}
+    if len(set(versions.values())) < 2:
+        return {}
+    return versions
+
+
+def clear_caches():
+    route_map.cache_clear()
+    _translate_path.cache_clear()
@@ -0,0 +1,45 @@
+import statistics
+import timeit
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.test import RequestFactory
+from django.urls import translate_url
+
+from core import language_urls
+
+# The language menus of base.html: both languages, desktop and mobile.
+MENUS = '{% load i18n_extras %}' + '{% change_lang "en" %}{% change_lang "ar" %}' * 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the language-switch links of base.html with the memoized route map '
+        'against translate_url() on every call.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000, help='Renders per page (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        template = Template(MENUS)
+        paths = sorted(language_urls.route_map()) + ['/ar/no-such-page/']
+
+        self.stdout.write(f'{"path":<24} {"translate_url us":>17} {"memoized us":>12} {"speedup":>8}')
+        speedups = []
+        for path in paths:
+            context = Context({'request': factory.get(path)})
+            with mock.patch.object(language_urls, 'translate_path', translate_url):
+                before = self.time(template, context, options['number'])
+            after = self.time(template, context, options['number'])
+            speedups.append(before / after)
+            self.stdout.write(f'{path:<24} {before:>17.1f} {after:>12.1f} {before / after:>7.1f}x')
+        self.stdout.write(f'Median speedup of the four menu links: {statistics.median(speedups):.1f}x')
+
+    def time(self, template, context, number):
+        """Best of three, in microseconds per render of the four links."""
+        render = lambda: template.render(context)  # noqa: E731
+        render()
+        return min(timeit.repeat(render, number=number, repeat=3)) / number * 1e6
@@ -0,0 +1,363 @@
+"""
+Load benchmark of every public route in both languages.
+
+Each route of ``core.urls`` is requested under every language prefix
+(``/``, ``/ar/``), GETs and form POSTs alike; the order form is also posted
+with attachments of several sizes. By default the requests go through the
+WSGI handler in this process, which also counts the SQL queries of each
+request; with ``--url`` they go over HTTP to a running server instead,
+e.g. ``gunicorn academiq.wsgi`` on a local port. ``--concurrency`` clients
+run in parallel threads.
+
+For every route the report gives the p50/p95/p99 latency, throughput,
+queries and bytes per request and the peak RSS (of this process, or of
+``--server-pid``). ``--save`` writes the results as a JSON baseline and
+``--baseline`` compares a run against one, failing on a regression.
+
+Rows created by the POSTs are deleted afterwards, which assumes that a
+server given with ``--url`` uses the same database. The submission
+throttle is switched off in-process; start a server given with ``--url``
+with ``DJANGO_THROTTLE=False``, or the POSTs soon get ``429``.
+"""
+
+import http.cookiejar
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from core import urls as core_urls
+from core.models import ContactMessage, OrderRequest, OutboundEmail
+
+CONTACT_FORM = {
+    'full_name': 'Benchmark Client', 'email': 'benchmark@example.com', 'subject': 'Benchmark',
+    'service_type': 'general', 'message': 'Benchmark submission of the contact form.',
+}
+ORDER_FORM = {
+    'full_name': 'Benchmark Client', 'email': 'benchmark@example.com', 'phone': '+1234567890',
+    'service_type': 'thesis', 'message': 'Benchmark submission of the order form.',
+}
+FORMS = {'contact': CONTACT_FORM, 'order': ORDER_FORM}
+ATTACHMENT_SIZES = [('10 KB', 10 * 1024), ('1 MB', 1024 * 1024), ('10 MB', 10 * 1024 * 1024)]
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+CLEANED_MODELS = (ContactMessage, OrderRequest, OutboundEmail)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def attachment(size):
+    """A PDF-looking file of ``size`` bytes, unique per request like real uploads."""
+    header, tail = b'%PDF-1.4\n', uuid.uuid4().hex.encode('ascii')
+    return header + os.urandom(size - len(header) - len(tail)) + tail
+
+
+class Route:
+
+    def __init__(self, method, path, form=None, attachment_size=None, size_label=''):
+        self.method = method
+        self.path = path
+        self.form = form
+        self.attachment_size = attachment_size
+        self.label = f'{method} {path}' + (f' ({size_label})' if size_label else '')
+
+    def data(self):
+        data = dict(FORMS[self.form]) if self.form else {}
+        if self.attachment_size:
+            data['attachment'] = ('benchmark.pdf', attachment(self.attachment_size))
+        return data
+
+
+class InProcessTarget:
+    """Requests through Django's WSGI handler in this process, one test client per thread."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def request(self, route):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST='localhost')
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        data = route.data()
+        if 'attachment' in data:
+            name, content = data['attachment']
+            data['attachment'] = SimpleUploadedFile(name, content, content_type='application/pdf')
+        # The test client skips the request signals that recycle connections.
+        close_old_connections()
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            response = client.post(route.path, data) if route.method == 'POST' else client.get(route.path)
+            elapsed = time.perf_counter() - started
+        size = len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.items())
+        return response.status_code, elapsed, size, queries
+
+    def peak_rss(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class HttpTarget:
+    """Requests over HTTP to ``base_url``, one cookie jar per thread."""
+
+    def __init__(self, base_url, server_pid=None):
+        self.base_url = base_url.rstrip('/')
+        self.server_pid = server_pid
+        self.local = threading.local()
+
+    def opener(self):
+        opener = getattr(self.local, 'opener', None)
+        if opener is None:
+            opener = self.local.opener = urllib.request.build_opener(
+                urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirect(),
+            )
+        return opener
+
+    def request(self, route):
+        url = self.base_url + route.path
+        body = headers = None
+        if route.method == 'POST':
+            # A real browser has loaded the form, and its CSRF token, first.
+            with self.opener().open(url) as page:
+                token = CSRF_INPUT_RE.search(page.read().decode('utf-8'))
+            data = route.data()
+            data['csrfmiddlewaretoken'] = token.group(1) if token else ''
+            body, content_type = self.encode_multipart(data)
+            headers = {'Content-Type': content_type, 'Referer': url}
+        request = urllib.request.Request(url, data=body, headers=headers or {}, method=route.method)
+        started = time.perf_counter()
+        try:
+            with self.opener().open(request) as response:
+                content = response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            content, status, response_headers = exc.read(), exc.code, exc.headers
+        elapsed = time.perf_counter() - started
+        size = len(content) + sum(len(k) + len(v) + 4 for k, v in response_headers.items())
+        return status, elapsed, size, None
+
+    def encode_multipart(self, data):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in data.items():
+            if isinstance(value, tuple):
+                filename, content = value
+                parts.append(
+                    f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: application/pdf\r\n\r\n'.encode('utf-8') + content + b'\r\n'
+                )
+            else:
+                parts.append(
+                    f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+                    .encode('utf-8')
+                )
+        parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+        return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+    def peak_rss(self):
+        if not self.server_pid:
+            return None
+        try:
+            with open(f'/proc/{self.server_pid}/status') as status:
+                for line in status:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            return None
+        return None
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Time the POST itself; its 302 to the success page is the expected answer."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every public route under each language prefix, in-process or over HTTP, '
+        'and compare against a saved JSON baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per route (default: %(default)s)')
+        parser.add_argument(
+            '--post-requests', type=int, default=50,
+            help='Timed requests per form POST route (default: %(default)s)',
+        )
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per route (default: %(default)s)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients (default: %(default)s)')
+        parser.add_argument('--url', help='Benchmark a running server at this base URL instead of in-process')
+        parser.add_argument('--server-pid', type=int, help='With --url, report the peak RSS of this process')
+        parser.add_argument('--no-posts', action='store_true', help='Only benchmark the GET routes')
+        parser.add_argument('--routes', help='Only routes whose label contains this text')
+        parser.add_argument('--save', metavar='PATH', help='Write the results as a JSON baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='Fail if this run regressed against PATH')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed slowdown or growth against the baseline, as a fraction (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--slack-ms', type=float, default=1.0,
+            help='Latency difference always tolerated, for sub-millisecond routes (default: %(default)s)',
+        )
+
+    # In-process POSTs all come from one address; see core.throttle.
+    @override_settings(THROTTLE_ENABLED=False)
+    def handle(self, *args, **options):
+        target = HttpTarget(options['url'], options['server_pid']) if options['url'] else InProcessTarget()
+        routes = self.routes(options)
+        if not routes:
+            raise CommandError('No route matches --routes.')
+        baseline = self.load_baseline(options['baseline']) if options['baseline'] else None
+        last_pks = {model: model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+                    for model in CLEANED_MODELS}
+
+        self.stdout.write(
+            f'{"route":<34} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>8} {"queries":>8} '
+            f'{"KB":>8} {"RSS MB":>8} {"errors":>7}'
+        )
+        results = {}
+        try:
+            for route in routes:
+                count = options['post_requests'] if route.method == 'POST' else options['requests']
+                results[route.label] = result = self.run_route(
+                    target, route, count, options['warmup'], options['concurrency'],
+                )
+                self.stdout.write(self.format_row(route.label, result))
+        finally:
+            if not options['no_posts']:
+                self.cleanup(last_pks)
+
+        report = {
+            'meta': {
+                'mode': options['url'] or 'in-process',
+                'concurrency': options['concurrency'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'created_at': timezone.now().isoformat(),
+            },
+            'routes': results,
+        }
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(f'Saved the results to {options["save"]}')
+        if baseline is not None:
+            self.compare(results, baseline, options['tolerance'], options['slack_ms'])
+
+    def routes(self, options):
+        routes = []
+        for code, _name in settings.LANGUAGES:
+            with translation.override(code):
+                for pattern in core_urls.urlpatterns:
+                    path = reverse(pattern.name)
+                    routes.append(Route('GET', path))
+                    if options['no_posts'] or pattern.name not in FORMS:
+                        continue
+                    routes.append(Route('POST', path, pattern.name))
+                    if pattern.name == 'order':
+                        routes.extend(
+                            Route('POST', path, 'order', size, label) for label, size in ATTACHMENT_SIZES
+                        )
+        if options['routes']:
+            routes = [route for route in routes if options['routes'] in route.label]
+        return routes
+
+    def run_route(self, target, route, count, warmup, concurrency):
+        expected = 302 if route.method == 'POST' else 200
+        for _ in range(warmup):
+            target.request(route)
+
+        def run(share):
+            try:
+                return [target.request(route) for _ in range(share)]
+            finally:
+                connections.close_all()
+
+        shares = [count // concurrency + (1 if i < count % concurrency else 0) for i in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = [sample for batch in pool.map(run, shares) for sample in batch]
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed * 1000 for _status, elapsed, _size, _queries in samples)
+        queries = [q for _status, _elapsed, _size, q in samples if q is not None]
+        rss = target.peak_rss()
+        return {
+            'requests': len(samples),
+            'errors': sum(status != expected for status, _elapsed, _size, _queries in samples),
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'requests_per_second': round(len(samples) / wall, 1),
+            'queries': round(statistics.mean(queries), 2) if queries else None,
+            'bytes': round(statistics.mean(size for _status, _elapsed, size, _queries in samples)),
+            'peak_rss_mb': round(rss, 1) if rss is not None else None,
+        }
+
+    def format_row(self, label, result):
+        def cell(value, spec):
+            return format(value, spec) if value is not None else format('-', '>' + spec.split('.')[0])
+        return (
+            f'{label:<34} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} {result["p99_ms"]:>8.2f} '
+            f'{result["requests_per_second"]:>8.1f} {cell(result["queries"], "8.1f")} '
+            f'{result["bytes"] / 1024:>8.1f} {cell(result["peak_rss_mb"], "8.1f")} {result["errors"]:>7}'
+        )
+
+    def load_baseline(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)['routes']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'Cannot read the baseline {path}: {exc}')
+
+    def compare(self, results, baseline, tolerance, slack_ms):
+        regressions = []
+        for label, result in results.items():
+            before = baseline.get(label)
+            if before is None:
+                continue
+            if result['p95_ms'] > before['p95_ms'] * (1 + tolerance) + slack_ms:
+                regressions.append(f'{label}: p95 {before["p95_ms"]:.2f} -> {result["p95_ms"]:.2f} ms')
+            if result['queries'] is not None and before.get('queries') is not None \
+                    and result['queries'] > before['queries']:
+                regressions.append(f'{label}: queries {before["queries"]} -> {result["queries"]}')
+            if result['bytes'] > before['bytes'] * (1 + tolerance):
+                regressions.append(f'{label}: bytes {before["bytes"]} -> {result["bytes"]}')
+            if result['errors'] > before.get('errors', 0):
+                regressions.append(f'{label}: errors {before.get("errors", 0)} -> {result["errors"]}')
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'  {line}'))
+            raise CommandError(f'{len(regressions)} regression(s) against the baseline.')
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def cleanup(self, last_pks):
+        """Delete the submissions the POSTs created; attachments are released by the delete signals."""
+        for model, last_pk in last_pks.items():
+            model.objects.filter(pk__gt=last_pk).delete()
@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from core import search
+from core.models import ContactMessage, OrderRequest
+
+WORDS = (
+    'thesis methodology chapter literature review regression variance sample survey '
+    'translation manuscript journal citation formatting appendix hypothesis dataset '
+    'qualitative quantitative interview analysis deadline supervisor abstract conclusion'
+).split()
+SYLLABLES = ['ka', 'ri', 'mo', 'ten', 'sal', 'du', 'ver', 'lo', 'qua', 'nes', 'bar', 'ti', 'zen', 'pha', 'gor']
+NAMES = ['Ahmed', 'Sara', 'Omar', 'Layla', 'John', 'Maria', 'Yusuf', 'Fatima', 'David', 'Noura']
+TERMS = ['regression', 'supervisor deadline', 'metho', 'fatima', 'sara3@example', 'nonexistentword']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare admin search latency of the FTS5 index against the icontains scan. '
+        'Synthetic rows are inserted in a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Synthetic rows per model (default: %(default)s)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per search term (default: %(default)s)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not (search.fts_available(ContactMessage) and search.fts_available(OrderRequest)):
+            raise CommandError('FTS5 search indexes are missing; run manage.py migrate on SQLite.')
+        self.random = random.Random(options['seed'])
+        # Filler vocabulary, so the domain words above are as selective as
+        # they are in real messages.
+        self.filler = [
+            ''.join(self.random.choice(SYLLABLES) for _ in range(self.random.randint(2, 4)))
+            for _ in range(20000)
+        ]
+        self.factory = RequestFactory()
+        self.user = get_user_model()(username='benchmark', is_staff=True, is_superuser=True, is_active=True)
+
+        with transaction.atomic():
+            for model in (ContactMessage, OrderRequest):
+                started = time.perf_counter()
+                self.populate(model, options['rows'])
+                self.stdout.write(
+                    f'Inserted {options["rows"]} {model._meta.verbose_name_plural} '
+                    f'in {time.perf_counter() - started:.1f}s (index maintained by triggers)'
+                )
+            for model in (ContactMessage, OrderRequest):
+                self.compare(model, options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write('Synthetic rows rolled back.')
+
+    def populate(self, model, count):
+        rows = []
+        for i in range(count):
+            name = self.random.choice(NAMES)
+            text = ' '.join(
+                self.random.choice(WORDS) if self.random.random() < 0.02 else self.random.choice(self.filler)
+                for _ in range(self.random.randint(20, 80))
+            )
+            fields = {
+                'full_name': f'{name} {self.random.choice(NAMES)}son',
+                'email': f'{name.lower()}{i}@example.com',
+                'message': text,
+            }
+            if model is ContactMessage:
+                fields['subject'] = ' '.join(self.random.sample(WORDS, 4))
+            else:
+                fields['phone'] = '+1234567890'
+            rows.append(model(**fields))
+            if len(rows) == 5000:
+                model.objects.bulk_create(rows)
+                rows = []
+        model.objects.bulk_create(rows)
+
+    def compare(self, model, repeat):
+        model_admin = admin.site._registry[model]
+        self.stdout.write(f'\n{model._meta.verbose_name_plural} ({model.objects.count()} rows)')
+        self.stdout.write(f'{"term":<22} {"icontains ms":>14} {"fts5 ms":>10} {"speedup":>8} {"hits":>8}')
+        for term in TERMS:
+            with mock.patch.object(search, 'fts_available', return_value=False):
+                scan_ms, scan_hits = self.time_changelist(model_admin, term, repeat)
+            fts_ms, fts_hits = self.time_changelist(model_admin, term, repeat)
+            self.stdout.write(
+                f'{term:<22} {scan_ms:>14.1f} {fts_ms:>10.1f} {scan_ms / fts_ms:>7.1f}x {fts_hits:>8}'
+                + ('' if scan_hits == fts_hits else f'  (icontains: {scan_hits})')
+            )
+
+    def time_changelist(self, model_admin, term, repeat):
+        """Median time to build the first changelist page, as the admin does."""
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            request = self.factory.get('/', {'q': term})
+            request.user = self.user
+            started = time.perf_counter()
+            changelist = model_admin.get_changelist_instance(request)
+            list(changelist.result_list)
+            timings.append((time.perf_counter() - started) * 1000)
+            hits = changelist.result_count
+        connection.queries_log.clear()
+        return statistics.median(timings), hits
@@ -0,0 +1,89 @@
+"""
+Database writes caused by anonymous page views.
+
+Requests every page of ``core.urls`` in every language as an anonymous
+visitor, twice: once as a first visit and once more with the cookies the
+first visit set, like a visitor clicking around. Each statement is counted
+as a read or a write. The same requests are made with the old session
+setup (CSRF token in the session, session saved on every request) for
+comparison, inside a transaction that is rolled back afterwards. The
+command fails if the current setup writes anything.
+"""
+
+import statistics
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from core import urls as core_urls
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+LEGACY = {
+    'CSRF_USE_SESSIONS': True,
+    'SESSION_SAVE_EVERY_REQUEST': True,
+    'MIDDLEWARE': [name for name in settings.MIDDLEWARE if name != 'core.middleware.SessionRefreshMiddleware'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Count the database reads and writes of anonymous GETs of the public pages, '
+        'with the current and the old session setup.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--visits', type=int, default=5, help='Visitors per setup, each viewing every page twice '
+            '(default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{len(self.paths())} pages x 2 views x {options["visits"]} visitors\n'
+            f'{"setup":<10} {"requests":>9} {"reads":>7} {"writes":>7} {"sessions":>9} {"p50 ms":>8}'
+        )
+        with transaction.atomic():
+            writes = self.run_setup('current', {}, options['visits'])
+            self.run_setup('legacy', LEGACY, options['visits'])
+            transaction.set_rollback(True)
+        if writes:
+            raise CommandError(f'Anonymous page views wrote to the database {writes} time(s).')
+        self.stdout.write(self.style.SUCCESS('Anonymous page views make no database writes.'))
+
+    def paths(self):
+        paths = []
+        for code, _name in settings.LANGUAGES:
+            with translation.override(code):
+                paths.extend(reverse(pattern.name) for pattern in core_urls.urlpatterns)
+        return paths
+
+    def run_setup(self, label, overrides, visits):
+        counts = Counter()
+        timings = []
+
+        def count(execute, sql, params, many, context):
+            counts['writes' if sql.lstrip().upper().startswith(WRITES) else 'reads'] += 1
+            return execute(sql, params, many, context)
+
+        with override_settings(**overrides), connection.execute_wrapper(count):
+            sessions = set()
+            for _ in range(visits):
+                client = Client(HTTP_HOST='localhost')
+                for path in self.paths():
+                    for _view in range(2):
+                        started = time.perf_counter()
+                        client.get(path)
+                        timings.append((time.perf_counter() - started) * 1000)
+                if settings.SESSION_COOKIE_NAME in client.cookies:
+                    sessions.add(client.cookies[settings.SESSION_COOKIE_NAME].value)
+        self.stdout.write(
+            f'{label:<10} {len(timings):>9} {counts["reads"]:>7} {counts["writes"]:>7} {len(sessions):>9} '
+            f'{statistics.median(timings):>8.2f}'
+        )
+        return counts['writes']
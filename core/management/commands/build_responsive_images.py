@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import images
+from core.models import Testimonial
+
+
+class Command(BaseCommand):
+    help = 'Build responsive variants for Testimonial photos that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Also re-check photos that already have variants and rebuild missing files',
+        )
+
+    def handle(self, *args, **options):
+        if not images.available_formats():
+            raise CommandError('Pillow is not installed or supports none of RESPONSIVE_IMAGE_FORMATS.')
+        self.stdout.write(f"Formats: {', '.join(images.available_formats())}")
+
+        updated = 0
+        for pk, name in Testimonial.objects.values_list('pk', 'image').order_by('pk'):
+            try:
+                changed = images.process_testimonial_image(pk, force=options['force'])
+            except (OSError, ValueError) as exc:
+                self.stderr.write(f'Testimonial {pk} ({name}): {exc}')
+                continue
+            if changed:
+                updated += 1
+                self.stdout.write(f'  Testimonial {pk}: {name or "photo removed"}')
+        self.stdout.write(self.style.SUCCESS(f'{updated} testimonial(s) updated'))
@@ -0,0 +1,130 @@
+import difflib
+import os
+import re
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import utility_css
+
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.DOTALL)
+ADD_CLASS_RE = re.compile(r'add_class:(["\'])(.*?)\1')
+CLASS_LIST_RE = re.compile(r'classList\.(?:add|remove|toggle)\(([^)]*)\)')
+QUERY_CLASS_RE = re.compile(r'querySelector(?:All)?\(\s*[\'"]\.([\w-]+)')
+STRING_RE = re.compile(r'[\'"]([^\'"]+)[\'"]')
+TEMPLATE_TAG_RE = re.compile(r'\{%.*?%\}|\{\{.*?\}\}|\{#.*?#\}', re.DOTALL)
+CSS_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+
+# Admin templates are styled by the admin's own stylesheets, not utilities.css.
+SKIPPED_TEMPLATE_DIRS = {'admin'}
+
+# Marker classes with no styles of their own. The prose classes belong to the
+# typography plugin, which the runtime script never loaded either.
+NON_UTILITY_CLASSES = {'group', 'prose', 'prose-lg', 'dark:prose-invert'}
+FONT_AWESOME_RE = re.compile(r'^(fa|fas|far|fab|fa-[\w-]+)$')
+
+
+class Command(BaseCommand):
+    help = 'Generate static/css/utilities.css from the utility classes used in templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if a class is not covered or the stylesheet on disk is out of date',
+        )
+
+    def handle(self, *args, **options):
+        static_dir = os.path.join(settings.BASE_DIR, 'static')
+        output = os.path.join(static_dir, *settings.UTILITY_CSS_PATH.split('/'))
+
+        used, hooks = self.collect_classes(static_dir)
+        project = self.project_classes(static_dir)
+        css, unknown = utility_css.generate(used)
+
+        uncovered = sorted(
+            name for name in unknown
+            if name not in NON_UTILITY_CLASSES and name not in project
+            and name not in hooks and not FONT_AWESOME_RE.match(name)
+        )
+        for name in uncovered:
+            self.stderr.write(f"{name}  (used in {', '.join(sorted(used[name]))})")
+
+        if options['check']:
+            current = ''
+            if os.path.exists(output):
+                with open(output, encoding='utf-8') as f:
+                    current = f.read()
+            stale = current != css
+            if stale:
+                sys.stdout.writelines(difflib.unified_diff(
+                    current.splitlines(True), css.splitlines(True),
+                    settings.UTILITY_CSS_PATH, settings.UTILITY_CSS_PATH + ' (regenerated)',
+                ))
+            if uncovered or stale:
+                raise CommandError(
+                    f'{len(uncovered)} uncovered class(es); stylesheet '
+                    f'{"is out of date" if stale else "is up to date"}. '
+                    'Run manage.py build_utility_css.'
+                )
+            self.stdout.write(self.style.SUCCESS(f'{len(used)} classes covered'))
+            return
+
+        if uncovered:
+            raise CommandError(f'{len(uncovered)} class(es) are not supported by core.utility_css')
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(css)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {settings.UTILITY_CSS_PATH} ({len(css)} bytes, {len(used) - len(unknown)} utilities)'
+        ))
+
+    def collect_classes(self, static_dir):
+        """
+        Return ``(used, hooks)``: every class name found in templates and
+        scripts mapped to the files using it, and the classes scripts only
+        look elements up by.
+        """
+        used = {}
+        hooks = set()
+
+        def add(names, source):
+            for name in names:
+                used.setdefault(name, set()).add(source)
+
+        sources = []
+        for engine in settings.TEMPLATES:
+            for directory in engine.get('DIRS', []):
+                for root, dirs, files in os.walk(directory):
+                    if root == str(directory):
+                        dirs[:] = [d for d in dirs if d not in SKIPPED_TEMPLATE_DIRS]
+                    sources.extend(os.path.join(root, f) for f in files if f.endswith('.html'))
+        for root, _dirs, files in os.walk(os.path.join(static_dir, 'js')):
+            sources.extend(os.path.join(root, f) for f in files if f.endswith('.js'))
+
+        for path in sorted(sources):
+            label = os.path.relpath(path, settings.BASE_DIR)
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+            for match in CLASS_ATTR_RE.finditer(content):
+                # Keep the classes from every {% if %} branch.
+                add(TEMPLATE_TAG_RE.sub(' ', match.group(2)).split(), label)
+            for match in ADD_CLASS_RE.finditer(content):
+                add(match.group(2).split(), label)
+            for match in CLASS_LIST_RE.finditer(content):
+                for literal in STRING_RE.findall(match.group(1)):
+                    add(literal.split(), label)
+            hooks.update(QUERY_CLASS_RE.findall(content))
+        return used, hooks
+
+    def project_classes(self, static_dir):
+        """Classes styled by the hand-written project stylesheets."""
+        classes = set()
+        css_dir = os.path.join(static_dir, 'css')
+        generated = os.path.basename(settings.UTILITY_CSS_PATH)
+        for filename in os.listdir(css_dir):
+            if filename.endswith('.css') and filename != generated:
+                with open(os.path.join(css_dir, filename), encoding='utf-8') as f:
+                    css = re.sub(r'/\*.*?\*/', '', f.read(), flags=re.DOTALL)
+                classes.update(CSS_CLASS_RE.findall(css))
+        return classes
@@ -0,0 +1,48 @@
+"""
+Query-plan regression check on the configured database.
+
+Runs the checks of ``core.query_plans`` (every public page, both forms and
+every admin changelist of the core models, with synthetic rows in a
+transaction that is rolled back afterwards) and fails when a plan scans a
+table without an index or sorts through a temporary B-tree. The same
+checks run as test cases in ``core.tests``.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        'Fail if a query of the public views or the admin changelists scans a table '
+        'or sorts with a temporary B-tree (SQLite EXPLAIN QUERY PLAN).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every statement')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN checks need the SQLite database.')
+
+        with transaction.atomic():
+            query_plans.populate()
+            plans = query_plans.run()
+            transaction.set_rollback(True)
+
+        failures = 0
+        for plan in plans:
+            if plan.problems:
+                failures += 1
+            if plan.problems or options['verbose_plans']:
+                style = self.style.ERROR if plan.problems else self.style.SQL_FIELD
+                self.stdout.write(style(f'{plan.scenario}: {plan.sql}'))
+                for step in plan.steps:
+                    self.stdout.write(f'    {step}')
+
+        self.stdout.write(f'{len(plans)} distinct statements explained.')
+        if failures:
+            raise CommandError(f'{failures} statement(s) scan a table or sort with a temporary B-tree.')
+        self.stdout.write(self.style.SUCCESS('Every plan uses an index.'))
@@ -0,0 +1,54 @@
+"""
+Bytes saved on each public page by HTML minification and compression.
+
+Renders every public route in each language once, as an anonymous
+visitor, and prints its size as rendered, minified, gzipped and (with
+Brotli installed) Brotli-compressed, as ``HTMLCompressionMiddleware``
+would send it. Live totals per URL name are in the
+``academiq_html_bytes_total`` metric at ``/metrics``.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from core import compression, urls as core_urls
+
+
+class Command(BaseCommand):
+    help = 'Print the size of each public page as rendered, minified and compressed.'
+
+    def handle(self, *args, **options):
+        encodings = list(reversed(compression.ENCODINGS))
+        self.stdout.write(
+            f'{"route":<26} {"KB":>8} {"minified":>9}'
+            + ''.join(f' {encoding:>8}' for encoding in encodings)
+            + f' {"saved":>7}'
+        )
+        totals = [0] * (2 + len(encodings))
+        client = Client(HTTP_HOST='localhost')
+        with override_settings(PAGE_CACHE_ENABLED=False, HTML_MINIFY=False):
+            for code, _name in settings.LANGUAGES:
+                with translation.override(code):
+                    paths = [reverse(pattern.name) for pattern in core_urls.urlpatterns]
+                for path in paths:
+                    response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+                    body = response.content
+                    with override_settings(HTML_MINIFY=True):
+                        minified, _ = compression.process(body, response.charset, None, memoize=False)
+                    sizes = [len(body), len(minified)] + [
+                        len(compression.encode(minified, encoding)) for encoding in encodings
+                    ]
+                    totals = [total + size for total, size in zip(totals, sizes)]
+                    self.stdout.write(self.format_row(path, sizes))
+        self.stdout.write(self.format_row('total', totals))
+
+    def format_row(self, label, sizes):
+        saved = 1 - min(sizes[1:]) / sizes[0] if sizes[0] else 0
+        return (
+            f'{label:<26} {sizes[0] / 1024:>8.1f} {sizes[1] / 1024:>9.1f}'
+            + ''.join(f' {size / 1024:>8.1f}' for size in sizes[2:])
+            + f' {saved:>7.0%}'
+        )
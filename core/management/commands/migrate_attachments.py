@@ -0,0 +1,84 @@
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import AttachmentBlob, OrderRequest
+from core.storage import ContentAddressedStorage
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
+        size /= 1024
+
+
+class Command(BaseCommand):
+    help = 'Move existing order attachments into the content-addressed store and report the space saved'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the files that would be converted')
+        parser.add_argument('--keep-originals', action='store_true', help='Do not delete the converted files')
+
+    def handle(self, *args, **options):
+        storage = OrderRequest._meta.get_field('attachment').storage
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError('OrderRequest.attachment does not use ContentAddressedStorage.')
+        legacy = FileSystemStorage(location=storage.location)
+
+        rows = [
+            (pk, name) for pk, name in
+            OrderRequest.objects.exclude(attachment='').exclude(attachment__isnull=True)
+            .values_list('pk', 'attachment').order_by('pk')
+            if storage.blob_key(name) is None
+        ]
+        blobs_before = set(AttachmentBlob.objects.values_list('key', flat=True))
+        converted = missing = 0
+        original_bytes = 0
+        originals = set()
+
+        for pk, name in rows:
+            if not legacy.exists(name):
+                self.stderr.write(f'  Order {pk}: {name} is missing, skipped')
+                missing += 1
+                continue
+            original_bytes += legacy.size(name)
+            if options['dry_run']:
+                self.stdout.write(f'  Order {pk}: {name}')
+                continue
+            with legacy.open(name) as f, transaction.atomic():
+                new_name = storage.save(name, f, max_length=OrderRequest._meta.get_field('attachment').max_length)
+                # update() keeps updated_at untouched.
+                OrderRequest.objects.filter(pk=pk).update(attachment=new_name)
+            originals.add(name)
+            converted += 1
+            self.stdout.write(f'  Order {pk}: {name} -> {new_name}')
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(rows) - missing} file(s), {format_bytes(original_bytes)} would be converted')
+            return
+
+        if not options['keep_originals']:
+            for name in originals:
+                legacy.delete(name)
+                self._prune_empty_dirs(legacy, os.path.dirname(name))
+
+        new_blobs = AttachmentBlob.objects.exclude(key__in=blobs_before)
+        stored_bytes = sum(new_blobs.values_list('stored_size', flat=True))
+        saved = original_bytes - stored_bytes
+        ratio = saved / original_bytes if original_bytes else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Converted {converted} file(s) ({missing} missing): {format_bytes(original_bytes)} -> '
+            f'{format_bytes(stored_bytes)} in {new_blobs.count()} new blob(s), saved {format_bytes(saved)} ({ratio:.1%})'
+        ))
+
+    def _prune_empty_dirs(self, legacy, directory):
+        while directory:
+            path = legacy.path(directory)
+            try:
+                os.rmdir(path)
+            except OSError:
+                return
+            directory = os.path.dirname(directory)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from core.page_cache import get_page_cache_stats, invalidate_page_cache, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show page cache hit/miss counters, or clear the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Invalidate every cached page')
+        parser.add_argument('--reset-stats', action='store_true', help='Reset the hit/miss counters')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            invalidate_page_cache()
+            self.stdout.write(self.style.SUCCESS('Page cache invalidated'))
+        if options['reset_stats']:
+            reset_page_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Page cache counters reset'))
+
+        stats = get_page_cache_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} ratio={stats['ratio']:.2%}"
+        )
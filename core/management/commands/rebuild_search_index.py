@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import search
+from core.models import ContactMessage, OrderRequest
+
+
+class Command(BaseCommand):
+    help = 'Rebuild and optimize the FTS5 admin search indexes from their tables'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Full-text search indexes are only used with SQLite.')
+        for model in (ContactMessage, OrderRequest):
+            if not search.fts_available(model):
+                raise CommandError(f'{search.fts_table(model)} does not exist; run manage.py migrate.')
+            table = search.fts_table(model)
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+                cursor.execute(f'SELECT COUNT(*) FROM {table}')
+                count = cursor.fetchone()[0]
+            self.stdout.write(f'{table}: {count} rows indexed')
+        self.stdout.write(self.style.SUCCESS('Search indexes rebuilt'))
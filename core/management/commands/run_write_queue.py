@@ -0,0 +1,44 @@
+import os
+import socket
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.submissions import save_submission
+from core.writequeue import WriteQueueServer
+
+
+class Command(BaseCommand):
+    help = 'Save contact and order submissions from all web workers through one batching writer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket', default=settings.WRITE_QUEUE_SOCKET,
+            help='Unix socket to listen on (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.WRITE_QUEUE_BATCH_SIZE,
+            help='Most submissions per transaction (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--max-wait', type=float, default=settings.WRITE_QUEUE_MAX_WAIT,
+            help='Seconds a batch waits for more submissions (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['socket']
+        if os.path.exists(path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(path) == 0:
+                    raise CommandError(f'A write queue is already listening on {path}')
+            os.unlink(path)  # left behind by a writer that was killed
+        server = WriteQueueServer(path, save_submission, options['batch_size'], options['max_wait'])
+        self.stdout.write(f'Write queue listening on {path}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.unlink(path)
+        self.stdout.write(f'Wrote {server.written} submissions in {server.batches} transactions')
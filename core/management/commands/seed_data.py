@@ -1,11 +1,124 @@
-from django.core.management.base import BaseCommand
-from core.models import Service, Testimonial
+import random
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from django.utils.text import slugify
 
+from core.catalog import bump_version
+from core.models import AttachmentBlob, ContactMessage, OrderRequest, Service, Testimonial
+from core.page_cache import invalidate_page_cache
+from core.storage import attachment_storage
+
+FIRST_NAMES = [
+    'Ahmed', 'Sara', 'Omar', 'Layla', 'John', 'Maria', 'Yusuf', 'Fatima', 'David', 'Noura',
+    'Emily', 'Khalid', 'Hana', 'Lucas', 'Mona', 'Ali', 'Chen', 'Amira', 'Daniel', 'Reem',
+]
+LAST_NAMES = [
+    'Al-Farsi', 'Haddad', 'Roberts', 'Garcia', 'Nasser', 'Khan', 'Smith', 'Mansour', 'Ibrahim',
+    'Wang', 'Saleh', 'Brown', 'Odeh', 'Rahman', 'Jaber', 'Lopez',
+]
+INSTITUTIONS = [
+    'Stanford University', 'Oxford University', 'MIT', 'King Saud University', 'Cairo University',
+    'University of Jordan', 'ETH Zurich', 'University of Toronto', 'Qatar University', '',
+]
+TITLES = ['PhD Candidate', "Master's Student", 'Assistant Professor', 'Senior Researcher', 'Lecturer']
+WORDS = (
+    'thesis methodology chapter literature review regression variance sample survey translation '
+    'manuscript journal citation formatting appendix hypothesis dataset qualitative quantitative '
+    'interview analysis deadline supervisor abstract conclusion results discussion model data '
+    'please help with my the and for a of in on need by next week draft final version'
+).split()
+# Weights follow what the live site sees: theses and statistics dominate.
+ORDER_SERVICES = [('thesis', 35), ('statistics', 25), ('review', 15), ('translation', 15), ('formatting', 10)]
+CONTACT_SERVICES = [('general', 40)] + ORDER_SERVICES
+# Recent orders are still open; older ones are almost all settled.
+RECENT_STATUSES = [('pending', 40), ('in_progress', 35), ('completed', 20), ('cancelled', 5)]
+SETTLED_STATUSES = [('completed', 85), ('cancelled', 10), ('in_progress', 4), ('pending', 1)]
+RECENT = timedelta(days=60)
+ATTACHMENTS = [
+    ('proposal.txt', 'Research proposal\n\n' + 'Background and objectives of the study. ' * 200),
+    ('data.csv', 'id,group,score\n' + ''.join(f'{i},{i % 3},{i * 7 % 100}\n' for i in range(2000))),
+    ('chapter-2.rtf', '{\\rtf1 Literature review draft. ' + 'Prior work on the topic. ' * 300 + '}'),
+]
+
+
+def weighted(choices):
+    """``[(value, weight), ...]`` as the ``(population, weights)`` of ``random.choices``."""
+    values, weights = zip(*choices)
+    return list(values), list(weights)
+
+
+ORDER_SERVICE_MIX = weighted(ORDER_SERVICES)
+CONTACT_SERVICE_MIX = weighted(CONTACT_SERVICES)
+RECENT_STATUS_MIX = weighted(RECENT_STATUSES)
+SETTLED_STATUS_MIX = weighted(SETTLED_STATUSES)
+
+
 class Command(BaseCommand):
-    help = 'Seed the database with sample premium academic data'
+    help = (
+        'Seed the database with sample premium academic data; with --orders, --contacts, '
+        '--testimonials or --services, also bulk-generate that many synthetic rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=0, help='Synthetic order requests to generate')
+        parser.add_argument('--contacts', type=int, default=0, help='Synthetic contact messages to generate')
+        parser.add_argument('--testimonials', type=int, default=0, help='Synthetic testimonials to generate')
+        parser.add_argument('--services', type=int, default=0, help='Synthetic services to generate')
+        parser.add_argument(
+            '--years', type=float, default=3, help='Spread created_at over this many years up to today '
+            '(default: %(default)s)',
+        )
+        parser.add_argument(
+            '--attachments', type=float, default=0.0,
+            help='Fraction of orders given one of a few dummy attachments (default: %(default)s)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default: %(default)s)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT (default: %(default)s)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=50_000, help='Rows per transaction (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        self.seed_samples()
+        self.stdout.write(self.style.SUCCESS('Successfully seeded ACADEMIQ sample data'))
+
+        volumes = [
+            (Service, options['services'], self.build_service),
+            (Testimonial, options['testimonials'], self.build_testimonial),
+            (ContactMessage, options['contacts'], self.build_contact),
+            (OrderRequest, options['orders'], self.build_order),
+        ]
+        if not any(count for _model, count, _build in volumes):
+            return
+        if not 0 <= options['attachments'] <= 1:
+            raise CommandError('--attachments is a fraction between 0 and 1.')
+
+        self.options = options
+        # Midnight today, so a given --seed always produces the same rows on the same day.
+        self.end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=365.25 * options['years'])
+        self.attachment_names = self.store_attachments() if options['orders'] and options['attachments'] else []
+        self.attachment_refs = {}
+
+        for model, count, build in volumes:
+            if count:
+                self.generate(model, count, build)
+        if self.attachment_refs:
+            self.add_attachment_references()
+        if options['services'] or options['testimonials']:
+            # bulk_create sends no post_save; refresh the public pages by hand.
+            bump_version()
+            invalidate_page_cache()
 
-    def handle(self, *args, **kwargs):
+    def seed_samples(self):
         # Clear existing
         # Service.objects.all().delete()
         # Testimonial.objects.all().delete()
@@ -92,4 +205,125 @@ class Command(BaseCommand):
                 }
             )
 
-        self.stdout.write(self.style.SUCCESS('Successfully seeded ACADEMIQ sample data'))
+    # Bulk generation
+
+    def generate(self, model, count, build):
+        """Insert ``count`` rows from ``build(i, created_at)``, oldest first, in chunked transactions."""
+        # Each model gets its own stream, so adding orders does not change the contacts.
+        self.random = random.Random(f'{self.options["seed"]}:{model._meta.label}')
+        batch_size, chunk_size = self.options['batch_size'], self.options['chunk_size']
+        span = self.end - self.start
+        started = time.perf_counter()
+        with self.keep_timestamps(model):
+            for chunk_start in range(0, count, chunk_size):
+                rows = []
+                with transaction.atomic():
+                    for i in range(chunk_start, min(count, chunk_start + chunk_size)):
+                        # Evenly spread and increasing, so ids follow created_at as they do live.
+                        created_at = self.start + span * ((i + self.random.random()) / count)
+                        rows.append(build(i, created_at))
+                        if len(rows) == batch_size:
+                            model.objects.bulk_create(rows, ignore_conflicts=model is Service)
+                            rows = []
+                    model.objects.bulk_create(rows, ignore_conflicts=model is Service)
+                done = min(count, chunk_start + chunk_size)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'  {model._meta.verbose_name_plural}: {done}/{count} '
+                    f'({done / elapsed:,.0f} rows/s)', ending='\r' if done < count else '\n',
+                )
+                self.stdout.flush()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {count} {model._meta.verbose_name_plural} in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)'
+        ))
+
+    def keep_timestamps(self, model):
+        """Let bulk_create store the generated created_at/updated_at instead of now()."""
+        stack = ExitStack()
+        for field in model._meta.concrete_fields:
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    stack.enter_context(mock.patch.object(field, flag, False))
+        return stack
+
+    def name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def text(self, low, high):
+        return ' '.join(self.random.choices(WORDS, k=self.random.randint(low, high))).capitalize() + '.'
+
+    def email(self, name, i):
+        return f'{slugify(name).replace("-", ".")}{i}@example.com'
+
+    def updated_at(self, created_at):
+        return min(self.end, created_at + timedelta(hours=self.random.expovariate(1 / 48)))
+
+    def build_contact(self, i, created_at):
+        name = self.name()
+        age = self.end - created_at
+        return ContactMessage(
+            full_name=name, email=self.email(name, i),
+            phone=f'+9665{self.random.randint(10_000_000, 99_999_999)}' if self.random.random() < 0.4 else '',
+            subject=self.text(3, 8)[:200],
+            service_type=self.random.choices(*CONTACT_SERVICE_MIX)[0],
+            message=self.text(20, 120),
+            # Nearly everything older than a couple of weeks has been read.
+            is_read=self.random.random() < (0.98 if age > timedelta(days=14) else 0.3),
+            created_at=created_at,
+        )
+
+    def build_order(self, i, created_at):
+        name = self.name()
+        statuses = RECENT_STATUS_MIX if self.end - created_at < RECENT else SETTLED_STATUS_MIX
+        attachment = None
+        if self.attachment_names and self.random.random() < self.options['attachments']:
+            attachment = self.random.choice(self.attachment_names)
+            self.attachment_refs[attachment] = self.attachment_refs.get(attachment, 0) + 1
+        return OrderRequest(
+            full_name=name, email=self.email(name, i),
+            phone=f'+9665{self.random.randint(10_000_000, 99_999_999)}',
+            service_type=self.random.choices(*ORDER_SERVICE_MIX)[0],
+            message=self.text(30, 200),
+            attachment=attachment,
+            status=self.random.choices(*statuses)[0],
+            created_at=created_at, updated_at=self.updated_at(created_at),
+        )
+
+    def build_testimonial(self, i, created_at):
+        # A middle initial keeps them apart from the sample testimonials, looked up by name.
+        first, last = self.name().split(' ', 1)
+        return Testimonial(
+            name=f'{first} {self.random.choice("ABDHKMNRS")}. {last}', title=self.random.choice(TITLES), institution=self.random.choice(INSTITUTIONS),
+            content=self.text(15, 60), rating=self.random.choices([5, 4, 3, 2, 1], [60, 25, 10, 3, 2])[0],
+            is_active=self.random.random() < 0.9,
+            created_at=created_at, updated_at=self.updated_at(created_at),
+        )
+
+    def build_service(self, i, created_at):
+        title = f'{self.text(2, 4)[:-1]} {i}'.title()[:100]
+        return Service(
+            title=title, slug=f'synthetic-service-{i}', short_description=self.text(6, 14)[:200],
+            description=self.text(30, 80), icon='fas fa-graduation-cap',
+            price_starting_at=self.random.choice([None, 49, 99, 149, 299]),
+            is_active=self.random.random() < 0.8, display_order=100 + i,
+            created_at=created_at, updated_at=self.updated_at(created_at),
+        )
+
+    # Dummy attachments: a few blobs shared by many orders.
+
+    def store_attachments(self):
+        storage = attachment_storage()
+        return [
+            storage.save(f'order_attachments/synthetic/{name}', ContentFile(body.encode('utf-8')))
+            for name, body in ATTACHMENTS
+        ]
+
+    def add_attachment_references(self):
+        """Each stored attachment holds one reference already; add one per further order."""
+        storage = attachment_storage()
+        with transaction.atomic():
+            for name, refs in self.attachment_refs.items():
+                AttachmentBlob.objects.filter(key=storage.blob_key(name)).update(refcount=F('refcount') + refs - 1)
+        for name in set(self.attachment_names) - set(self.attachment_refs):
+            storage.delete(name)
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import outbox
+from core.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notification emails; keeps polling unless --once is given'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send everything that is due, then exit')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='Messages claimed per batch (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+            help='Seconds to wait between polls (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent, failed = outbox.drain(options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f'sent={sent} failed={failed}')
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        counts = {
+            status: OutboundEmail.objects.filter(status=status).count()
+            for status, _label in OutboundEmail.STATUS_CHOICES
+        }
+        self.stdout.write(' '.join(f'{status}={count}' for status, count in counts.items()))
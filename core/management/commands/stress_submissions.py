@@ -0,0 +1,183 @@
+"""
+Concurrent submission stress test.
+
+Each profile runs against its own scratch copy of the database. Worker
+processes, each with its own database connection like a web worker, wait
+on a barrier, then load the form and submit it as fast as they can. The
+report gives the error rate and the latency percentiles of the
+submissions.
+
+Profiles:
+  baseline  Django's stock SQLite setup: rollback journal, synchronous=FULL,
+            deferred transactions, a new connection per request
+  tuned     SQLITE_PRAGMAS, SQLITE_TRANSACTION_MODE and CONN_MAX_AGE from
+            settings
+  queue     tuned, with submissions saved through the write queue
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.submissions import save_submission
+from core.writequeue import WriteQueueServer
+
+PROFILES = {
+    'baseline': {
+        'pragmas': {'journal_mode': 'delete', 'synchronous': 'full'}, 'transaction_mode': 'DEFERRED',
+        'conn_max_age': 0, 'queue': False,
+    },
+    'tuned': {'pragmas': None, 'transaction_mode': None, 'conn_max_age': None, 'queue': False},
+    'queue': {'pragmas': None, 'transaction_mode': None, 'conn_max_age': None, 'queue': True},
+}
+FORMS = {
+    'contact': {
+        'full_name': 'Stress Test', 'email': 'stress@example.com', 'subject': 'Stress test',
+        'service_type': 'general', 'message': 'Concurrent submission stress test.',
+    },
+    'order': {
+        'full_name': 'Stress Test', 'email': 'stress@example.com', 'phone': '+1234567890',
+        'service_type': 'thesis', 'message': 'Concurrent submission stress test.',
+    },
+}
+
+
+def run_worker(overrides, form, count, barrier, results):
+    """Body of one worker process; reports ``(latencies_ms, errors)``."""
+    logging.disable(logging.CRITICAL)
+    override_settings(**overrides).enable()
+    client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+    url = reverse(form)
+    latencies, errors = [], Counter()
+    barrier.wait()
+    for _ in range(count):
+        # The test client skips the request signals that recycle connections.
+        close_old_connections()
+        client.get(url)
+        close_old_connections()
+        started = time.perf_counter()
+        response = client.post(url, FORMS[form])
+        latencies.append((time.perf_counter() - started) * 1000)
+        close_old_connections()
+        if response.status_code != 302:
+            exc_info = getattr(response, 'exc_info', None)
+            errors[f'{type(exc_info[1]).__name__}: {exc_info[1]}' if exc_info else f'HTTP {response.status_code}'] += 1
+    connections.close_all()
+    results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    help = (
+        'Burst concurrent contact or order submissions at scratch copies of the database '
+        'and report the error rate and latency for each SQLite profile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=16, help='Worker processes (default: %(default)s)')
+        parser.add_argument(
+            '--submissions', type=int, default=50, help='Submissions per process (default: %(default)s)',
+        )
+        parser.add_argument('--form', choices=sorted(FORMS), default='contact')
+        parser.add_argument(
+            '--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES),
+            help='Profiles to run, in order (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The stress test exercises the SQLite database.')
+        settings_dict = connection.settings_dict
+        source = settings_dict['NAME']
+        saved = {key: settings_dict.get(key) for key in ('NAME', 'CONN_MAX_AGE')}
+        workdir = tempfile.mkdtemp(prefix='academiq-stress-')
+        self.stdout.write(
+            f'{options["processes"]} processes x {options["submissions"]} {options["form"]} submissions\n'
+            f'{"profile":<10} {"errors":>8} {"error %":>8} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8} {"per s":>8}'
+        )
+        try:
+            for name in options['profiles']:
+                connections.close_all()
+                settings_dict['NAME'] = os.path.join(workdir, f'{name}.sqlite3')
+                pragmas = PROFILES[name]['pragmas'] or settings.SQLITE_PRAGMAS
+                self.copy_database(source, settings_dict['NAME'], pragmas['journal_mode'])
+                self.run_profile(name, workdir, options)
+        finally:
+            connections.close_all()
+            settings_dict.update(saved)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def copy_database(self, source, target, journal_mode):
+        # Switch the journal mode up front; it needs the database to itself.
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        try:
+            src.backup(dst)
+            dst.execute(f'PRAGMA journal_mode = {journal_mode}')
+        finally:
+            src.close()
+            dst.close()
+
+    def run_profile(self, name, workdir, options):
+        profile = PROFILES[name]
+        overrides = {
+            'SQLITE_PRAGMAS': profile['pragmas'] or settings.SQLITE_PRAGMAS,
+            'SQLITE_TRANSACTION_MODE': profile['transaction_mode'] or settings.SQLITE_TRANSACTION_MODE,
+            # The point is to flood the database; see core.throttle.
+            'THROTTLE_ENABLED': False,
+        }
+        conn_max_age = profile['conn_max_age']
+        if conn_max_age is None:
+            conn_max_age = settings.DATABASES['default'].get('CONN_MAX_AGE', 0)
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        server = None
+        if profile['queue']:
+            overrides.update(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_SOCKET=os.path.join(workdir, 'writequeue.sock'))
+
+        processes = options['processes']
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(processes + 1)
+        results = context.Queue()
+        workers = [
+            context.Process(target=run_worker, args=(overrides, options['form'], options['submissions'], barrier, results))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        with override_settings(**overrides):
+            if profile['queue']:
+                server = WriteQueueServer(overrides['WRITE_QUEUE_SOCKET'], save_submission)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+            barrier.wait()
+            started = time.perf_counter()
+            collected = [results.get() for _ in workers]
+            elapsed = time.perf_counter() - started
+            if server:
+                server.shutdown()
+                server.server_close()
+        for worker in workers:
+            worker.join()
+
+        latencies = sorted(latency for worker_latencies, _errors in collected for latency in worker_latencies)
+        errors = sum((worker_errors for _latencies, worker_errors in collected), Counter())
+        failed = sum(errors.values())
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f'{name:<10} {failed:>8} {100 * failed / len(latencies):>8.1f} {statistics.median(latencies):>8.1f} '
+            f'{p99:>8.1f} {latencies[-1]:>8.1f} {len(latencies) / elapsed:>8.1f}'
+        )
+        for message, count in errors.most_common(3):
+            self.stdout.write(f'    {count} x {message[:100]}')
+        if server:
+            self.stdout.write(f'    {server.written} submissions written in {server.batches} transactions')
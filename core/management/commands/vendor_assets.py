@@ -0,0 +1,264 @@
+import os
+import posixpath
+import re
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from core import assets
+from core.models import Service
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # Glyph subsetting is optional; full fonts are kept.
+    font_subset = None
+
+# Google Fonts only serves woff2 to browsers it recognises.
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+
+ICON_CLASS_RE = re.compile(r'\bfa-[a-z0-9-]+')
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+ICON_SELECTOR_RE = re.compile(r'^\.(fa-[a-z0-9-]+)::?before$')
+ICON_CONTENT_RE = re.compile(r'content:\s*"\\([0-9a-fA-F]+)"')
+TRUETYPE_SRC_RE = re.compile(r',\s*url\([^)]*\.ttf\)\s*format\(["\']truetype["\']\)')
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """
+    Conservative JS minification: drop block comments and whole-line ``//``
+    comments, indentation and blank lines. Newlines are kept so automatic
+    semicolon insertion still behaves.
+    """
+    js = re.sub(r'^\s*/\*.*?\*/', '', js, flags=re.DOTALL | re.MULTILINE)
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def split_rules(css):
+    """Split a stylesheet into top-level ``(prelude, block)`` pairs."""
+    rules = []
+    depth = 0
+    start = 0
+    prelude = ''
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i]
+                start = i
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude.strip(), css[start:i + 1]))
+                start = i + 1
+    return rules
+
+
+class Command(BaseCommand):
+    help = 'Vendor pinned front-end libraries into static/ and build per-direction bundles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true', help='Download vendored files again')
+        parser.add_argument('--offline', action='store_true', help='Only rebuild bundles from files already vendored')
+
+    def handle(self, *args, **options):
+        self.static_root = os.path.join(settings.BASE_DIR, 'static')
+        self.refresh = options['refresh']
+        self.offline = options['offline']
+
+        fa_dir = posixpath.join(assets.VENDOR_DIR, 'fontawesome', assets.FONT_AWESOME_VERSION)
+        aos_dir = posixpath.join(assets.VENDOR_DIR, 'aos', assets.AOS_VERSION)
+        fonts_dir = posixpath.join(assets.VENDOR_DIR, 'fonts')
+
+        fa_css = self.fetch(assets.FONT_AWESOME_CSS_URL, posixpath.join(fa_dir, 'css', 'all.min.css'))
+        self.strip_truetype_sources(fa_css)
+        for webfont in assets.FONT_AWESOME_WEBFONTS:
+            self.fetch(assets.FONT_AWESOME_WEBFONTS_URL + webfont, posixpath.join(fa_dir, 'webfonts', webfont))
+        aos_css = self.fetch(assets.AOS_CSS_URL, posixpath.join(aos_dir, 'aos.css'))
+        aos_js = self.fetch(assets.AOS_JS_URL, posixpath.join(aos_dir, 'aos.js'))
+        fonts_css = self.vendor_google_fonts(fonts_dir)
+
+        icons = self.used_icons()
+        subset_css, codepoints = self.subset_font_awesome(fa_css, icons)
+        font_overrides = self.subset_webfonts(posixpath.join(fa_dir, 'webfonts'), codepoints)
+        self.stdout.write(f'Font Awesome: kept {len(codepoints)} glyphs for {len(icons)} icon classes')
+
+        vendored_css = [
+            (fonts_css, self.read(fonts_css)),
+            (fa_css, subset_css),
+            (aos_css, self.read(aos_css)),
+        ]
+        for direction, bundle in assets.CSS_BUNDLES.items():
+            parts = vendored_css + [(path, self.read(path)) for path in assets.PROJECT_CSS[direction]]
+            css = '\n'.join(
+                minify_css(self.rebase_urls(content, path, bundle, font_overrides))
+                for path, content in parts
+            )
+            self.write(bundle, css)
+
+        js_parts = [self.read(aos_js)] + [minify_js(self.read(path)) for path in assets.PROJECT_JS]
+        self.write(assets.JS_BUNDLE, ';\n'.join(js_parts))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Bundles written. Set DJANGO_ASSET_BUNDLES=True and run collectstatic to serve them.'
+        ))
+
+    # Files
+
+    def path(self, name):
+        return os.path.join(self.static_root, *name.split('/'))
+
+    def read(self, name, mode='r'):
+        with open(self.path(name), mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            return f.read()
+
+    def write(self, name, content):
+        target = self.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        with open(target, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+            f.write(content)
+        self.stdout.write(f'  wrote {name} ({os.path.getsize(target)} bytes)')
+
+    def fetch(self, url, name):
+        """Download ``url`` to ``static/<name>`` unless it is already vendored."""
+        if os.path.exists(self.path(name)) and not self.refresh:
+            return name
+        if self.offline:
+            raise CommandError(f'{name} is not vendored yet; run without --offline first.')
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                self.write(name, response.read())
+        except OSError as exc:
+            raise CommandError(f'Could not download {url}: {exc}')
+        return name
+
+    def vendor_google_fonts(self, fonts_dir):
+        """Vendor the Google Fonts stylesheet and every font file it references."""
+        css_name = posixpath.join(fonts_dir, 'fonts.css')
+        remote_css = self.fetch(assets.GOOGLE_FONTS_CSS_URL, posixpath.join(fonts_dir, 'fonts.remote.css'))
+
+        def localize(match):
+            url = match.group(2)
+            parts = url.split('/')
+            # https://fonts.gstatic.com/s/<family>/<version>/<file>
+            filename = f'{parts[-3]}-{parts[-1]}' if len(parts) >= 3 else parts[-1]
+            self.fetch(url, posixpath.join(fonts_dir, filename))
+            return f'url({filename})'
+
+        css = CSS_URL_RE.sub(localize, self.read(remote_css))
+        self.write(css_name, css)
+        return css_name
+
+    def strip_truetype_sources(self, name):
+        """
+        Only the woff2 webfonts are vendored (every supported browser reads
+        them), so drop the ``.ttf`` fallbacks that collectstatic could not
+        resolve.
+        """
+        css = self.read(name)
+        stripped = TRUETYPE_SRC_RE.sub('', css)
+        if stripped != css:
+            self.write(name, stripped)
+
+    # Font Awesome subsetting
+
+    def used_icons(self):
+        """Collect ``fa-*`` classes from templates, project JS and Service.icon."""
+        icons = set()
+        sources = []
+        for engine in settings.TEMPLATES:
+            sources.extend(engine.get('DIRS', []))
+        sources.append(os.path.join(self.static_root, 'js'))
+        for directory in sources:
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith(('.html', '.js')):
+                        with open(os.path.join(root, filename), encoding='utf-8') as f:
+                            icons.update(ICON_CLASS_RE.findall(f.read()))
+        try:
+            for icon in Service.objects.values_list('icon', flat=True):
+                icons.update(ICON_CLASS_RE.findall(icon))
+        except DatabaseError:
+            self.stderr.write('Database unavailable; Service.icon values were not scanned.')
+        # The model default is used whenever a Service has no icon set.
+        icons.update(ICON_CLASS_RE.findall(Service._meta.get_field('icon').default))
+        return icons
+
+    def subset_font_awesome(self, fa_css, icons):
+        """Drop glyph rules for icons that are never used; keep everything else."""
+        kept = []
+        codepoints = set()
+        for prelude, block in split_rules(self.read(fa_css)):
+            selectors = [s.strip() for s in prelude.split(',')]
+            glyphs = [ICON_SELECTOR_RE.match(s) for s in selectors]
+            if prelude and all(glyphs):
+                selectors = [s for s, m in zip(selectors, glyphs) if m.group(1) in icons]
+                if not selectors:
+                    continue
+                codepoints.update(int(cp, 16) for cp in ICON_CONTENT_RE.findall(block))
+            kept.append(','.join(selectors) + block)
+        return '\n'.join(kept), codepoints
+
+    def subset_webfonts(self, webfonts_dir, codepoints):
+        """
+        Write glyph subsets of the vendored webfonts into the bundle directory
+        and return a mapping from each original font to its subset. The
+        vendored originals are left untouched so later runs can pick up new
+        icons.
+        """
+        if font_subset is None:
+            self.stdout.write('fontTools not installed; Font Awesome webfonts are kept whole.')
+            return {}
+        overrides = {}
+        for webfont in assets.FONT_AWESOME_WEBFONTS:
+            source = posixpath.join(webfonts_dir, webfont)
+            target = posixpath.join(assets.BUNDLE_DIR, 'webfonts', webfont)
+            options = font_subset.Options()
+            options.flavor = 'woff2'
+            font = font_subset.load_font(self.path(source), options)
+            subsetter = font_subset.Subsetter(options)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+            os.makedirs(os.path.dirname(self.path(target)), exist_ok=True)
+            font_subset.save_font(font, self.path(target), options)
+            overrides[source] = target
+        return overrides
+
+    # Bundling
+
+    def rebase_urls(self, css, source, bundle, overrides):
+        """
+        Rewrite relative ``url()`` references so they resolve from the bundle,
+        pointing at a replacement file when ``overrides`` has one.
+        """
+        source_dir = posixpath.dirname(source)
+        bundle_dir = posixpath.dirname(bundle)
+
+        def rebase(match):
+            quote, url = match.groups()
+            if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+                return match.group(0)
+            target = posixpath.normpath(posixpath.join(source_dir, url))
+            target = overrides.get(target, target)
+            return f'url({quote}{posixpath.relpath(target, bundle_dir)}{quote})'
+
+        return CSS_URL_RE.sub(rebase, css)
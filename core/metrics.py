@@ -0,0 +1,258 @@
+"""
+Prometheus metrics for ACADEMIQ, aggregated across worker processes.
+
+Each process counts in memory and writes its totals to its own file in
+``METRICS_DIR`` (``<pid>-<random>.json``, replaced atomically) at most once per
+``METRICS_FLUSH_INTERVAL`` seconds and when it exits. ``/metrics`` sums the
+files of every process, so the numbers are the same whichever worker
+answers the scrape. Files left by workers that have exited are folded
+into ``archive.json``, so their counts are kept without the directory
+growing with every worker restart. A forked worker starts from zero
+rather than with a copy of its parent's counts.
+
+Gauges that describe the database (pending notifications) are read when
+the endpoint is scraped. ``render()`` produces the text exposition format
+0.0.4; no client library is needed.
+"""
+
+import atexit
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import OutboundEmail
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'academiq_http_request_duration_seconds': (
+        HISTOGRAM, 'Time to produce a response, by URL name and language.', LATENCY_BUCKETS,
+    ),
+    'academiq_http_responses_total': (COUNTER, 'Responses sent, by status code.', None),
+    'academiq_db_queries_per_request': (
+        HISTOGRAM, 'SQL statements run by one request.', (0, 1, 2, 5, 10, 20, 50, 100, 200),
+    ),
+    'academiq_db_duration_seconds': (
+        HISTOGRAM, 'Time one request spent in SQL.',
+        (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    ),
+    'academiq_form_submissions_total': (COUNTER, 'Contact messages and order requests saved, by service type.', None),
+    'academiq_attachment_upload_bytes_total': (COUNTER, 'Bytes of order attachments saved.', None),
+    'academiq_attachment_uploads_total': (COUNTER, 'Order attachments saved.', None),
+    'academiq_html_bytes_total': (
+        COUNTER, 'Bytes of HTML responses by URL name, as rendered, minified and sent.', None,
+    ),
+    'academiq_cache_requests_total': (
+        COUNTER, 'Cache lookups by cache and result; hit ratio = hit / (hit + miss).', None,
+    ),
+    'academiq_throttle_checks_total': (COUNTER, 'Form POSTs checked by the submission throttle.', None),
+    'academiq_throttle_rejections_total': (
+        COUNTER, 'Form POSTs rejected with 429, by endpoint and the limit they hit.', None,
+    ),
+    'academiq_outbox_pending': (GAUGE, 'Notification emails not sent yet, by status.', None),
+}
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Store:
+    """The counts of this process, flushed to its own file in ``METRICS_DIR``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Keeps two threads from writing their snapshots out of order.
+        self._flush_lock = threading.Lock()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # The random part keeps a recycled pid from overwriting an exited worker's file.
+        self.filename = f'{os.getpid()}-{os.urandom(4).hex()}.json'
+        self.counters = defaultdict(float)
+        # key: [count per bucket..., count above the last bucket, sum]
+        self.histograms = {}
+        self.dirty = False
+        self.flushed_at = time.monotonic()
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self.counters[_key(name, labels)] += amount
+            self.dirty = True
+        self.maybe_flush()
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = _key(name, labels)
+        with self._lock:
+            counts = self.histograms.get(key)
+            if counts is None:
+                counts = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            counts[index] += 1
+            counts[-1] += value
+            self.dirty = True
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if self.dirty and time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self.dirty:
+                    return
+                data = {'counters': dict(self.counters), 'histograms': {k: list(v) for k, v in self.histograms.items()}}
+                self.dirty = False
+                self.flushed_at = time.monotonic()
+            _write(os.path.join(settings.METRICS_DIR, self.filename), data)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f'{path}.tmp'
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp, path)
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(total, data):
+    for key, value in data.get('counters', {}).items():
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for key, counts in data.get('histograms', {}).items():
+        current = total['histograms'].get(key)
+        total['histograms'][key] = counts if current is None else [a + b for a, b in zip(current, counts)]
+    return total
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+store = Store()
+atexit.register(store.flush)
+
+
+def counter_key(name, **labels):
+    """The key of a counter in the ``collect()`` totals."""
+    return _key(name, labels)
+
+
+def inc(name, amount=1, **labels):
+    store.inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    store.observe(name, value, **labels)
+
+
+def collect():
+    """Every process's totals summed, after folding exited processes into the archive."""
+    store.flush()
+    directory = settings.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    archive_path = os.path.join(directory, 'archive.json')
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read(archive_path) or {'counters': {}, 'histograms': {}}
+        total = _merge({'counters': {}, 'histograms': {}}, archive)
+        exited = []
+        for name in os.listdir(directory):
+            pid, _, ext = name.partition('-')
+            if not pid.isdigit() or not ext.endswith('.json'):
+                continue
+            data = _read(os.path.join(directory, name))
+            if data is None:
+                continue
+            _merge(total, data)
+            if not _alive(int(pid)):
+                _merge(archive, data)
+                exited.append(name)
+        if exited:
+            _write(archive_path, archive)
+            for name in exited:
+                os.remove(os.path.join(directory, name))
+    return total
+
+
+def _gauges():
+    pending = dict.fromkeys((OutboundEmail.STATUS_QUEUED, OutboundEmail.STATUS_SENDING), 0)
+    pending.update(
+        OutboundEmail.objects.filter(status__in=list(pending))
+        .order_by().values_list('status').annotate(Count('pk'))
+    )
+    return {_key('academiq_outbox_pending', {'status': status}): count for status, count in pending.items()}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render():
+    """The text exposition of every metric."""
+    total = collect()
+    samples = defaultdict(list)
+    for key, value in list(total['counters'].items()) + list(_gauges().items()):
+        name, labels = json.loads(key)
+        samples[name].append((labels, value))
+    for key, counts in total['histograms'].items():
+        name, labels = json.loads(key)
+        samples[name].append((labels, counts))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(samples.get(name, []), key=lambda sample: sample[0]):
+            if kind != HISTOGRAM:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + [math.inf], value[:-1]):
+                cumulative += count
+                le = _format_value(bound) if math.isinf(bound) else repr(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,280 @@
+"""
+Middleware for ACADEMIQ.
+"""
+
+import logging
+import mimetypes
+import os
+import posixpath
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import compression, metrics, profiling
+from .page_cache import is_cacheable_request
+from .timing import RequestTimings
+
+timing_logger = logging.getLogger('core.timing')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files straight from ``STATIC_ROOT``.
+
+    Content-hashed files written by ``CompressedManifestStaticFilesStorage``
+    are sent with a far-future ``immutable`` Cache-Control, and the
+    precompressed ``.br``/``.gz`` sibling is picked according to the
+    ``Accept-Encoding`` header. Files go out as ``FileResponse`` so the WSGI
+    server can use its ``wsgi.file_wrapper`` (``sendfile``) for a zero-copy
+    transfer.
+    """
+
+    ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.STATIC_SERVE and bool(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL
+        if not self.prefix.startswith('/'):
+            self.prefix = '/' + self.prefix
+        self.immutable_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if self.enabled and request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        name = posixpath.normpath(name).lstrip('/')
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+            stat = os.stat(path)
+        except (SuspiciousFileOperation, OSError):
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+            # A 304 carries the caching headers of the 200 it stands for (RFC 7232 4.1).
+            return self._set_cache_headers(HttpResponseNotModified(), name, stat)
+
+        content_type, _ = mimetypes.guess_type(path)
+        served_path, encoding = self._negotiate(request, path)
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return self._set_cache_headers(response, name, stat)
+
+    def _set_cache_headers(self, response, name, stat):
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if name in self.immutable_names:
+            response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={settings.STATIC_MAX_AGE}'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def _negotiate(self, request, path):
+        accepted = compression.accepted_encodings(request)
+        for encoding, suffix in self.ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+
+class HTMLCompressionMiddleware:
+    """
+    Minify ``text/html`` responses and compress them for the client.
+
+    The body is minified (``core.compression.minify_html``) and, if the
+    request accepts it, Brotli- or gzip-encoded; both results are memoized
+    by content hash, so repeated pages cost one hash per response. The
+    original, minified and sent sizes are counted per URL name in the
+    ``academiq_html_bytes_total`` metric. Streaming responses, responses
+    already encoded and bodies under ``HTML_COMPRESSION_MIN_SIZE`` bytes
+    are left alone. A strong ETag is weakened, as the bytes now depend on
+    the encoding. A 304 is never seen with a body to process, so the
+    public pages' ETags are weak from the start (``core.conditional``) and
+    their 304s carry the same validator as their 200s.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+            or len(response.content) < settings.HTML_COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = compression.accepted_encodings(request)
+        encoding = next((coding for coding in compression.ENCODINGS if coding in accepted), None)
+        original = len(response.content)
+        memoize = is_cacheable_request(request) and not response.cookies
+        minified, body = compression.process(response.content, response.charset, encoding, memoize)
+        response.content = body
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(body))
+        if encoding:
+            response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+
+        if settings.METRICS_ENABLED:
+            match = request.resolver_match
+            route = match.view_name if match else '<unmatched>'
+            metrics.inc('academiq_html_bytes_total', original, route=route, stage='original')
+            metrics.inc('academiq_html_bytes_total', len(minified), route=route, stage='minified')
+            metrics.inc('academiq_html_bytes_total', len(body), route=route, stage='sent')
+        return response
+
+
+class SessionRefreshMiddleware:
+    """
+    Sliding session expiry without a write on every request.
+
+    Replaces ``SESSION_SAVE_EVERY_REQUEST``: a session that the request
+    used is saved again (which renews its expiry and cookie) only when its
+    last refresh is more than ``SESSION_REFRESH_INTERVAL`` seconds old.
+    Requests without a session, like anonymous page views, never reach the
+    session table. Must come right after ``SessionMiddleware``.
+    """
+
+    REFRESHED_KEY = '_refreshed_at'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or not session.accessed or session.is_empty():
+            return response
+        now = int(time.time())
+        # A session being saved anyway gets the timestamp for free.
+        if session.modified or now - session.get(self.REFRESHED_KEY, 0) >= settings.SESSION_REFRESH_INTERVAL:
+            session[self.REFRESHED_KEY] = now
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Break each request down into SQL, template, mail and application time.
+
+    The phases (see ``core.timing``) go out as a ``Server-Timing`` header,
+    to staff only or to everyone according to ``SERVER_TIMING_HEADER``, and
+    as one ``key=value`` line on the ``core.timing`` logger, with the same
+    numbers under ``extra['timings']`` for structured log handlers. ``app``
+    is what is left once SQL and templates are taken off; ``mail`` is the
+    time spent queuing notifications, its SQL included.
+
+    The same numbers feed the ``core.metrics`` histograms, labelled with
+    the URL name and language; ``/metrics`` itself is not counted.
+
+    A request carrying a valid ``X-Profile`` header is also run under
+    cProfile (see ``core.profiling``). Must come right after
+    ``StaticFilesMiddleware``, so static files are left alone.
+    """
+
+    PHASES = [('db', 'SQL'), ('tpl', 'Templates'), ('mail', 'Mail queue')]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (settings.SERVER_TIMING_ENABLED or settings.METRICS_ENABLED):
+            return self.get_response(request)
+        token = request.META.get(profiling.META_KEY)
+        profiler = username = None
+        if token:
+            username = profiling.token_user(token)
+        timings = RequestTimings()
+        with ExitStack() as stack:
+            stack.enter_context(timings.activate())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings.record_query))
+            started = time.perf_counter()
+            if username:
+                response, profiler = profiling.run(self.get_response, request)
+            else:
+                response = self.get_response(request)
+            total = (time.perf_counter() - started) * 1000
+
+        durations, counts = timings.durations, timings.counts
+        if settings.METRICS_ENABLED:
+            self._record_metrics(request, response, durations, counts, total)
+        if not settings.SERVER_TIMING_ENABLED:
+            return response
+        app = max(total - durations['db'] - durations['tpl'], 0.0)
+        if self._show_header(request):
+            response['Server-Timing'] = self._header(durations, counts, app, total)
+        if timing_logger.isEnabledFor(logging.INFO):
+            self._log(request, response, durations, counts, app, total)
+        if profiler is not None:
+            saved = profiling.save(profiler, request, response, total, counts['db'], username)
+            if saved is not None:
+                response['X-Profile-Id'] = str(saved.pk)
+        return response
+
+    def _record_metrics(self, request, response, durations, counts, total):
+        match = request.resolver_match
+        route = match.view_name if match else '<unmatched>'
+        if route == 'metrics':
+            return
+        language = getattr(request, 'LANGUAGE_CODE', '')
+        metrics.observe('academiq_http_request_duration_seconds', total / 1000, route=route, language=language)
+        metrics.inc('academiq_http_responses_total', status=str(response.status_code))
+        metrics.observe('academiq_db_queries_per_request', counts['db'], route=route)
+        metrics.observe('academiq_db_duration_seconds', durations['db'] / 1000, route=route)
+
+    def _show_header(self, request):
+        mode = settings.SERVER_TIMING_HEADER
+        if mode == 'all':
+            return True
+        user = getattr(request, 'user', None)
+        return mode == 'staff' and user is not None and user.is_staff
+
+    def _header(self, durations, counts, app, total):
+        parts = [f'app;dur={app:.1f}']
+        for name, label in self.PHASES:
+            if counts[name]:
+                desc = f'{counts[name]} queries' if name == 'db' else label
+                parts.append(f'{name};dur={durations[name]:.1f};desc="{desc}"')
+        parts.append(f'total;dur={total:.1f}')
+        return ', '.join(parts)
+
+    def _log(self, request, response, durations, counts, app, total):
+        values = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total, 1),
+            'app_ms': round(app, 1),
+            'db_ms': round(durations['db'], 1),
+            'queries': counts['db'],
+            'tpl_ms': round(durations['tpl'], 1),
+            'mail_ms': round(durations['mail'], 1),
+        }
+        timing_logger.info(
+            ' '.join(f'{key}={value}' for key, value in values.items()),
+            extra={'timings': values},
+        )
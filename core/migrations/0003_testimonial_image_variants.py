@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_service_testimonial_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Photo Variants'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:33
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False, verbose_name='Key')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('stored_size', models.PositiveBigIntegerField(verbose_name='Stored Size')),
+                ('compressed', models.BooleanField(default=False, verbose_name='Compressed')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Attachment Blob',
+                'verbose_name_plural': 'Attachment Blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='orderrequest',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=core.storage.attachment_storage, upload_to='order_attachments/%Y/%m/', verbose_name='Attachment'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Method')),
+                ('path', models.CharField(max_length=2000, verbose_name='Path')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Status')),
+                ('duration_ms', models.FloatField(verbose_name='Duration (ms)')),
+                ('queries', models.PositiveIntegerField(default=0, verbose_name='Queries')),
+                ('requested_by', models.CharField(max_length=150, verbose_name='Requested By')),
+                ('summary', models.TextField(verbose_name='Summary')),
+                ('stats', models.BinaryField(verbose_name='Stats')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Request Profile',
+                'verbose_name_plural': 'Request Profiles',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='profile_created_idx')],
+            },
+        ),
+    ]
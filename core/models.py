@@ -8,6 +8,8 @@ from django.core.validators import RegexValidator, EmailValidator
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .storage import attachment_storage
+
 
 class ContactMessage(models.Model):
     """Model for contact form submissions."""
@@ -44,6 +46,16 @@ class ContactMessage(models.Model):
         ordering = ['-created_at']
         verbose_name = _('Contact Message')
         verbose_name_plural = _('Contact Messages')
+        # Ascending columns: SQLite walks them backwards for '-created_at'
+        # together with the admin's '-pk' tie-break (the rowid ends every index).
+        # Boolean filters compile to a bare "WHERE is_read", which cannot seek
+        # a composite index, so each value gets a partial index instead.
+        indexes = [
+            models.Index(fields=['created_at'], name='contact_created_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_read=False), name='contact_unread_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='contact_read_idx'),
+            models.Index(fields=['service_type', 'created_at'], name='contact_service_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.subject}"
@@ -82,6 +94,7 @@ class OrderRequest(models.Model):
     message = models.TextField(verbose_name=_('Project Details / Message'))
     attachment = models.FileField(
         upload_to='order_attachments/%Y/%m/',
+        storage=attachment_storage,
         blank=True,
         null=True,
         verbose_name=_('Attachment')
@@ -99,6 +112,11 @@ class OrderRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = _('Order Request')
         verbose_name_plural = _('Order Requests')
+        indexes = [
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['service_type', 'created_at'], name='order_service_created_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.full_name} ({self.get_service_type_display()})"
@@ -121,6 +139,8 @@ class Testimonial(models.Model):
         null=True,
         verbose_name=_('Photo')
     )
+    # Filled in by core.images once the photo has been resized.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_('Photo Variants'))
     rating = models.PositiveSmallIntegerField(
         default=5,
         choices=[(i, i) for i in range(1, 6)],
@@ -128,11 +148,18 @@ class Testimonial(models.Model):
     )
     is_active = models.BooleanField(default=True, verbose_name=_('Active'))
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated At'))
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = _('Testimonial')
         verbose_name_plural = _('Testimonials')
+        indexes = [
+            models.Index(fields=['created_at'], name='testimonial_created_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='testimonial_active_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_active=False), name='testimonial_inactive_idx'),
+            models.Index(fields=['rating', 'created_at'], name='testimonial_rating_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.rating} stars"
@@ -161,11 +188,115 @@ class Service(models.Model):
     is_active = models.BooleanField(default=True, verbose_name=_('Active'))
     display_order = models.PositiveSmallIntegerField(default=0, verbose_name=_('Display Order'))
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated At'))
     
     class Meta:
         ordering = ['display_order', 'title']
         verbose_name = _('Service')
         verbose_name_plural = _('Services')
+        indexes = [
+            # id keeps the admin's sort on the index; created_at lets its
+            # date filter count from the index alone.
+            models.Index(fields=['display_order', 'title', 'id', 'created_at'], name='service_order_idx'),
+            models.Index(
+                fields=['display_order', 'title'], condition=models.Q(is_active=True), name='service_active_idx',
+            ),
+            models.Index(
+                fields=['display_order', 'title'], condition=models.Q(is_active=False), name='service_inactive_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
+
+
+class OutboundEmail(models.Model):
+    """Notification email queued by a view and delivered by ``send_outbox``."""
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, _('Queued')),
+        (STATUS_SENDING, _('Sending')),
+        (STATUS_SENT, _('Sent')),
+        (STATUS_DEAD, _('Dead Letter')),
+    ]
+    
+    subject = models.CharField(max_length=255, verbose_name=_('Subject'))
+    body = models.TextField(verbose_name=_('Body'))
+    from_email = models.CharField(max_length=254, verbose_name=_('From'))
+    recipients = models.JSONField(default=list, verbose_name=_('Recipients'))
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_('Attempts'))
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name=_('Next Attempt At'))
+    claimed_at = models.DateTimeField(blank=True, null=True, verbose_name=_('Claimed At'))
+    last_error = models.TextField(blank=True, verbose_name=_('Last Error'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Queued At'))
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name=_('Sent At'))
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = _('Outbound Email')
+        verbose_name_plural = _('Outbound Emails')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['created_at'], name='outbox_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='outbox_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+
+class AttachmentBlob(models.Model):
+    """
+    One stored blob of ``ContentAddressedStorage``. ``refcount`` counts the
+    file names pointing at it; the blob is removed when it drops to zero.
+    """
+    
+    key = models.CharField(max_length=32, primary_key=True, verbose_name=_('Key'))
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name=_('SHA-256'))
+    size = models.PositiveBigIntegerField(verbose_name=_('Size'))
+    stored_size = models.PositiveBigIntegerField(verbose_name=_('Stored Size'))
+    compressed = models.BooleanField(default=False, verbose_name=_('Compressed'))
+    refcount = models.PositiveIntegerField(default=0, verbose_name=_('References'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    
+    class Meta:
+        verbose_name = _('Attachment Blob')
+        verbose_name_plural = _('Attachment Blobs')
+    
+    def __str__(self):
+        return self.key
+
+
+class RequestProfile(models.Model):
+    """A cProfile capture of one request, asked for with the ``X-Profile`` header."""
+    
+    method = models.CharField(max_length=10, verbose_name=_('Method'))
+    path = models.CharField(max_length=2000, verbose_name=_('Path'))
+    status_code = models.PositiveSmallIntegerField(verbose_name=_('Status'))
+    duration_ms = models.FloatField(verbose_name=_('Duration (ms)'))
+    queries = models.PositiveIntegerField(default=0, verbose_name=_('Queries'))
+    requested_by = models.CharField(max_length=150, verbose_name=_('Requested By'))
+    summary = models.TextField(verbose_name=_('Summary'))
+    stats = models.BinaryField(verbose_name=_('Stats'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Request Profile')
+        verbose_name_plural = _('Request Profiles')
+        indexes = [
+            models.Index(fields=['created_at'], name='profile_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
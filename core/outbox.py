@@ -0,0 +1,156 @@
+"""
+Durable email outbox for ACADEMIQ.
+
+Views call ``enqueue()`` inside the transaction that saves the submission,
+so a notification exists exactly when the submission does and the request
+never talks to the mail server. ``manage.py send_outbox`` delivers queued
+messages in batches over one reused SMTP connection. Failed messages are
+retried with exponential backoff and become dead letters after
+``OUTBOX_MAX_ATTEMPTS``; they can be re-queued from the admin.
+"""
+
+import logging
+import random
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .timing import phase
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, recipients=None, from_email=None):
+    """Queue a plain-text email. Call it inside the caller's transaction."""
+    # A header cannot hold a line break; EmailMessage would refuse to send it.
+    subject = ' '.join(subject.split())
+    with phase('mail'):
+        return OutboundEmail.objects.create(
+            subject=subject[:255],
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(recipients or [settings.ADMIN_EMAIL]),
+        )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with +/-10% jitter, capped at ``OUTBOX_RETRY_MAX``."""
+    delay = min(settings.OUTBOX_RETRY_BASE * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX)
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def release_stale_claims(now=None):
+    """Re-queue messages whose worker died between claiming and recording the result."""
+    now = now or timezone.now()
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENDING,
+        claimed_at__lt=now - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT),
+    ).update(status=OutboundEmail.STATUS_QUEUED, claimed_at=None)
+
+
+def claim_batch(batch_size, now=None):
+    """
+    Claim up to ``batch_size`` due messages. Each row is claimed with a
+    conditional UPDATE, so several workers never send the same message.
+    """
+    now = now or timezone.now()
+    due = OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=now,
+    ).order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:batch_size]
+    claimed = [
+        pk for pk in due
+        if OutboundEmail.objects.filter(pk=pk, status=OutboundEmail.STATUS_QUEUED)
+        .update(status=OutboundEmail.STATUS_SENDING, claimed_at=now)
+    ]
+    return list(OutboundEmail.objects.filter(pk__in=claimed).order_by('next_attempt_at', 'pk'))
+
+
+def _record_failure(message, exc):
+    message.attempts += 1
+    message.last_error = f'{type(exc).__name__}: {exc}'[:2000]
+    message.claimed_at = None
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboundEmail.STATUS_DEAD
+        logger.error('Outbound email %s is a dead letter after %d attempts: %s',
+                     message.pk, message.attempts, message.last_error)
+    else:
+        message.status = OutboundEmail.STATUS_QUEUED
+        message.next_attempt_at = timezone.now() + retry_delay(message.attempts)
+        logger.warning('Outbound email %s failed (attempt %d): %s',
+                       message.pk, message.attempts, message.last_error)
+    message.save(update_fields=['attempts', 'last_error', 'claimed_at', 'status', 'next_attempt_at'])
+
+
+def _record_success(message):
+    message.attempts += 1
+    message.status = OutboundEmail.STATUS_SENT
+    message.sent_at = timezone.now()
+    message.claimed_at = None
+    message.last_error = ''
+    message.save(update_fields=['attempts', 'status', 'sent_at', 'claimed_at', 'last_error'])
+
+
+def deliver_batch(connection, batch_size=None):
+    """
+    Send one batch of due messages over ``connection``, which stays open
+    between messages. A dropped connection is reopened for the next message.
+    Any error, including a message that cannot be built at all, counts as a
+    failed attempt of that message only, so it ends up a dead letter rather
+    than stopping the outbox. Returns ``(sent, failed)``.
+    """
+    batch = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    sent = failed = 0
+    for message in batch:
+        try:
+            email = EmailMessage(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=message.recipients,
+                connection=connection,
+            )
+            if getattr(connection, 'connection', True) is None:
+                connection.open()
+            connection.send_messages([email])
+        except Exception as exc:
+            if isinstance(exc, (smtplib.SMTPServerDisconnected, OSError)):
+                connection.close()
+            _record_failure(message, exc)
+            failed += 1
+        else:
+            _record_success(message)
+            sent += 1
+    return sent, failed
+
+
+def drain(batch_size=None):
+    """
+    Deliver every due message, batch after batch, over one connection.
+    Returns ``(sent, failed)``. No connection is opened when nothing is due.
+    """
+    release_stale_claims()
+    if not OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=timezone.now(),
+    ).exists():
+        return 0, 0
+    connection = get_connection(fail_silently=False)
+    total_sent = total_failed = 0
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as exc:
+        # Attempted per message in deliver_batch, so each one records the error.
+        logger.warning('Could not connect to the mail server: %s', exc)
+    try:
+        while True:
+            sent, failed = deliver_batch(connection, batch_size)
+            total_sent += sent
+            total_failed += failed
+            if not sent and not failed:
+                break
+    finally:
+        connection.close()
+    return total_sent, total_failed
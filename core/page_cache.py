@@ -0,0 +1,132 @@
+"""
+Per-language full-page cache for the public ACADEMIQ pages.
+
+Responses are stored in the ``pages`` cache alias (local memory, file-based
+or Redis, see ``PAGE_CACHE_BACKEND`` in settings) and keyed by the absolute
+URL without its query string, the active language and a generation
+counter. The cached views ignore the query string, so ``?utm_source=...``
+and the like share one entry. Saving or deleting a ``Service`` or
+``Testimonial`` bumps the generation (see ``core.signals``), which
+invalidates every cached page at once. The generation is kept in the
+``shared`` alias even when the pages are in per-process memory, so a bump
+reaches every worker.
+
+Hits and misses are counted in the ``academiq_cache_requests_total``
+metric, which ``core.metrics`` sums over every worker;
+``get_page_cache_stats()`` reports them since the last
+``reset_page_cache_stats()``.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.utils.translation import get_language
+
+from . import metrics
+
+GENERATION_KEY = 'pagecache:generation'
+STATS_BASELINE_KEY = 'pagecache:stats-baseline'
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def get_shared_cache():
+    return caches[settings.PAGE_CACHE_SHARED_ALIAS]
+
+
+def _incr(cache, key):
+    """Increment a counter, creating it first if needed."""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); start again from one.
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def get_generation():
+    return get_shared_cache().get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def invalidate_page_cache():
+    """Drop every cached page by moving to a new generation."""
+    _incr(get_shared_cache(), GENERATION_KEY)
+
+
+def _lookup_totals():
+    """``(hits, misses)`` of every worker since the metrics began."""
+    counters = metrics.collect()['counters']
+    return tuple(
+        int(counters.get(metrics.counter_key('academiq_cache_requests_total', cache='page', result=result), 0))
+        for result in ('hit', 'miss')
+    )
+
+
+def get_page_cache_stats():
+    """Return hit/miss counters and the hit ratio for the page cache."""
+    baseline = get_shared_cache().get(STATS_BASELINE_KEY, (0, 0))
+    hits, misses = (max(0, count - base) for count, base in zip(_lookup_totals(), baseline))
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_page_cache_stats():
+    get_shared_cache().set(STATS_BASELINE_KEY, _lookup_totals(), timeout=None)
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    # len() does not mark the messages as used, so they are still shown.
+    if len(messages.get_messages(request)):
+        return False
+    return True
+
+
+def _cache_key(request, generation):
+    url = request.build_absolute_uri(request.path)
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return f'pagecache:{generation}:{get_language()}:{digest}'
+
+
+def cache_public_page(view_func):
+    """
+    Cache the rendered response of a public view per URL and language.
+
+    Requests from authenticated users or with pending flash messages are
+    always rendered fresh and never stored.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not settings.PAGE_CACHE_ENABLED or not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        cache = get_page_cache()
+        key = _cache_key(request, get_generation())
+        response = cache.get(key)
+        if response is not None:
+            metrics.inc('academiq_cache_requests_total', cache='page', result='hit')
+            response['X-Page-Cache'] = 'HIT'
+            return response
+
+        metrics.inc('academiq_cache_requests_total', cache='page', result='miss')
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        response['X-Page-Cache'] = 'MISS'
+        return response
+
+    return wrapper
@@ -0,0 +1,89 @@
+"""
+On-demand profiling of single requests.
+
+A staff member copies the header shown on the Request Profiles admin page
+and sends it with the request to look at, e.g.::
+
+    curl -H 'X-Profile: <token>' https://academiq.example/en/services/
+
+The token is signed with ``SECRET_KEY`` and names the staff member; it
+expires after ``PROFILE_TOKEN_MAX_AGE`` seconds. ``ServerTimingMiddleware``
+runs such a request under ``cProfile`` and stores the result as a
+``RequestProfile``, downloadable from the admin as a ``.prof`` file for
+``python -m pstats``, snakeviz or similar. Requests without the header
+only pay for one ``request.META`` lookup.
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Profile'
+META_KEY = 'HTTP_X_PROFILE'
+SALT = 'core.profiling'
+SUMMARY_LINES = 40
+
+
+def make_token(user):
+    """A header value letting ``user`` profile requests until it expires."""
+    return signing.TimestampSigner(salt=SALT).sign(user.get_username())
+
+
+def token_user(token):
+    """The active staff username behind ``token``, or None."""
+    try:
+        username = signing.TimestampSigner(salt=SALT).unsign(token, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    users = get_user_model()._default_manager.filter(is_active=True, is_staff=True)
+    if not users.filter(**{get_user_model().USERNAME_FIELD: username}).exists():
+        return None
+    return username
+
+
+def run(get_response, request):
+    """Call ``get_response(request)`` under cProfile; returns ``(response, profile)``."""
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profile.disable()
+    return response, profile
+
+
+def save(profile, request, response, duration_ms, queries, username):
+    """Store ``profile`` as a ``RequestProfile``, keeping the newest ``PROFILE_KEEP``."""
+    profile.create_stats()
+    # Taken first: pstats.Stats(profile) empties profile.stats.
+    stats = marshal.dumps(profile.stats)
+    summary = io.StringIO()
+    pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    try:
+        saved = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:2000],
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            queries=queries,
+            requested_by=username[:150],
+            summary=summary.getvalue(),
+            stats=stats,
+        )
+        stale = RequestProfile.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)[settings.PROFILE_KEEP:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+    except Exception:
+        # Losing a profile must never fail the request it describes.
+        logger.exception('Could not store the profile of %s %s', request.method, request.path)
+        return None
+    return saved
@@ -0,0 +1,174 @@
+"""
+Query-plan regression checks.
+
+``run()`` renders every public page, submits both forms and renders every
+admin changelist of the core models (default ordering, each list filter
+choice, each date_hierarchy level and both keyset page directions) with
+synthetic rows, and passes every statement they run through SQLite's
+``EXPLAIN QUERY PLAN``. A plan that scans a table without an index or
+sorts through a temporary B-tree is a problem. The caller provides the
+transaction; ``core.tests`` runs the checks as test cases and
+``manage.py check_query_plans`` on the configured database.
+"""
+
+import re
+from collections import namedtuple
+from datetime import timedelta
+from importlib import import_module
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import catalog
+from .changelist import AFTER_VAR, BEFORE_VAR, KeysetPaginationMixin, encode_cursor
+from .models import ContactMessage, OrderRequest, OutboundEmail, Service, Testimonial
+
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+TABLE_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE'
+# Known sorts that no index can serve: the date_hierarchy buckets are
+# DISTINCT values of a function of the column, bounded by an index range.
+ALLOWED_SORTS = (
+    re.compile(r'SELECT DISTINCT django_date(time)?_trunc\('),
+)
+
+Plan = namedtuple('Plan', ['scenario', 'sql', 'steps', 'problems'])
+
+
+class Recorder:
+    """An execute wrapper keeping each distinct statement and the scenario that ran it first."""
+
+    def __init__(self):
+        self.statements = {}
+        self.scenario = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(EXPLAINED):
+            self.statements.setdefault((sql, tuple(params or ())), self.scenario)
+        return execute(sql, params, many, context)
+
+
+def populate():
+    """A few rows per model, spread over two years, so every changelist branch runs."""
+    now = timezone.now()
+    for i in range(6):
+        rows = [
+            ContactMessage.objects.create(
+                full_name=f'Plan Check {i}', email=f'plan{i}@example.com',
+                subject='Plan check', message='Plan check', is_read=bool(i % 2),
+            ),
+            OrderRequest.objects.create(
+                full_name=f'Plan Check {i}', email=f'plan{i}@example.com', phone='+1234567890',
+                service_type='thesis', message='Plan check',
+            ),
+            Testimonial.objects.create(name=f'Plan Check {i}', title='Student', content='Plan check'),
+            Service.objects.create(
+                title=f'Plan Check {i}', slug=f'plan-check-{i}', short_description='Plan check',
+                description='Plan check', display_order=i,
+            ),
+            OutboundEmail.objects.create(subject='Plan check', body='Plan check', from_email='a@example.com'),
+        ]
+        # created_at is auto_now_add; backdate it afterwards.
+        for row in rows:
+            type(row).objects.filter(pk=row.pk).update(created_at=now - timedelta(days=200 * i))
+
+
+def run_views(recorder):
+    client = Client(HTTP_HOST='localhost')
+    for name in ('home', 'about', 'services', 'contact', 'contact_success', 'order', 'order_success',
+                 'privacy_policy'):
+        recorder.scenario = f'GET {name}'
+        catalog._snapshot = None
+        client.get(reverse(name))
+    recorder.scenario = 'POST contact'
+    client.post(reverse('contact'), {
+        'full_name': 'Plan Check', 'email': 'plan@example.com', 'subject': 'Plan check',
+        'service_type': 'general', 'message': 'Plan check message',
+    })
+    recorder.scenario = 'POST order'
+    client.post(reverse('order'), {
+        'full_name': 'Plan Check', 'email': 'plan@example.com', 'phone': '+1234567890',
+        'service_type': 'thesis', 'message': 'Plan check message',
+    })
+
+
+def run_changelists(recorder):
+    factory = RequestFactory()
+    user = get_user_model()(username='plancheck', is_staff=True, is_superuser=True, is_active=True)
+    for model, model_admin in admin.site._registry.items():
+        if model._meta.app_label != 'core':
+            continue
+        label = model._meta.model_name
+        for query in changelist_queries(factory, user, model_admin):
+            recorder.scenario = f'admin {label} ?{query}'
+            request = admin_request(factory, user, query)
+            model_admin.changelist_view(request).render()
+
+
+def admin_request(factory, user, query=''):
+    request = factory.get('/', dict(parse_qsl(query)))
+    request.user = user
+    # As SessionMiddleware would; the admin keeps messages there when they overflow the cookie.
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    return request
+
+
+def changelist_queries(factory, user, model_admin):
+    """The default changelist, every filter choice, date_hierarchy level and keyset page."""
+    request = admin_request(factory, user)
+    changelist = model_admin.get_changelist_instance(request)
+    queries = {''}
+    for spec in changelist.filter_specs:
+        for choice in spec.choices(changelist):
+            queries.add(choice['query_string'].lstrip('?'))
+    if model_admin.date_hierarchy:
+        field = model_admin.date_hierarchy
+        day = timezone.localtime(timezone.now())
+        queries.add(f'{field}__year={day.year}')
+        queries.add(f'{field}__year={day.year}&{field}__month={day.month}')
+        queries.add(f'{field}__year={day.year}&{field}__month={day.month}&{field}__day={day.day}')
+    if isinstance(model_admin, KeysetPaginationMixin):
+        field = model_admin.keyset_field
+        row = model_admin.model.objects.order_by(f'-{field}', '-pk')[2]
+        cursor = encode_cursor(getattr(row, field), row.pk)
+        queries.add(f'{AFTER_VAR}={cursor}')
+        queries.add(f'{BEFORE_VAR}={cursor}')
+    return sorted(queries)
+
+
+def explain(statements):
+    """A ``Plan`` for every recorded statement."""
+    plans = []
+    with connection.cursor() as cursor:
+        for (sql, params), scenario in statements.items():
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            steps = [row[-1] for row in cursor.fetchall()]
+            problems = [
+                step for step in steps
+                if TABLE_SCAN_RE.match(step)
+                or (TEMP_SORT in step and not any(allowed.search(sql) for allowed in ALLOWED_SORTS))
+            ]
+            plans.append(Plan(scenario, sql, steps, problems))
+    return plans
+
+
+def run(*scenarios):
+    """
+    Run ``scenarios`` (default: ``run_views`` and ``run_changelists``) with
+    the caches and throttle off and return the ``Plan`` of every statement.
+    Call ``populate()`` first, inside a transaction the caller rolls back.
+    """
+    recorder = Recorder()
+    no_caches = override_settings(
+        PAGE_CACHE_ENABLED=False, ADMIN_CHANGELIST_CACHE_TIMEOUT=0, THROTTLE_ENABLED=False,
+    )
+    with connection.execute_wrapper(recorder), no_caches:
+        for scenario in scenarios or (run_views, run_changelists):
+            scenario(recorder)
+    return explain(recorder.statements)
@@ -0,0 +1,94 @@
+"""
+SQLite FTS5 search for the admin.
+
+``ContactMessage`` and ``OrderRequest`` each have an external-content FTS5
+table (``<db_table>_fts``) over their text columns. Triggers created by
+migration ``0006`` keep the tables in sync on every insert, update and
+delete, including ``QuerySet.update()`` and ``bulk_create()``.
+
+``FullTextSearchMixin`` plugs them into ``ModelAdmin.get_search_results``:
+every word of the search box becomes a prefix phrase, the matches are
+ranked with bm25, and the plain ``icontains`` search is used whenever the
+database is not SQLite or the index is missing.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+ORDER_NUMBER_RE = re.compile(r'^(?:ACD-\d{4}-)?0*(\d+)$', re.IGNORECASE)
+
+_available = {}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def fts_available(model):
+    """Whether the FTS table for ``model`` exists (checked once per process)."""
+    if connection.vendor != 'sqlite':
+        return False
+    table = fts_table(model)
+    if table not in _available:
+        _available[table] = table in connection.introspection.table_names()
+    return _available[table]
+
+
+def build_match_query(search_term):
+    """
+    Turn the admin search box into an FTS5 query: each whitespace-separated
+    word is a quoted phrase with a prefix wildcard, and all must match.
+    ``a.b@example.com`` becomes the phrase ``"a b example com"*``.
+    """
+    phrases = []
+    for word in search_term.split():
+        word = word.replace('"', '""')
+        if re.search(r'\w', word):
+            phrases.append(f'"{word}"*')
+    return ' AND '.join(phrases)
+
+
+class FullTextSearchMixin:
+    """
+    ``ModelAdmin`` mixin that answers the search box from the model's FTS5
+    table. With no explicit column sort, results are ordered by relevance.
+    Set ``search_pk_with`` to a regex whose group(1) is a primary key to
+    also match identifiers typed into the search box (e.g. order numbers).
+    """
+
+    search_pk_with = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not fts_available(self.model):
+            return super().get_search_results(request, queryset, search_term)
+        match = build_match_query(search_term)
+        if not match:
+            return super().get_search_results(request, queryset, search_term)
+
+        table = fts_table(self.model)
+        if self.search_pk_with:
+            pk_match = re.match(self.search_pk_with, search_term.strip())
+            if pk_match:
+                # An identifier: match it or the text, without ranking.
+                matches = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+                return queryset.filter(Q(pk=int(pk_match.group(1))) | Q(pk__in=matches)), False
+
+        # Join the index so each match is ranked once, driven by the FTS lookup.
+        pk_column = f'{self.model._meta.db_table}.{self.model._meta.pk.column}'
+        queryset = queryset.extra(
+            select={'search_rank': f'{table}.rank'},
+            tables=[table],
+            where=[f'{table}.rowid = {pk_column}', f'{table} MATCH %s'],
+            params=[match],
+        )
+        request._fts_search = True
+        return queryset, False
+
+    def get_ordering(self, request):
+        if getattr(request, '_fts_search', False):
+            # bm25 ranks are negative; the best match sorts first.
+            return ['search_rank']
+        return super().get_ordering(request)
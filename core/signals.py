@@ -0,0 +1,69 @@
+"""
+Signal handlers for ACADEMIQ core models.
+"""
+
+from functools import partial
+
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import images, language_urls, sqlite
+from .catalog import bump_version
+from .models import OrderRequest, Service, Testimonial
+from .page_cache import invalidate_page_cache
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    sqlite.apply_pragmas(connection)
+
+
+@receiver(setting_changed)
+def clear_language_urls(sender, setting, **kwargs):
+    if setting in ('ROOT_URLCONF', 'LANGUAGES', 'LANGUAGE_CODE'):
+        language_urls.clear_caches()
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def invalidate_public_pages(sender, **kwargs):
+    """
+    Drop the catalog snapshot and cached public pages once a change is
+    committed. Admin ``list_editable`` saves go through ``Model.save()`` and
+    land here too.
+    """
+    transaction.on_commit(bump_version)
+    transaction.on_commit(invalidate_page_cache)
+
+
+@receiver(post_save, sender=Testimonial)
+def schedule_testimonial_variants(sender, instance, **kwargs):
+    """
+    Resize a new or replaced photo on the background worker once the save
+    is committed, so the admin request never waits for the encoder.
+    """
+    variants = instance.image_variants or {}
+    if (instance.image.name or None) != variants.get('source'):
+        transaction.on_commit(partial(images.schedule_testimonial_variants, instance.pk))
+
+
+@receiver(post_delete, sender=Testimonial)
+def delete_testimonial_variants(sender, instance, **kwargs):
+    if instance.image_variants:
+        transaction.on_commit(partial(images.delete_variants, instance.image_variants, default_storage))
+
+
+@receiver(post_delete, sender=OrderRequest)
+def release_order_attachment(sender, instance, **kwargs):
+    """
+    Drop the deleted order's reference to its attachment. The storage keeps
+    the blob while other orders still point at the same content.
+    """
+    if instance.attachment:
+        transaction.on_commit(partial(instance.attachment.delete, save=False))
@@ -0,0 +1,66 @@
+"""
+SQLite connection tuning for ACADEMIQ.
+
+``apply_pragmas()`` runs on every new connection (see ``core.signals``) and
+sets ``SQLITE_PRAGMAS``. With the defaults the database is in WAL mode, so
+readers never block the writer and the writer never blocks readers;
+``synchronous=NORMAL`` only syncs at checkpoints, which is safe with WAL;
+``busy_timeout`` makes a second writer wait for the lock instead of failing
+with "database is locked"; and ``cache_size``/``mmap_size`` keep the hot
+pages in memory.
+
+The busy timeout only helps a transaction that asks for the write lock
+when it starts. Django opens SQLite transactions with a deferred ``BEGIN``,
+and a deferred transaction that has read and then tries to write fails at
+once with "database is locked" if another connection got there first:
+SQLite cannot wait, as the reader's snapshot would be stale by then. With
+``SQLITE_TRANSACTION_MODE = 'IMMEDIATE'`` atomic blocks take the write lock
+at ``BEGIN`` and queue up behind the busy timeout instead.
+
+Django 4.2 has no setting for the ``BEGIN`` mode, so
+``set_transaction_mode()`` replaces the private method the SQLite backend
+starts transactions with, and refuses to start if that method is gone.
+Django 5.1 added ``OPTIONS['transaction_mode']`` to ``DATABASES``; use that
+instead once the project is on it.
+
+Together with ``CONN_MAX_AGE`` the pragmas run once per worker connection
+rather than once per request.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def apply_pragmas(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            if not (PRAGMA_NAME_RE.match(name) and PRAGMA_VALUE_RE.match(str(value))):
+                raise ValueError(f'Invalid SQLite pragma: {name} = {value!r}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+    set_transaction_mode(connection, settings.SQLITE_TRANSACTION_MODE)
+
+
+def set_transaction_mode(connection, mode):
+    """Make ``transaction.atomic()`` on ``connection`` start with ``BEGIN <mode>``."""
+    if mode not in TRANSACTION_MODES:
+        raise ValueError(f'Invalid SQLite transaction mode: {mode!r}')
+    # Overridden below; the backend only calls it while it defines it.
+    if not callable(getattr(type(connection), '_start_transaction_under_autocommit', None)):
+        raise ImproperlyConfigured(
+            'This Django version no longer starts SQLite transactions with '
+            '_start_transaction_under_autocommit(), so SQLITE_TRANSACTION_MODE cannot be applied. '
+            "Set DATABASES['default']['OPTIONS']['transaction_mode'] (Django 5.1+) instead."
+        )
+
+    def start_transaction_under_autocommit():
+        connection.cursor().execute(f'BEGIN {mode}')
+
+    connection._start_transaction_under_autocommit = start_transaction_under_autocommit
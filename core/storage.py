@@ -0,0 +1,307 @@
+"""
+Storage backends for ACADEMIQ.
+"""
+
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.utils import validate_file_name
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+
+from . import images
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; only .gz siblings are written.
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map', '.ico'}
+
+# Attachment types worth compressing; PDF, DOCX, ZIP and RAR already are.
+COMPRESSIBLE_ATTACHMENT_EXTENSIONS = {'.txt', '.doc', '.rtf', '.csv'}
+
+# Skip a compressed sibling unless it saves at least this fraction.
+MIN_COMPRESSION_GAIN = 0.05
+
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage (content-hashed filenames) that also writes ``.gz`` and,
+    when Brotli is installed, ``.br`` siblings for compressible files, so the
+    static middleware can serve precompressed bytes. Raster images get
+    resized WebP/AVIF/JPEG variants (see ``core.images``).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        self._build_image_variants(paths)
+        for root, _dirs, files in os.walk(self.location):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                    self._compress(os.path.join(root, filename))
+
+    def _build_image_variants(self, paths):
+        """
+        Variant names already embed a digest of their source, so they are
+        added to the manifest under their own name and served as immutable.
+        """
+        names = [
+            name for name in paths
+            if name.lower().endswith(images.STATIC_IMAGE_EXTENSIONS)
+            and not name.startswith(images.VARIANT_DIR + '/')
+        ]
+        variants = images.build_static_variants(self, names)
+        if variants:
+            self.hashed_files.update((path, path) for path in variants)
+            self.save_manifest()
+
+    def _compress(self, path):
+        encoders = [('.gz', _gzip)]
+        if brotli is not None:
+            encoders.append(('.br', _brotli))
+
+        source_mtime = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        for suffix, encode in encoders:
+            target = path + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                continue
+            compressed = encode(data)
+            if len(compressed) > len(data) * (1 - MIN_COMPRESSION_GAIN):
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            with open(target, 'wb') as f:
+                f.write(compressed)
+
+
+def attachment_storage():
+    """Storage for ``OrderRequest.attachment``, configured in ``STORAGES``."""
+    return storages['attachments']
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store files by content hash, once per distinct content.
+
+    A saved file is named ``<upload dir>/<key>/<file name>``, where ``key``
+    is the first 32 hex digits of its SHA-256, so the original file name
+    survives for downloads while identical uploads share one blob under
+    ``BLOB_DIR``. Compressible types are gzipped transparently. Each blob
+    has an ``AttachmentBlob`` row whose ``refcount`` is raised by every
+    ``save()`` and lowered by every ``delete()``; the blob itself is only
+    removed when no name points at it any more.
+
+    Both sides start with an UPDATE of the blob's row, which takes the
+    database write lock, and keep it while they touch the file: a save
+    writes the file and creates the row in one transaction, and the
+    removal after a delete unlinks the file only if that UPDATE found no
+    row. So a save of the same content racing a delete either keeps the
+    blob alive or writes it again; it never ends up with its row pointing
+    at an unlinked file.
+
+    Names that do not contain a key (files saved before this backend was
+    used) are handled exactly like ``FileSystemStorage`` until
+    ``manage.py migrate_attachments`` converts them.
+    """
+
+    BLOB_DIR = 'blobs'
+    KEY_RE = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, url_name=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url_name = url_name
+
+    # Names and blobs
+
+    def blob_key(self, name):
+        """The blob key in a content-addressed ``name``, or None for a plain file."""
+        parts = (name or '').replace('\\', '/').split('/')
+        if len(parts) >= 2 and self.KEY_RE.match(parts[-2]):
+            return parts[-2]
+        return None
+
+    def blob_path(self, key):
+        return super().path(posixpath.join(self.BLOB_DIR, key[:2], key))
+
+    def get_blob(self, name):
+        from .models import AttachmentBlob
+
+        key = self.blob_key(name)
+        return AttachmentBlob.objects.filter(key=key).first() if key else None
+
+    def _blob_name(self, name, key, max_length):
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        filename = get_valid_filename(filename)
+        name = posixpath.join(directory, key, filename)
+        if max_length is not None and len(name) > max_length:
+            root, ext = posixpath.splitext(filename)
+            root = root[:max(1, len(root) - (len(name) - max_length))]
+            name = posixpath.join(directory, key, root + ext)
+        return name
+
+    # Storage API
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+
+        digest = getattr(content, 'sha256', None)
+        if not digest:
+            hasher = hashlib.sha256()
+            for chunk in content.chunks():
+                hasher.update(chunk)
+            digest = hasher.hexdigest()
+        key = digest[:32]
+        name = self._blob_name(name, key, max_length)
+        validate_file_name(name, allow_relative_path=True)
+        self._store_blob(key, digest, content, name)
+        return name
+
+    def _store_blob(self, key, digest, content, name):
+        from .models import AttachmentBlob
+
+        path = self.blob_path(key)
+        with transaction.atomic():
+            referenced = AttachmentBlob.objects.filter(key=key).update(refcount=F('refcount') + 1)
+            if referenced and os.path.exists(path):
+                return
+            # A file without a row is about to be removed; write it again.
+            size, stored_size, compressed = self._write_blob(path, content, name)
+            if referenced:
+                # The row outlived its file; describe the blob just written.
+                AttachmentBlob.objects.filter(key=key).update(stored_size=stored_size, compressed=compressed)
+            else:
+                AttachmentBlob.objects.create(
+                    key=key, sha256=digest, size=size, stored_size=stored_size,
+                    compressed=compressed, refcount=1,
+                )
+
+    def _write_blob(self, path, content, name):
+        """Write ``content`` to ``path`` atomically, gzipped when that pays off."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        compress = os.path.splitext(name)[1].lower() in COMPRESSIBLE_ATTACHMENT_EXTENSIONS
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            size = 0
+            with os.fdopen(fd, 'wb') as raw:
+                target = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) if compress else raw
+                for chunk in content.chunks():
+                    size += len(chunk)
+                    target.write(chunk)
+                if compress:
+                    target.close()
+            stored_size = os.path.getsize(tmp_path)
+            if compress and stored_size > size * (1 - MIN_COMPRESSION_GAIN):
+                # Not worth it: store the original bytes instead.
+                content.seek(0)
+                with open(tmp_path, 'wb') as raw:
+                    for chunk in content.chunks():
+                        raw.write(chunk)
+                compress, stored_size = False, size
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return size, stored_size, compress
+
+    def _open(self, name, mode='rb'):
+        key = self.blob_key(name)
+        if key is None:
+            return super()._open(name, mode)
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('Content-addressed files are read-only.')
+        blob = self.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(name)
+        path = self.blob_path(key)
+        handle = gzip.open(path, 'rb') if blob.compressed else open(path, 'rb')
+        f = File(handle, name=name)
+        f.size = blob.size
+        return f
+
+    def delete(self, name):
+        key = self.blob_key(name)
+        if key is None:
+            return super().delete(name)
+        from .models import AttachmentBlob
+
+        with transaction.atomic():
+            AttachmentBlob.objects.filter(key=key, refcount__gt=0).update(refcount=F('refcount') - 1)
+            released = AttachmentBlob.objects.filter(key=key, refcount=0).delete()[0]
+        if released:
+            transaction.on_commit(lambda: self._remove_blob_file(key))
+
+    def _remove_blob_file(self, key):
+        from .models import AttachmentBlob
+
+        with transaction.atomic():
+            # Matches no row unless a save took the blob back since the delete.
+            if AttachmentBlob.objects.filter(key=key).update(refcount=F('refcount')):
+                return
+            try:
+                os.remove(self.blob_path(key))
+            except FileNotFoundError:
+                pass
+
+    def exists(self, name):
+        if self.blob_key(name) is None:
+            return super().exists(name)
+        blob = self.get_blob(name)
+        return blob is not None and blob.refcount > 0 and os.path.exists(self.blob_path(blob.key))
+
+    def size(self, name):
+        if self.blob_key(name) is None:
+            return super().size(name)
+        blob = self.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(name)
+        return blob.size
+
+    def path(self, name):
+        """
+        The blob file for a content-addressed name. It holds gzip data when
+        ``get_blob(name).compressed`` is set.
+        """
+        key = self.blob_key(name)
+        if key is None:
+            return super().path(name)
+        return self.blob_path(key)
+
+    def url(self, name):
+        if self.url_name:
+            return reverse(self.url_name, args=[name])
+        return super().url(name)
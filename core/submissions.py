@@ -0,0 +1,122 @@
+"""
+Saving contact messages and order requests.
+
+``submit()`` saves a submission together with its notification email in
+one transaction. With ``WRITE_QUEUE_ENABLED`` it hands the submission to
+the single writer of ``core.writequeue`` instead, and falls back to saving
+directly if the writer is not running. If the writer fails or does not
+answer in time, the submission was not saved: its stored files are
+released and ``SubmissionFailed`` is raised, for the view to ask the user
+to try again.
+"""
+
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.db import models, transaction
+
+from . import metrics, outbox, writequeue
+from .models import ContactMessage, OrderRequest
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client is asked to wait before resubmitting after a failure.
+RETRY_AFTER = 60
+
+
+class SubmissionFailed(Exception):
+    """Nothing was saved; the user may submit again."""
+
+
+def save_contact_message(contact_message):
+    contact_message.save()
+    outbox.enqueue(
+        subject=f'New Contact Message: {contact_message.subject}',
+        body=(
+            f'New contact message received:\n\n'
+            f'Name: {contact_message.full_name}\n'
+            f'Email: {contact_message.email}\n'
+            f'Phone: {contact_message.phone or "Not provided"}\n'
+            f'Service Type: {contact_message.get_service_type_display()}\n\n'
+            f'Message:\n{contact_message.message}'
+        ),
+    )
+
+
+def save_order_request(order_request):
+    order_request.save()
+    outbox.enqueue(
+        subject=f'New Order Request #{order_request.order_number}',
+        body=(
+            f'New order received:\n\n'
+            f'Order Number: {order_request.order_number}\n'
+            f'Name: {order_request.full_name}\n'
+            f'Email: {order_request.email}\n'
+            f'Phone: {order_request.phone}\n'
+            f'Service: {order_request.get_service_type_display()}\n\n'
+            f'Project Details:\n{order_request.message}\n\n'
+            f'Attachment: {"Yes" if order_request.attachment else "No"}'
+        ),
+    )
+
+
+SAVERS = {
+    ContactMessage: save_contact_message,
+    OrderRequest: save_order_request,
+}
+
+
+def save_submission(instance):
+    """Save ``instance`` and queue its notification; the caller holds the transaction."""
+    SAVERS[type(instance)](instance)
+    transaction.on_commit(partial(count_submission, instance))
+
+
+def count_submission(instance):
+    metrics.inc(
+        'academiq_form_submissions_total',
+        form=instance._meta.model_name, service_type=instance.service_type,
+    )
+    attachment = getattr(instance, 'attachment', None)
+    if attachment:
+        metrics.inc('academiq_attachment_uploads_total')
+        metrics.inc('academiq_attachment_upload_bytes_total', attachment.size)
+
+
+def submit(instance):
+    """Save an unsaved ``ContactMessage`` or ``OrderRequest`` and queue its notification."""
+    if settings.WRITE_QUEUE_ENABLED:
+        _store_files(instance)
+        try:
+            instance.pk = writequeue.submit(instance)
+            return instance
+        except writequeue.WriteQueueUnavailable as exc:
+            logger.warning('Write queue unavailable, saving directly: %s', exc)
+        except writequeue.WriteQueueError as exc:
+            # The writer rolled back or dropped the submission (see
+            # core.writequeue), so the files stored above belong to no row.
+            logger.error('Write queue did not save a %s: %s', instance._meta.model_name, exc)
+            _release_files(instance)
+            raise SubmissionFailed(exc) from exc
+    # The notification exists exactly when the submission does;
+    # `manage.py send_outbox` delivers it.
+    with transaction.atomic():
+        save_submission(instance)
+    return instance
+
+
+def _store_files(instance):
+    """Store uploaded files here, so only their names travel to the writer."""
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            field.pre_save(instance, add=True)
+
+
+def _release_files(instance):
+    """Undo ``_store_files()``."""
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            stored = getattr(instance, field.attname)
+            if stored:
+                stored.delete(save=False)
@@ -0,0 +1,104 @@
+import json
+
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language_bidi
+
+from core import assets, images
+from core.utility_css import TAILWIND_CONFIG
+
+register = template.Library()
+
+TAILWIND_CDN_URL = 'https://cdn.tailwindcss.com'
+
+CDN_PRECONNECT = mark_safe(
+    '<link rel="preconnect" href="https://fonts.googleapis.com">\n    '
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n    '
+)
+
+
+@register.simple_tag
+def asset_bundle(kind):
+    """
+    Emit the CSS or JS for a page: one bundle built by ``vendor_assets``, or
+    the CDN links plus the project files when bundles are disabled.
+    """
+    direction = 'rtl' if get_language_bidi() else 'ltr'
+    if kind == 'css':
+        if settings.ASSET_BUNDLES_ENABLED:
+            urls = [static(assets.CSS_BUNDLES[direction])]
+            hints = mark_safe('')
+        else:
+            urls = assets.CDN_CSS + [static(path) for path in assets.PROJECT_CSS['ltr']]
+            hints = CDN_PRECONNECT
+        return hints + format_html_join('\n    ', '<link rel="stylesheet" href="{}">', ((url,) for url in urls))
+    if kind == 'js':
+        if settings.ASSET_BUNDLES_ENABLED:
+            urls = [static(assets.JS_BUNDLE)]
+        else:
+            urls = assets.CDN_JS + [static(path) for path in assets.PROJECT_JS]
+        return format_html_join('\n    ', '<script src="{}"></script>', ((url,) for url in urls))
+    raise template.TemplateSyntaxError(f"asset_bundle: unknown kind {kind!r}")
+
+
+@register.simple_tag
+def utility_styles():
+    """
+    Emit the utility stylesheet written by ``build_utility_css``, or the
+    Tailwind runtime and its config when ``UTILITY_CSS_ENABLED`` is False.
+    """
+    if settings.UTILITY_CSS_ENABLED:
+        return format_html('<link rel="stylesheet" href="{}">', static(settings.UTILITY_CSS_PATH))
+    return format_html(
+        '<script src="{}"></script>\n    <script>tailwind.config = {};</script>',
+        TAILWIND_CDN_URL, mark_safe(json.dumps(TAILWIND_CONFIG)),
+    )
+
+
+@register.simple_tag
+def responsive_image(src, sizes='100vw', variants=None, **attrs):
+    """
+    Emit a ``<picture>`` with one ``<source>`` per modern format and a JPEG
+    ``<img>`` fallback, all with ``srcset``/``sizes``.
+
+    ``src`` is a static path whose variants were built by collectstatic, or,
+    when ``variants`` is given, an uploaded file name with its listing (e.g.
+    ``testimonial.image`` and ``testimonial.image_variants``). Without
+    variants a plain ``<img>`` for the original is emitted. Extra keyword
+    arguments become attributes of the ``<img>``; ``loading`` defaults to
+    ``lazy``.
+    """
+    if variants is None:
+        listing = images.static_variants().get(src)
+        url = static
+    else:
+        src = getattr(src, 'name', src)
+        listing = variants
+        url = default_storage.url
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+
+    if not listing or not listing.get('variants'):
+        return format_html('<img src="{}"{}>', url(src), _attributes(attrs))
+
+    def srcset(fmt):
+        return ', '.join(f'{url(path)} {width}w' for width, path in listing['variants'][fmt])
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((images.MIME_TYPES[fmt], srcset(fmt), sizes) for fmt in images.FORMAT_ORDER if fmt != 'jpeg' and fmt in listing['variants']),
+    )
+    fallback = listing['variants'].get('jpeg')
+    img_src = url(fallback[-1][1]) if fallback else url(src)
+    attrs.update(width=listing['width'], height=listing['height'])
+    if fallback:
+        attrs.update(srcset=srcset('jpeg'), sizes=sizes)
+    return format_html('<picture>{}<img src="{}"{}></picture>', sources, img_src, _attributes(attrs))
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', sorted(attrs.items()))
@@ -0,0 +1,23 @@
+from django import template
+from django.conf import settings
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from core.changelist import changelist_cache_key, get_changelist_cache
+
+register = template.Library()
+
+
+def cached_date_hierarchy(cl):
+    """``date_hierarchy`` with its MIN/MAX and DISTINCT date queries cached per filter."""
+    key = changelist_cache_key('dates', cl.opts, cl.get_query_string())
+    return get_changelist_cache().get_or_set(
+        key, lambda: date_hierarchy(cl), settings.ADMIN_CHANGELIST_CACHE_TIMEOUT,
+    )
+
+
+@register.tag(name='cached_date_hierarchy')
+def cached_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token, func=cached_date_hierarchy, template_name='date_hierarchy.html', takes_context=False,
+    )
@@ -1,6 +1,9 @@
 
 from django import template
-from django.urls import translate_url
+from django.conf import settings
+from django.utils.html import format_html_join
+
+from core import language_urls
 
 register = template.Library()
 
@@ -8,6 +11,22 @@ register = template.Library()
 def change_lang(context, lang=None):
     request = context.get('request')
     if request:
-        path = request.path
-        return translate_url(path, lang)
+        return language_urls.translate_path(request.path, lang)
     return '/'
+
+
+@register.simple_tag(takes_context=True)
+def hreflang_links(context):
+    """``<link rel="alternate" hreflang>`` for each language of the current page."""
+    request = context.get('request')
+    if not request:
+        return ''
+    versions = language_urls.alternates(request.path)
+    if not versions:
+        return ''
+    links = [(code, request.build_absolute_uri(path)) for code, path in versions.items()]
+    if settings.LANGUAGE_CODE in versions:
+        links.append(('x-default', request.build_absolute_uri(versions[settings.LANGUAGE_CODE])))
+    return format_html_join(
+        '\n    ', '<link rel="alternate" hreflang="{}" href="{}">', links,
+    )
@@ -0,0 +1,359 @@
+"""
+Tests for the core app.
+"""
+
+import os
+import socket
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core import serializers
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.signals import template_rendered
+
+from . import catalog, conditional, downloads, outbox, page_cache, query_plans, submissions, throttle, writequeue
+from .middleware import StaticFilesMiddleware
+from .models import AttachmentBlob, OrderRequest, OutboundEmail, Testimonial
+from .storage import attachment_storage
+
+# Tests run without collectstatic, so without the hashed-name manifest.
+PLAIN_STATIC_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(PAGE_CACHE_ENABLED=False, STORAGES=PLAIN_STATIC_STORAGES)
+class ConditionalPageTests(TestCase):
+    """Public pages answer revalidations with 304 before rendering anything."""
+
+    def get(self, path='/', **headers):
+        rendered = []
+
+        def capture(sender, template, context, **kwargs):
+            rendered.append(template.name)
+
+        template_rendered.connect(capture)
+        try:
+            response = self.client.get(path, **headers)
+        finally:
+            template_rendered.disconnect(capture)
+        return response, rendered
+
+    def test_if_none_match_skips_render(self):
+        response, rendered = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(rendered)
+        self.assertIn('ETag', response)
+
+        etag = response['ETag']
+        response, rendered = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(rendered, [])
+        self.assertEqual(response.content, b'')
+        # The 304 repeats the (weak) validator the compressed 200 carries.
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since_skips_render(self):
+        response, rendered = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        response, rendered = self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(rendered, [])
+
+    def test_changed_etag_renders(self):
+        response, rendered = self.get(HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(rendered)
+
+    def test_vary(self):
+        response, _ = self.get()
+        vary = {value.strip().lower() for value in response['Vary'].split(',')}
+        self.assertLessEqual({'accept-language', 'cookie'}, vary)
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        vary = {value.strip().lower() for value in response['Vary'].split(',')}
+        self.assertLessEqual({'accept-language', 'cookie'}, vary)
+
+
+@override_settings(CACHES={**settings.CACHES, settings.SHARED_CACHE_ALIAS: {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-shared',
+}})
+class PageValidatorTests(TestCase):
+    """The validators change whenever the rendered pages can."""
+
+    def setUp(self):
+        catalog._snapshot = None
+        conditional.page_build.cache_clear()
+        self.addCleanup(conditional.page_build.cache_clear)
+
+    def test_last_modified_survives_deactivation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Testimonial.objects.create(name='Older', title='Dr', content='Good')
+            newest = Testimonial.objects.create(name='Newer', title='Dr', content='Great')
+        before = catalog.get_catalog().last_modified
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.is_active = False
+            newest.save()
+        after = catalog.get_catalog().last_modified
+        self.assertEqual(len(catalog.active_testimonials()), 1)
+        self.assertGreaterEqual(after, before)
+        self.assertGreaterEqual(after, newest.updated_at)
+
+    def test_build_hash_covers_asset_settings(self):
+        build_hash, _ = conditional.page_build()
+        conditional.page_build.cache_clear()
+        with override_settings(UTILITY_CSS_ENABLED=not settings.UTILITY_CSS_ENABLED):
+            self.assertNotEqual(conditional.page_build()[0], build_hash)
+        conditional.page_build.cache_clear()
+        with override_settings(ASSET_BUNDLES_ENABLED=not settings.ASSET_BUNDLES_ENABLED):
+            self.assertNotEqual(conditional.page_build()[0], build_hash)
+
+    def test_build_hash_covers_translations(self):
+        build_hash, _ = conditional.page_build()
+        conditional.page_build.cache_clear()
+        with tempfile.TemporaryDirectory() as locale:
+            os.makedirs(os.path.join(locale, 'ar', 'LC_MESSAGES'))
+            with open(os.path.join(locale, 'ar', 'LC_MESSAGES', 'django.mo'), 'wb') as f:
+                f.write(b'compiled')
+            with override_settings(LOCALE_PATHS=[*settings.LOCALE_PATHS, locale]):
+                self.assertNotEqual(conditional.page_build()[0], build_hash)
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    PAGE_CACHE_ENABLED=True,
+    CACHES={
+        **settings.CACHES,
+        settings.PAGE_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-pages'},
+        settings.SHARED_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-shared'},
+    },
+)
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.enterContext(override_settings(METRICS_DIR=metrics_dir.name))
+        page_cache.reset_page_cache_stats()
+
+    def test_query_string_shares_entry(self):
+        self.assertEqual(self.client.get('/about/?utm_source=a')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/about/?utm_source=b')['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/about/')['X-Page-Cache'], 'HIT')
+
+    def test_stats_count_since_reset(self):
+        self.client.get('/about/')
+        self.client.get('/about/')
+        page_cache.reset_page_cache_stats()
+        self.client.get('/about/')
+        self.client.get('/services/')
+        stats = page_cache.get_page_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, THROTTLE_ENABLED=False, WRITE_QUEUE_ENABLED=True)
+class WriteQueueFailureTests(TestCase):
+    """A write queue failure saves nothing, keeps no file and asks for a retry."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def post_order(self):
+        return self.client.post('/order/', {
+            'full_name': 'Test Client',
+            'email': 'client@example.com',
+            'phone': '+123456789012',
+            'service_type': 'thesis',
+            'message': 'Details',
+            'attachment': SimpleUploadedFile('brief.txt', b'brief ' * 100, 'text/plain'),
+        })
+
+    def test_no_reply_releases_attachment(self):
+        error = writequeue.WriteQueueError('No reply from the write queue: timed out')
+        with mock.patch.object(writequeue, 'submit', side_effect=error), self.assertLogs('core.submissions', 'ERROR'):
+            response = self.post_order()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(submissions.RETRY_AFTER))
+        self.assertEqual(response.context['form']['full_name'].value(), 'Test Client')
+        self.assertFalse(OrderRequest.objects.exists())
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_busy_writer_falls_back_to_direct_save(self):
+        busy = BlockingIOError(11, 'Resource temporarily unavailable')
+        with mock.patch.object(socket.socket, 'connect', side_effect=busy), self.assertLogs('core.submissions', 'WARNING'):
+            response = self.post_order()
+        self.assertRedirects(response, '/order/success/', fetch_redirect_response=False)
+        self.assertEqual(OrderRequest.objects.count(), 1)
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 1)
+
+    def test_writer_drops_expired_submission(self):
+        instance = OrderRequest(
+            full_name='Test Client', email='client@example.com', phone='+123456789012',
+            service_type='thesis', message='Details',
+        )
+        pending = writequeue.PendingWrite(serializers.serialize('json', [instance]).encode('utf-8'))
+        pending.expires = 0
+        with tempfile.TemporaryDirectory() as directory:
+            server = writequeue.WriteQueueServer(os.path.join(directory, 'queue.sock'), lambda obj: obj.save())
+            try:
+                with self.assertLogs('core.writequeue', 'WARNING'):
+                    server.write([pending])
+            finally:
+                server.server_close()
+        self.assertIn('error', pending.result)
+        self.assertFalse(OrderRequest.objects.exists())
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    """A 304 for a static file keeps the caching headers of the 200."""
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        os.makedirs(os.path.join(root.name, 'css'))
+        for name in ('site.css', 'site.0123456789ab.css'):
+            with open(os.path.join(root.name, 'css', name), 'w') as f:
+                f.write('body { margin: 0; }')
+        self.enterContext(override_settings(STATIC_ROOT=root.name, STATIC_URL='/static/', STATIC_SERVE=True))
+        self.middleware = StaticFilesMiddleware(lambda request: None)
+        self.middleware.immutable_names = {'css/site.0123456789ab.css'}
+
+    def revalidate(self, path):
+        response = self.middleware(RequestFactory().get(path))
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        not_modified = self.middleware(RequestFactory().get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']))
+        self.assertEqual(not_modified.status_code, 304)
+        for header in ('Cache-Control', 'Last-Modified', 'Vary'):
+            self.assertEqual(not_modified[header], response[header])
+        return not_modified
+
+    def test_hashed_file(self):
+        response = self.revalidate('/static/css/site.0123456789ab.css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_plain_file(self):
+        response = self.revalidate('/static/css/site.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class OutboxTests(TestCase):
+    """One undeliverable message does not hold up the rest of the outbox."""
+
+    def test_enqueue_folds_subject_lines(self):
+        message = outbox.enqueue('New Contact Message: Hello\r\nBcc: victim@example.com', 'Body')
+        self.assertEqual(message.subject, 'New Contact Message: Hello Bcc: victim@example.com')
+
+    def test_bad_header_is_a_failed_attempt(self):
+        fields = {'body': 'Body', 'from_email': 'a@example.com', 'recipients': ['b@example.com']}
+        # Saved directly, as messages queued before enqueue() folded subjects were.
+        poison = OutboundEmail.objects.create(subject='Hello\r\nBcc: x@example.com', **fields)
+        good = OutboundEmail.objects.create(subject='Hello', **fields)
+        with self.assertLogs('core.outbox', 'WARNING'):
+            self.assertEqual(outbox.drain(), (1, 1))
+        poison.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual((poison.status, poison.attempts), (OutboundEmail.STATUS_QUEUED, 1))
+        self.assertIn('BadHeaderError', poison.last_error)
+        self.assertEqual(good.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class AttachmentTests(TestCase):
+    """Attachment blobs: shared storage, removal and download."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, ATTACHMENT_SENDFILE_MODE=''))
+        self.storage = attachment_storage()
+
+    def download(self, filename, content):
+        name = self.storage.save(f'order_attachments/{filename}', ContentFile(content))
+        response = downloads.serve_file(RequestFactory().get('/'), self.storage, name, filename)
+        self.addCleanup(response.close)
+        return response
+
+    def test_compressed_blob_is_not_sent_by_descriptor(self):
+        content = b'thesis chapter one\n' * 500
+        response = self.download('brief.txt', content)
+        self.assertTrue(AttachmentBlob.objects.get().compressed)
+        self.assertFalse(hasattr(response.file_to_stream, 'fileno'))
+        self.assertEqual(b''.join(response.streaming_content), content)
+
+    def test_save_racing_removal_keeps_blob(self):
+        content = os.urandom(4096)
+        first = self.storage.save('order_attachments/brief.pdf', ContentFile(content))
+        with self.captureOnCommitCallbacks() as removals:
+            self.storage.delete(first)
+        self.assertFalse(AttachmentBlob.objects.exists())
+        # A new order with the same file is saved before the removal runs.
+        second = self.storage.save('order_attachments/brief.pdf', ContentFile(content))
+        for removal in removals:
+            removal()
+        self.assertEqual(AttachmentBlob.objects.get().refcount, 1)
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), content)
+
+    def test_removal_unlinks_unreferenced_blob(self):
+        name = self.storage.save('order_attachments/brief.pdf', ContentFile(b'%PDF-1.4 brief'))
+        path = self.storage.blob_path(self.storage.blob_key(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(name)
+        self.assertFalse(os.path.exists(path))
+
+    def test_plain_blob_is_sent_by_descriptor(self):
+        content = os.urandom(4096)
+        response = self.download('brief.pdf', content)
+        self.assertTrue(hasattr(response.file_to_stream, 'fileno'))
+        self.assertEqual(b''.join(response.streaming_content), content)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES)
+class QueryPlanTests(TestCase):
+    """No query of the public views or the admin changelists scans a table or sorts in a temporary B-tree."""
+
+    @classmethod
+    def setUpTestData(cls):
+        query_plans.populate()
+
+    def assertPlansUseIndexes(self, scenario):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN checks need SQLite.')
+        plans = query_plans.run(scenario)
+        self.assertTrue(plans)
+        for plan in plans:
+            with self.subTest(scenario=plan.scenario, sql=plan.sql):
+                self.assertEqual(plan.problems, [], '\n'.join(plan.steps))
+
+    def test_public_views(self):
+        self.assertPlansUseIndexes(query_plans.run_views)
+
+    def test_admin_changelists(self):
+        self.assertPlansUseIndexes(query_plans.run_changelists)
+
+
+class ClientIpTests(SimpleTestCase):
+
+    @override_settings(THROTTLE_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_forwarded_for_uses_proxy_entry(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='203.0.113.9, 198.51.100.7', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(throttle.client_ip(request), '198.51.100.7')
+
+    @override_settings(THROTTLE_IP_HEADER='HTTP_X_REAL_IP')
+    def test_missing_header_falls_back_to_peer(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(throttle.client_ip(request), '10.0.0.2')
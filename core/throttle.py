@@ -0,0 +1,137 @@
+"""
+Abuse throttling for the contact and order forms.
+
+Each submission takes one token from several token buckets kept in the
+``throttle`` cache alias, which all workers share (see
+``THROTTLE_CACHE_BACKEND``). A bucket holds up to ``burst`` tokens and
+refills at ``burst / seconds`` tokens per second; see ``THROTTLE_LIMITS``
+and ``THROTTLE_GLOBAL_LIMIT``.
+
+``@throttle(endpoint)`` checks the buckets that need nothing from the
+body, per client address and the global budget, before the view runs, so
+an over-limit POST is rejected before its form or upload is parsed. The
+view calls ``check_submission()`` once the form is valid, for the buckets
+keyed by the submitted email and service type; that happens before
+anything is written. Both answer ``429`` with ``Retry-After``.
+
+The buckets are read and written with ``get_many``/``set_many``, so on the
+file backend two workers racing for the same bucket may both get its
+last token. The limits are approximate by that much.
+"""
+
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+from django.views.decorators.csrf import csrf_protect
+
+from . import metrics
+
+KEY_PREFIX = 'throttle'
+
+
+class Throttled(Exception):
+
+    def __init__(self, endpoint, scope, retry_after):
+        super().__init__(f'{endpoint} submissions over the {scope} limit')
+        self.endpoint = endpoint
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def get_throttle_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def _bucket_key(*parts):
+    digest = hashlib.md5('\0'.join(parts).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def client_ip(request):
+    ip = request.META.get(settings.THROTTLE_IP_HEADER) or request.META.get('REMOTE_ADDR', '')
+    # X-Forwarded-For style lists: the client writes the leading entries
+    # itself; the last one is the address the trusted proxy saw.
+    return ip.split(',')[-1].strip()
+
+
+def take(endpoint, buckets, now=None):
+    """
+    Take a token from each of ``buckets`` (``[(scope, key, (burst, seconds))]``),
+    or from none of them if one is empty; raises ``Throttled`` then.
+    """
+    now = time.time() if now is None else now
+    cache = get_throttle_cache()
+    states = cache.get_many([key for _scope, key, _limit in buckets])
+    updated = {}
+    for scope, key, (burst, seconds) in buckets:
+        tokens, stamp = states.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * burst / seconds)
+        if tokens < 1:
+            raise Throttled(endpoint, scope, math.ceil((1 - tokens) * seconds / burst))
+        updated[key] = (tokens - 1, now)
+    # An untouched bucket is full again after its refill time.
+    cache.set_many(updated, timeout=max(seconds for _scope, _key, (_burst, seconds) in buckets))
+
+
+def check_request(request, endpoint):
+    """Take the per-address and global tokens of a submission to ``endpoint``."""
+    limits = settings.THROTTLE_LIMITS.get(endpoint, {})
+    buckets = [('global', _bucket_key('global'), settings.THROTTLE_GLOBAL_LIMIT)]
+    if 'ip' in limits:
+        buckets.append(('ip', _bucket_key(endpoint, 'ip', client_ip(request)), limits['ip']))
+    take(endpoint, buckets)
+
+
+def check_submission(endpoint, email, service_type):
+    """Take the per-email and per-service-type tokens of a valid submission."""
+    if not settings.THROTTLE_ENABLED:
+        return
+    limits = settings.THROTTLE_LIMITS.get(endpoint, {})
+    buckets = []
+    if 'email' in limits and email:
+        buckets.append(('email', _bucket_key(endpoint, 'email', email.strip().lower()), limits['email']))
+    service_limits = limits.get('service_type', {})
+    service_limit = service_limits.get(service_type, service_limits.get('*'))
+    if service_limit:
+        buckets.append(('service_type', _bucket_key(endpoint, 'service_type', service_type), service_limit))
+    if buckets:
+        take(endpoint, buckets)
+
+
+def throttled_response(request, exc):
+    metrics.inc('academiq_throttle_rejections_total', endpoint=exc.endpoint, scope=exc.scope)
+    response = render(request, '429.html', {'retry_minutes': math.ceil(exc.retry_after / 60)}, status=429)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+def throttle(endpoint):
+    """
+    Throttle POSTs to the decorated view, and catch ``Throttled`` from it.
+
+    CsrfViewMiddleware reads the body of every POST before the view runs,
+    so the view is marked exempt and its CSRF check moved behind the
+    throttle. A view that is already exempt checks CSRF itself (``order``
+    does, after installing its upload handler).
+    """
+    def decorator(view_func):
+        protected = view_func if getattr(view_func, 'csrf_exempt', False) else csrf_protect(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'POST' or not settings.THROTTLE_ENABLED:
+                return protected(request, *args, **kwargs)
+            metrics.inc('academiq_throttle_checks_total', endpoint=endpoint)
+            try:
+                check_request(request, endpoint)
+                return protected(request, *args, **kwargs)
+            except Throttled as exc:
+                return throttled_response(request, exc)
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
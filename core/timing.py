@@ -0,0 +1,85 @@
+"""
+Per-request phase timings.
+
+``core.middleware.ServerTimingMiddleware`` opens a ``RequestTimings`` for
+each request. While it is open, every SQL statement is timed through
+``connection.execute_wrapper``, template renders through the
+``TimedDjangoTemplates`` backend (Django only sends its
+``template_rendered`` signal under the test runner) and queuing the
+notification emails through ``phase('mail')`` in ``core.outbox``. Outside
+a request, ``phase()`` does nothing.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Milliseconds and counts per phase of one request."""
+
+    def __init__(self):
+        self.durations = Counter()
+        self.counts = Counter()
+        self._depth = Counter()
+
+    def add(self, name, seconds, count=1):
+        self.durations[name] += seconds * 1000
+        self.counts[name] += count
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('db', time.perf_counter() - started)
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Time the block as ``name`` in the current request; nested blocks count once."""
+    timings = _current.get()
+    if timings is None or timings._depth[name]:
+        yield
+        return
+    timings._depth[name] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._depth[name] -= 1
+        timings.add(name, time.perf_counter() - started)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with phase('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with every top-level render timed as ``tpl``."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,140 @@
+"""
+Upload screening for order attachments.
+
+``AttachmentUploadHandler`` runs ahead of Django's default upload handlers
+on the order endpoint. It checks the file name's extension as soon as the
+part starts, the leading magic bytes as soon as the first chunk arrives,
+and the size after every chunk, and aborts the transfer with
+``StopUpload(connection_reset=True)`` on the first violation, so a rejected
+upload is never received or spooled in full. The SHA-256 digest is computed
+while the data streams through and attached to the uploaded file as
+``sha256``.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.utils.translation import gettext_lazy as _
+
+ATTACHMENT_FIELD = 'attachment'
+ALLOWED_UPLOAD_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.zip', '.rar'}
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50 MB
+
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08')
+MAGIC_SIGNATURES = {
+    '.pdf': (b'%PDF-',),
+    '.doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'{\\rtf'),
+    '.docx': ZIP_SIGNATURES,
+    '.zip': ZIP_SIGNATURES,
+    '.rar': (b'Rar!\x1a\x07\x00', b'Rar!\x1a\x07\x01\x00'),
+}
+# Plain text has no signature; reject binaries instead.
+TEXT_BOMS = (b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')
+BINARY_SIGNATURES = (b'MZ', b'\x7fELF', b'\xcf\xfa\xed\xfe')
+MAGIC_HEAD_SIZE = 1024
+
+INVALID_TYPE_ERROR = _('Invalid file type. Allowed: PDF, DOC, DOCX, TXT, ZIP, RAR.')
+TOO_LARGE_ERROR = _('File size exceeds the 50 MB limit.')
+CONTENT_MISMATCH_ERROR = _('The file contents do not match its extension.')
+
+
+def extension_allowed(name):
+    return os.path.splitext(name or '')[1].lower() in ALLOWED_UPLOAD_EXTENSIONS
+
+
+def magic_matches(extension, head):
+    """Whether the leading bytes ``head`` look like a file of ``extension``."""
+    if extension == '.txt':
+        if head.startswith(TEXT_BOMS):
+            return True
+        return b'\x00' not in head and not head.startswith(BINARY_SIGNATURES)
+    return head.startswith(MAGIC_SIGNATURES.get(extension, ()))
+
+
+class AttachmentUploadHandler(FileUploadHandler):
+    """
+    Screen the ``attachment`` part of an order upload while it streams.
+    Data is passed on unchanged to the handlers that follow.
+
+    After parsing, ``error`` holds the rejection message (or None) and
+    ``sha256``/``size`` describe the accepted file.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+        self.sha256 = None
+        self.size = 0
+        self.screening = False
+        self.body_length = None
+        self.extension = ''
+        self.head = None
+        self.digest = None
+
+    @classmethod
+    def install(cls, request):
+        """Put a screening handler first; call before ``request.POST``/``FILES`` are read."""
+        handler = cls(request)
+        request.upload_handlers.insert(0, handler)
+        return handler
+
+    def reject(self, message):
+        self.error = message
+        self.screening = False
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.body_length = content_length
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.screening = field_name == ATTACHMENT_FIELD
+        if not self.screening:
+            return
+        self.extension = os.path.splitext(file_name)[1].lower()
+        self.head = b''
+        self.digest = hashlib.sha256()
+        self.size = 0
+        if self.extension not in ALLOWED_UPLOAD_EXTENSIONS:
+            self.reject(INVALID_TYPE_ERROR)
+        # Everything but the file is capped at DATA_UPLOAD_MAX_MEMORY_SIZE, so
+        # a larger body means the file alone is over the limit.
+        if content_length and content_length > MAX_UPLOAD_SIZE:
+            self.reject(TOO_LARGE_ERROR)
+        form_budget = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        if self.body_length and self.body_length > MAX_UPLOAD_SIZE + form_budget:
+            self.reject(TOO_LARGE_ERROR)
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.screening:
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > MAX_UPLOAD_SIZE:
+            self.reject(TOO_LARGE_ERROR)
+        if self.head is not None:
+            self.head += raw_data[:MAGIC_HEAD_SIZE - len(self.head)]
+            if len(self.head) >= MAGIC_HEAD_SIZE:
+                self.check_magic()
+        self.digest.update(raw_data)
+        return raw_data
+
+    def check_magic(self):
+        if not magic_matches(self.extension, self.head):
+            self.reject(CONTENT_MISMATCH_ERROR)
+        self.head = None
+
+    def file_complete(self, file_size):
+        if self.screening:
+            if self.head is not None:
+                self.check_magic()
+            self.sha256 = self.digest.hexdigest()
+            self.screening = False
+        return None
+
+    def annotate(self, files):
+        """Attach ``sha256`` to the accepted attachment in ``request.FILES``."""
+        uploaded = files.get(ATTACHMENT_FIELD)
+        if uploaded is not None and self.sha256:
+            uploaded.sha256 = self.sha256
@@ -0,0 +1,755 @@
+"""
+Build-time generator for the Tailwind-style utility classes used by the
+templates.
+
+``base.html`` used to load the Tailwind Play CDN, which ships a JIT compiler
+to every visitor and builds the stylesheet in the browser. This module scans
+the templates (and the classes toggled from JavaScript) for the utilities
+actually used and renders them, with the theme below, into a static
+stylesheet. ``manage.py build_utility_css`` writes it; ``{% utility_styles %}``
+switches between that file and the runtime script.
+
+Only the subset of Tailwind v3 that the site uses is implemented; unknown
+classes are reported by ``build_utility_css --check``.
+"""
+
+import re
+from collections import namedtuple
+
+# Mirrors the inline ``tailwind.config`` the runtime script is given.
+TAILWIND_CONFIG = {
+    'darkMode': 'class',
+    'theme': {
+        'extend': {
+            'colors': {
+                'primary': {
+                    '50': '#f0f9ff', '100': '#e0f2fe', '200': '#bae6fd', '300': '#7dd3fc',
+                    '400': '#38bdf8', '500': '#0ea5e9', '600': '#0284c7', '700': '#0369a1',
+                    '800': '#075985', '900': '#0c4a6e',
+                },
+                'secondary': {
+                    '50': '#f8fafc', '100': '#f1f5f9', '200': '#e2e8f0', '300': '#cbd5e1',
+                    '400': '#94a3b8', '500': '#64748b', '600': '#475569', '700': '#334155',
+                    '800': '#1e293b', '900': '#0f172a', '950': '#020617',
+                },
+            },
+            'fontFamily': {
+                'sans': ['Outfit', 'Tajawal', 'sans-serif'],
+            },
+        },
+    },
+}
+
+DEFAULT_COLORS = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280',
+             '#4b5563', '#374151', '#1f2937', '#111827', '#030712'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444',
+            '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'],
+    'amber': ['#fffbeb', '#fef3c7', '#fde68a', '#fcd34d', '#fbbf24', '#f59e0b',
+              '#d97706', '#b45309', '#92400e', '#78350f', '#451a03'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308',
+               '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e',
+              '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6',
+             '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1',
+               '#4f46e5', '#4338ca', '#3730a3', '#312e81', '#1e1b4b'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7',
+               '#9333ea', '#7e22ce', '#6b21a8', '#581c87', '#3b0764'],
+    'pink': ['#fdf2f8', '#fce7f3', '#fbcfe8', '#f9a8d4', '#f472b6', '#ec4899',
+             '#db2777', '#be185d', '#9d174d', '#831843', '#500724'],
+}
+SHADES = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950']
+
+SCREENS = [('sm', 640), ('md', 768), ('lg', 1024), ('xl', 1280), ('2xl', 1536)]
+
+# Variants in the order Tailwind emits them; later variants win ties.
+VARIANTS = ['hover', 'focus', 'group-hover', 'rtl', 'dark']
+
+# Tailwind's core plugin order, which decides the cascade between utilities.
+PLUGIN_ORDER = [
+    'pointer-events', 'position', 'inset', 'z-index', 'grid-column', 'float', 'margin',
+    'display', 'aspect-ratio', 'height', 'min-height', 'width', 'max-width', 'flex',
+    'flex-shrink', 'flex-grow', 'transform-values', 'transform', 'animation', 'cursor',
+    'appearance', 'grid-template-columns', 'flex-direction', 'align-items', 'justify-content',
+    'gap', 'space', 'divide-width', 'divide-color', 'overflow', 'scroll-behavior',
+    'border-radius', 'border-width', 'border-style', 'border-color', 'background-color',
+    'background-image', 'gradient-stops', 'background-clip', 'object-fit', 'padding',
+    'text-align', 'font-family', 'font-size', 'font-weight', 'text-transform', 'font-style',
+    'line-height', 'letter-spacing', 'text-color', 'text-decoration', 'opacity',
+    'mix-blend-mode', 'box-shadow', 'box-shadow-color', 'outline', 'ring-color', 'blur',
+    'filter', 'backdrop-blur', 'transition', 'duration',
+]
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1'),
+}
+FONT_WEIGHTS = {
+    'thin': '100', 'light': '300', 'normal': '400', 'medium': '500',
+    'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900',
+}
+MAX_WIDTHS = {
+    'none': 'none', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem',
+    'xl': '36rem', '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem',
+    '6xl': '72rem', '7xl': '80rem', 'full': '100%',
+}
+RADII = {
+    'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+    'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px',
+}
+SHADOWS = {
+    'sm': ['0 1px 2px 0 {}'],
+    '': ['0 1px 3px 0 {}', '0 1px 2px -1px {}'],
+    'md': ['0 4px 6px -1px {}', '0 2px 4px -2px {}'],
+    'lg': ['0 10px 15px -3px {}', '0 4px 6px -4px {}'],
+    'xl': ['0 20px 25px -5px {}', '0 8px 10px -6px {}'],
+    '2xl': ['0 25px 50px -12px {}'],
+}
+SHADOW_ALPHA = {'sm': '0.05', '2xl': '0.25'}
+BLURS = {
+    'none': '0', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px',
+    'xl': '24px', '2xl': '40px', '3xl': '64px',
+}
+LINE_HEIGHTS = {
+    'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5',
+    'relaxed': '1.625', 'loose': '2',
+}
+LETTER_SPACINGS = {
+    'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em',
+    'wide': '0.025em', 'wider': '0.05em', 'widest': '0.1em',
+}
+GRADIENT_DIRECTIONS = {
+    't': 'to top', 'tr': 'to top right', 'r': 'to right', 'br': 'to bottom right',
+    'b': 'to bottom', 'bl': 'to bottom left', 'l': 'to left', 'tl': 'to top left',
+}
+DISPLAYS = {
+    'block': 'block', 'inline-block': 'inline-block', 'inline': 'inline', 'flex': 'flex',
+    'inline-flex': 'inline-flex', 'grid': 'grid', 'hidden': 'none', 'contents': 'contents',
+}
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, '
+        'opacity, box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+ANIMATIONS = {
+    'spin': ('spin 1s linear infinite', '@keyframes spin{to{transform:rotate(360deg)}}'),
+    'ping': ('ping 1s cubic-bezier(0, 0, 0.2, 1) infinite',
+             '@keyframes ping{75%,100%{transform:scale(2);opacity:0}}'),
+    'pulse': ('pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite',
+              '@keyframes pulse{50%{opacity:.5}}'),
+    'bounce': ('bounce 1s infinite',
+               '@keyframes bounce{0%,100%{transform:translateY(-25%);'
+               'animation-timing-function:cubic-bezier(0.8,0,1,1)}'
+               '50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}'),
+}
+
+TRANSFORM = (
+    'translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+    'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) '
+    'scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))'
+)
+SIBLINGS = ' > :not([hidden]) ~ :not([hidden])'
+
+PREFLIGHT = """
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:{sans};font-feature-settings:normal;font-variation-settings:normal}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono","Courier New",monospace;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type='button'],[type='reset'],[type='submit']{-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-blur: ;--tw-gradient-from-position: ;--tw-gradient-via-position: ;--tw-gradient-to-position: }
+"""
+
+Utility = namedtuple('Utility', ['plugin', 'rules', 'keyframes'])
+
+
+class UnknownUtility(ValueError):
+    pass
+
+
+# Colors
+
+def _palette():
+    colors = {name: dict(zip(SHADES, shades)) for name, shades in DEFAULT_COLORS.items()}
+    for name, shades in TAILWIND_CONFIG['theme']['extend']['colors'].items():
+        colors.setdefault(name, {}).update(shades)
+    return colors
+
+
+PALETTE = _palette()
+
+
+def _rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def color_value(token, alpha=None):
+    """Resolve ``primary-500``, ``white/80`` etc. to a CSS color, or None."""
+    token, _, modifier = token.partition('/')
+    if modifier:
+        if not modifier.isdigit():
+            return None
+        alpha = int(modifier) / 100
+    if token == 'transparent':
+        return 'transparent'
+    if token == 'current':
+        return 'currentColor'
+    if token in ('white', 'black'):
+        rgb = (255, 255, 255) if token == 'white' else (0, 0, 0)
+    else:
+        name, _, shade = token.rpartition('-')
+        hex_color = PALETTE.get(name, {}).get(shade)
+        if hex_color is None:
+            return None
+        rgb = _rgb(hex_color)
+    if alpha is None:
+        return 'rgb({} {} {})'.format(*rgb)
+    return 'rgb({} {} {} / {:g})'.format(*rgb, alpha)
+
+
+# Values
+
+def arbitrary(value):
+    if value.startswith('[') and value.endswith(']'):
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def spacing(value, negative=False):
+    result = arbitrary(value)
+    if result is None:
+        if value == 'px':
+            result = '1px'
+        elif value == '0':
+            result = '0px'
+        elif re.fullmatch(r'\d+(\.5)?', value):
+            result = f'{float(value) / 4:g}rem'
+        elif re.fullmatch(r'\d+/\d+', value):
+            numerator, denominator = (int(part) for part in value.split('/'))
+            result = _percent(numerator / denominator)
+        elif value == 'full':
+            result = '100%'
+        elif value == 'auto':
+            result = 'auto'
+        else:
+            raise UnknownUtility(value)
+    if negative:
+        if result in ('auto', '0px'):
+            raise UnknownUtility(value)
+        result = '-' + result
+    return result
+
+
+def _percent(fraction):
+    return ('%.6f' % (fraction * 100)).rstrip('0').rstrip('.') + '%'
+
+
+def size(value, axis):
+    if value == 'screen':
+        return '100vh' if axis == 'height' else '100vw'
+    return spacing(value)
+
+
+# Resolution
+
+SIDES = {
+    '': [''], 'x': ['-left', '-right'], 'y': ['-top', '-bottom'],
+    't': ['-top'], 'r': ['-right'], 'b': ['-bottom'], 'l': ['-left'],
+}
+INSET_SIDES = {
+    'inset': ['top', 'right', 'bottom', 'left'], 'inset-x': ['left', 'right'],
+    'inset-y': ['top', 'bottom'], 'top': ['top'], 'right': ['right'],
+    'bottom': ['bottom'], 'left': ['left'],
+}
+STATIC = {
+    'pointer-events-none': ('pointer-events', [('pointer-events', 'none')]),
+    'pointer-events-auto': ('pointer-events', [('pointer-events', 'auto')]),
+    'static': ('position', [('position', 'static')]),
+    'fixed': ('position', [('position', 'fixed')]),
+    'absolute': ('position', [('position', 'absolute')]),
+    'relative': ('position', [('position', 'relative')]),
+    'sticky': ('position', [('position', 'sticky')]),
+    'float-right': ('float', [('float', 'right')]),
+    'float-left': ('float', [('float', 'left')]),
+    'float-none': ('float', [('float', 'none')]),
+    'flex-1': ('flex', [('flex', '1 1 0%')]),
+    'flex-shrink-0': ('flex-shrink', [('flex-shrink', '0')]),
+    'shrink-0': ('flex-shrink', [('flex-shrink', '0')]),
+    'flex-grow': ('flex-grow', [('flex-grow', '1')]),
+    'grow': ('flex-grow', [('flex-grow', '1')]),
+    'transform': ('transform', [('transform', TRANSFORM)]),
+    'transform-none': ('transform', [('transform', 'none')]),
+    'cursor-pointer': ('cursor', [('cursor', 'pointer')]),
+    'appearance-none': ('appearance', [('-webkit-appearance', 'none'), ('appearance', 'none')]),
+    'flex-row': ('flex-direction', [('flex-direction', 'row')]),
+    'flex-col': ('flex-direction', [('flex-direction', 'column')]),
+    'items-start': ('align-items', [('align-items', 'flex-start')]),
+    'items-end': ('align-items', [('align-items', 'flex-end')]),
+    'items-center': ('align-items', [('align-items', 'center')]),
+    'justify-start': ('justify-content', [('justify-content', 'flex-start')]),
+    'justify-end': ('justify-content', [('justify-content', 'flex-end')]),
+    'justify-center': ('justify-content', [('justify-content', 'center')]),
+    'justify-between': ('justify-content', [('justify-content', 'space-between')]),
+    'justify-around': ('justify-content', [('justify-content', 'space-around')]),
+    'overflow-hidden': ('overflow', [('overflow', 'hidden')]),
+    'overflow-auto': ('overflow', [('overflow', 'auto')]),
+    'scroll-smooth': ('scroll-behavior', [('scroll-behavior', 'smooth')]),
+    'border-solid': ('border-style', [('border-style', 'solid')]),
+    'border-dashed': ('border-style', [('border-style', 'dashed')]),
+    'bg-clip-text': ('background-clip', [('-webkit-background-clip', 'text'), ('background-clip', 'text')]),
+    'object-cover': ('object-fit', [('object-fit', 'cover')]),
+    'object-contain': ('object-fit', [('object-fit', 'contain')]),
+    'text-left': ('text-align', [('text-align', 'left')]),
+    'text-center': ('text-align', [('text-align', 'center')]),
+    'text-right': ('text-align', [('text-align', 'right')]),
+    'uppercase': ('text-transform', [('text-transform', 'uppercase')]),
+    'lowercase': ('text-transform', [('text-transform', 'lowercase')]),
+    'capitalize': ('text-transform', [('text-transform', 'capitalize')]),
+    'italic': ('font-style', [('font-style', 'italic')]),
+    'not-italic': ('font-style', [('font-style', 'normal')]),
+    'underline': ('text-decoration', [('text-decoration-line', 'underline')]),
+    'no-underline': ('text-decoration', [('text-decoration-line', 'none')]),
+    'mix-blend-multiply': ('mix-blend-mode', [('mix-blend-mode', 'multiply')]),
+    'outline-none': ('outline', [('outline', '2px solid transparent'), ('outline-offset', '2px')]),
+    'filter': ('filter', [('filter', 'var(--tw-blur)')]),
+    'filter-none': ('filter', [('filter', 'none')]),
+}
+
+
+def resolve(utility):
+    """Return the :class:`Utility` for a class without variants."""
+    if utility in STATIC:
+        plugin, declarations = STATIC[utility]
+        return Utility(plugin, [('', declarations)], None)
+    if utility in DISPLAYS:
+        return Utility('display', [('', [('display', DISPLAYS[utility])])], None)
+
+    negative = utility.startswith('-')
+    name = utility[1:] if negative else utility
+
+    for resolver in RESOLVERS:
+        result = resolver(name, negative)
+        if result is not None:
+            return result
+    raise UnknownUtility(utility)
+
+
+def _simple(plugin, declarations):
+    return Utility(plugin, [('', declarations)], None)
+
+
+def _inset(name, negative):
+    match = re.fullmatch(r'(inset-x|inset-y|inset|top|right|bottom|left)-(.+)', name)
+    if match:
+        value = spacing(match.group(2), negative)
+        return _simple('inset', [(side, value) for side in INSET_SIDES[match.group(1)]])
+
+
+def _z_index(name, negative):
+    match = re.fullmatch(r'z-(\d+|\[\d+\]|auto)', name)
+    if match:
+        value = arbitrary(match.group(1)) or match.group(1)
+        return _simple('z-index', [('z-index', ('-' if negative else '') + value)])
+
+
+def _box(name, negative, prefix, prop, plugin):
+    match = re.fullmatch(prefix + r'([xytrbl]?)-(.+)', name)
+    if match:
+        value = spacing(match.group(2), negative)
+        return _simple(plugin, [(prop + side, value) for side in SIDES[match.group(1)]])
+
+
+def _margin(name, negative):
+    return _box(name, negative, 'm', 'margin', 'margin')
+
+
+def _padding(name, negative):
+    if not negative:
+        return _box(name, negative, 'p', 'padding', 'padding')
+
+
+def _sizing(name, negative):
+    match = re.fullmatch(r'(min-h|h|w)-(.+)', name)
+    if match and not negative:
+        kind, value = match.groups()
+        if kind == 'min-h':
+            return _simple('min-height', [('min-height', size(value, 'height'))])
+        if kind == 'h':
+            return _simple('height', [('height', size(value, 'height'))])
+        return _simple('width', [('width', size(value, 'width'))])
+
+
+def _max_width(name, negative):
+    match = re.fullmatch(r'max-w-(.+)', name)
+    if match and not negative:
+        value = MAX_WIDTHS.get(match.group(1)) or arbitrary(match.group(1))
+        if value:
+            return _simple('max-width', [('max-width', value)])
+
+
+def _aspect(name, negative):
+    match = re.fullmatch(r'aspect-(.+)', name)
+    if match:
+        value = {'square': '1 / 1', 'video': '16 / 9', 'auto': 'auto'}.get(match.group(1))
+        value = value or arbitrary(match.group(1))
+        if value:
+            return _simple('aspect-ratio', [('aspect-ratio', value)])
+
+
+def _grid(name, negative):
+    match = re.fullmatch(r'grid-cols-(\d+)', name)
+    if match:
+        return _simple('grid-template-columns', [
+            ('grid-template-columns', f'repeat({match.group(1)}, minmax(0, 1fr))'),
+        ])
+    match = re.fullmatch(r'col-span-(\d+|full)', name)
+    if match:
+        span = match.group(1)
+        value = '1 / -1' if span == 'full' else f'span {span} / span {span}'
+        return _simple('grid-column', [('grid-column', value)])
+
+
+def _gap(name, negative):
+    match = re.fullmatch(r'gap(-[xy])?-(.+)', name)
+    if match and not negative:
+        prop = {None: 'gap', '-x': 'column-gap', '-y': 'row-gap'}[match.group(1)]
+        return _simple('gap', [(prop, spacing(match.group(2)))])
+
+
+def _space(name, negative):
+    if name in ('space-x-reverse', 'space-y-reverse'):
+        axis = name[6]
+        return Utility('space', [(SIBLINGS, [(f'--tw-space-{axis}-reverse', '1')])], None)
+    match = re.fullmatch(r'space-([xy])-(.+)', name)
+    if match:
+        axis, value = match.group(1), spacing(match.group(2), negative)
+        start, end = ('left', 'right') if axis == 'x' else ('top', 'bottom')
+        return Utility('space', [(SIBLINGS, [
+            (f'--tw-space-{axis}-reverse', '0'),
+            (f'margin-{end}', f'calc({value} * var(--tw-space-{axis}-reverse))'),
+            (f'margin-{start}', f'calc({value} * calc(1 - var(--tw-space-{axis}-reverse)))'),
+        ])], None)
+
+
+def _divide(name, negative):
+    if name in ('divide-x-reverse', 'divide-y-reverse'):
+        axis = name[7]
+        return Utility('divide-width', [(SIBLINGS, [(f'--tw-divide-{axis}-reverse', '1')])], None)
+    match = re.fullmatch(r'divide-([xy])(?:-(\d+))?', name)
+    if match:
+        axis, width = match.group(1), f'{match.group(2) or 1}px'
+        start, end = ('left', 'right') if axis == 'x' else ('top', 'bottom')
+        return Utility('divide-width', [(SIBLINGS, [
+            (f'--tw-divide-{axis}-reverse', '0'),
+            (f'border-{end}-width', f'calc({width} * var(--tw-divide-{axis}-reverse))'),
+            (f'border-{start}-width', f'calc({width} * calc(1 - var(--tw-divide-{axis}-reverse)))'),
+        ])], None)
+    match = re.fullmatch(r'divide-(.+)', name)
+    if match:
+        color = color_value(match.group(1))
+        if color:
+            return Utility('divide-color', [(SIBLINGS, [('border-color', color)])], None)
+
+
+def _transform(name, negative):
+    match = re.fullmatch(r'translate-([xy])-(.+)', name)
+    if match:
+        value = spacing(match.group(2), negative)
+        return _simple('transform-values', [
+            (f'--tw-translate-{match.group(1)}', value), ('transform', TRANSFORM),
+        ])
+    match = re.fullmatch(r'scale(?:-([xy]))?-(\d+)', name)
+    if match and not negative:
+        value = f'{int(match.group(2)) / 100:g}'
+        axes = [match.group(1)] if match.group(1) else ['x', 'y']
+        return _simple('transform-values', [
+            *((f'--tw-scale-{axis}', value) for axis in axes), ('transform', TRANSFORM),
+        ])
+    match = re.fullmatch(r'rotate-(\d+)', name)
+    if match:
+        value = ('-' if negative else '') + match.group(1) + 'deg'
+        return _simple('transform-values', [('--tw-rotate', value), ('transform', TRANSFORM)])
+
+
+def _animation(name, negative):
+    match = re.fullmatch(r'animate-(.+)', name)
+    if match and match.group(1) in ANIMATIONS:
+        value, keyframes = ANIMATIONS[match.group(1)]
+        return Utility('animation', [('', [('animation', value)])], keyframes)
+    if name == 'animate-none':
+        return _simple('animation', [('animation', 'none')])
+
+
+def _border(name, negative):
+    match = re.fullmatch(r'rounded(?:-(\w+))?', name)
+    if match and (match.group(1) or '') in RADII:
+        return _simple('border-radius', [('border-radius', RADII[match.group(1) or ''])])
+    match = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', name)
+    if match:
+        width = f'{match.group(2) or 1}px'
+        sides = SIDES[match.group(1) or '']
+        return _simple('border-width', [(f'border{side}-width', width) for side in sides])
+    match = re.fullmatch(r'border-(.+)', name)
+    if match:
+        color = color_value(match.group(1))
+        if color:
+            return _simple('border-color', [('border-color', color)])
+
+
+def _background(name, negative):
+    match = re.fullmatch(r'bg-gradient-to-(\w+)', name)
+    if match and match.group(1) in GRADIENT_DIRECTIONS:
+        direction = GRADIENT_DIRECTIONS[match.group(1)]
+        return _simple('background-image', [
+            ('background-image', f'linear-gradient({direction}, var(--tw-gradient-stops))'),
+        ])
+    match = re.fullmatch(r'bg-(.+)', name)
+    if match:
+        color = color_value(match.group(1))
+        if color:
+            return _simple('background-color', [('background-color', color)])
+
+
+def _gradient(name, negative):
+    match = re.fullmatch(r'(from|via|to)-(.+)', name)
+    if not match:
+        return None
+    stop, token = match.groups()
+    color = color_value(token)
+    if color is None:
+        return None
+    transparent = color_value(token.partition('/')[0], alpha=0) if token != 'transparent' else color
+    if stop == 'from':
+        declarations = [
+            ('--tw-gradient-from', f'{color} var(--tw-gradient-from-position)'),
+            ('--tw-gradient-to', f'{transparent} var(--tw-gradient-to-position)'),
+            ('--tw-gradient-stops', 'var(--tw-gradient-from), var(--tw-gradient-to)'),
+        ]
+    elif stop == 'via':
+        declarations = [
+            ('--tw-gradient-to', f'{transparent} var(--tw-gradient-to-position)'),
+            ('--tw-gradient-stops',
+             f'var(--tw-gradient-from), {color} var(--tw-gradient-via-position), var(--tw-gradient-to)'),
+        ]
+    else:
+        declarations = [('--tw-gradient-to', f'{color} var(--tw-gradient-to-position)')]
+    return _simple('gradient-stops', declarations)
+
+
+def _typography(name, negative):
+    if name.startswith('font-'):
+        key = name[5:]
+        if key in FONT_WEIGHTS:
+            return _simple('font-weight', [('font-weight', FONT_WEIGHTS[key])])
+        families = TAILWIND_CONFIG['theme']['extend']['fontFamily']
+        if key in families:
+            return _simple('font-family', [('font-family', ', '.join(families[key]))])
+    match = re.fullmatch(r'text-(.+)', name)
+    if match:
+        key = match.group(1)
+        if key in FONT_SIZES:
+            font_size, line_height = FONT_SIZES[key]
+            return _simple('font-size', [('font-size', font_size), ('line-height', line_height)])
+        value = arbitrary(key)
+        if value and re.fullmatch(r'[\d.]+(px|rem|em)', value):
+            return _simple('font-size', [('font-size', value)])
+        color = color_value(key)
+        if color:
+            return _simple('text-color', [('color', color)])
+    match = re.fullmatch(r'leading-(.+)', name)
+    if match:
+        value = LINE_HEIGHTS.get(match.group(1)) or arbitrary(match.group(1))
+        if value:
+            return _simple('line-height', [('line-height', value)])
+    match = re.fullmatch(r'tracking-(.+)', name)
+    if match and match.group(1) in LETTER_SPACINGS:
+        return _simple('letter-spacing', [('letter-spacing', LETTER_SPACINGS[match.group(1)])])
+
+
+def _effects(name, negative):
+    match = re.fullmatch(r'opacity-(\d+)', name)
+    if match:
+        return _simple('opacity', [('opacity', f'{int(match.group(1)) / 100:g}')])
+    match = re.fullmatch(r'shadow(?:-(\w+))?', name)
+    if match and (match.group(1) or '') in SHADOWS:
+        key = match.group(1) or ''
+        layers = SHADOWS[key]
+        alpha = SHADOW_ALPHA.get(key, '0.1')
+        shadow = ', '.join(layer.format(f'rgb(0 0 0 / {alpha})') for layer in layers)
+        colored = ', '.join(layer.format('var(--tw-shadow-color)') for layer in layers)
+        return _simple('box-shadow', [
+            ('--tw-shadow', shadow),
+            ('--tw-shadow-colored', colored),
+            ('box-shadow',
+             'var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)'),
+        ])
+    match = re.fullmatch(r'shadow-(.+)', name)
+    if match:
+        color = color_value(match.group(1))
+        if color:
+            return _simple('box-shadow-color', [
+                ('--tw-shadow-color', color), ('--tw-shadow', 'var(--tw-shadow-colored)'),
+            ])
+    match = re.fullmatch(r'ring-(.+)', name)
+    if match:
+        color = color_value(match.group(1))
+        if color:
+            return _simple('ring-color', [('--tw-ring-color', color)])
+    match = re.fullmatch(r'(backdrop-)?blur(?:-(\w+))?', name)
+    if match and (match.group(2) or '') in BLURS:
+        value = f'blur({BLURS[match.group(2) or ""]})'
+        if match.group(1):
+            return _simple('backdrop-blur', [
+                ('-webkit-backdrop-filter', value), ('backdrop-filter', value),
+            ])
+        return _simple('blur', [('--tw-blur', value), ('filter', 'var(--tw-blur)')])
+
+
+def _transition(name, negative):
+    match = re.fullmatch(r'transition(?:-(\w+))?', name)
+    if match and (match.group(1) or '') in TRANSITIONS:
+        return _simple('transition', [
+            ('transition-property', TRANSITIONS[match.group(1) or '']),
+            ('transition-timing-function', 'cubic-bezier(0.4, 0, 0.2, 1)'),
+            ('transition-duration', '150ms'),
+        ])
+    match = re.fullmatch(r'duration-(\d+)', name)
+    if match:
+        return _simple('duration', [('transition-duration', f'{match.group(1)}ms')])
+
+
+RESOLVERS = [
+    _inset, _z_index, _margin, _padding, _sizing, _max_width, _aspect, _grid, _gap,
+    _space, _divide, _transform, _animation, _border, _background, _gradient,
+    _typography, _effects, _transition,
+]
+
+
+# Class names and variants
+
+def escape(class_name):
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', class_name)
+
+
+def split_variants(class_name):
+    *variants, utility = class_name.split(':')
+    return variants, utility
+
+
+def selector_for(class_name, variants, suffix):
+    selector = '.' + escape(class_name)
+    if 'hover' in variants:
+        selector += ':hover'
+    if 'focus' in variants:
+        selector += ':focus'
+    if 'rtl' in variants:
+        selector += ':where([dir="rtl"], [dir="rtl"] *)'
+    if 'group-hover' in variants:
+        selector = '.group:hover ' + selector
+    if 'dark' in variants:
+        selector = '.dark ' + selector
+    return selector + suffix
+
+
+def _format(selector, declarations):
+    body = ';'.join(f'{prop}:{value}' for prop, value in declarations)
+    return f'{selector}{{{body}}}'
+
+
+def generate(class_names):
+    """
+    Render the stylesheet for ``class_names``.
+
+    Returns ``(css, unknown)`` where ``unknown`` lists the classes that are
+    not Tailwind utilities this generator knows about.
+    """
+    screens = dict(SCREENS)
+    screen_rank = {name: index + 1 for index, (name, _) in enumerate(SCREENS)}
+    entries = []
+    keyframes = []
+    unknown = []
+    for class_name in sorted(set(class_names)):
+        variants, utility = split_variants(class_name)
+        screen = [v for v in variants if v in screens]
+        states = [v for v in variants if v not in screens]
+        if len(screen) > 1 or any(v not in VARIANTS for v in states):
+            unknown.append(class_name)
+            continue
+        try:
+            resolved = resolve(utility)
+        except UnknownUtility:
+            unknown.append(class_name)
+            continue
+        variant_rank = sum(1 << VARIANTS.index(v) for v in states)
+        key = (
+            screen_rank[screen[0]] if screen else 0,
+            variant_rank,
+            PLUGIN_ORDER.index(resolved.plugin),
+            class_name,
+        )
+        rules = ''.join(
+            _format(selector_for(class_name, states, suffix), declarations)
+            for suffix, declarations in resolved.rules
+        )
+        entries.append((key, screen[0] if screen else None, rules))
+        if resolved.keyframes and resolved.keyframes not in keyframes:
+            keyframes.append(resolved.keyframes)
+
+    sans = ', '.join(TAILWIND_CONFIG['theme']['extend']['fontFamily']['sans'])
+    parts = [PREFLIGHT.strip().replace('{sans}', sans)]
+    parts.extend(keyframes)
+    current_screen = None
+    media = []
+    for key, screen, rules in sorted(entries):
+        if screen is None:
+            parts.append(rules)
+            continue
+        if screen != current_screen:
+            if media:
+                parts.append(f'@media (min-width:{screens[current_screen]}px){{{"".join(media)}}}')
+            current_screen, media = screen, []
+        media.append(rules)
+    if media:
+        parts.append(f'@media (min-width:{screens[current_screen]}px){{{"".join(media)}}}')
+    return '\n'.join(parts) + '\n', unknown
@@ -2,21 +2,28 @@
 Views for ACADEMIQ - All page views and form handling.
 """
 
-import os
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
 from django.utils.translation import gettext as _
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from .forms import ContactForm, OrderForm
-from .models import Testimonial, Service
+from . import catalog, metrics, submissions, throttle, warmup
+from .conditional import conditional_page
+from .page_cache import cache_public_page
+from .uploads import AttachmentUploadHandler
 
 
+@conditional_page
+@cache_public_page
 def home(request):
     """Home page view with testimonials and services."""
-    testimonials = Testimonial.objects.filter(is_active=True)[:6]
-    services_list = Service.objects.filter(is_active=True)[:6]
+    testimonials = catalog.active_testimonials()[:6]
+    services_list = catalog.active_services()[:6]
 
     context = {
         'testimonials': testimonials,
@@ -25,45 +32,35 @@ def home(request):
     return render(request, 'home.html', context)
 
 
+@conditional_page
+@cache_public_page
 def about(request):
     """About Us page view."""
     return render(request, 'about.html')
 
 
+@conditional_page
+@cache_public_page
 def services(request):
     """Services page view."""
-    all_services = Service.objects.filter(is_active=True)
+    all_services = catalog.active_services()
     context = {
         'services': all_services,
     }
     return render(request, 'services.html', context)
 
 
+@throttle.throttle('contact')
 def contact(request):
     """Contact page view with form handling."""
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            contact_message = form.save()
-
-            # Send email notification
+            throttle.check_submission('contact', form.cleaned_data['email'], form.cleaned_data['service_type'])
             try:
-                send_mail(
-                    subject=f'New Contact Message: {contact_message.subject}',
-                    message=(
-                        f'New contact message received:\n\n'
-                        f'Name: {contact_message.full_name}\n'
-                        f'Email: {contact_message.email}\n'
-                        f'Phone: {contact_message.phone or "Not provided"}\n'
-                        f'Service Type: {contact_message.get_service_type_display()}\n\n'
-                        f'Message:\n{contact_message.message}'
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[settings.ADMIN_EMAIL],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+                submissions.submit(form.save(commit=False))
+            except submissions.SubmissionFailed:
+                return _submission_failed(request, 'contact.html', form)
 
             messages.success(request, _('Thank you! Your message has been sent successfully. We will get back to you soon.'))
             return redirect('contact_success')
@@ -76,49 +73,32 @@ def contact(request):
     return render(request, 'contact.html', context)
 
 
-ALLOWED_UPLOAD_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.zip', '.rar'}
-MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50 MB
-
-
+@throttle.throttle('order')
+@csrf_exempt
 def order(request):
-    """Order page view with form handling and file validation."""
+    """
+    Order page view. The screening upload handler has to be installed before
+    anything reads the body, which CsrfViewMiddleware would otherwise do, so
+    CSRF is checked inside ``_order`` instead.
+    """
+    upload_handler = None
     if request.method == 'POST':
-        form = OrderForm(request.POST, request.FILES)
-        if form.is_valid():
-            # Validate the uploaded file before saving
-            attachment = request.FILES.get('attachment')
-            if attachment:
-                ext = os.path.splitext(attachment.name)[1].lower()
-                if ext not in ALLOWED_UPLOAD_EXTENSIONS:
-                    form.add_error('attachment', _('Invalid file type. Allowed: PDF, DOC, DOCX, TXT, ZIP, RAR.'))
-                elif attachment.size > MAX_UPLOAD_SIZE:
-                    form.add_error('attachment', _('File size exceeds the 50 MB limit.'))
-
-            if form.errors:
-                return render(request, 'order.html', {'form': form})
+        upload_handler = AttachmentUploadHandler.install(request)
+    return _order(request, upload_handler)
 
-            order_request = form.save()
 
-            # Send email notification
+@csrf_protect
+def _order(request, upload_handler):
+    """Order form handling; the attachment was screened while it streamed in."""
+    if request.method == 'POST':
+        form = OrderForm(request.POST, request.FILES, upload_handler=upload_handler)
+        if form.is_valid():
+            throttle.check_submission('order', form.cleaned_data['email'], form.cleaned_data['service_type'])
+            upload_handler.annotate(request.FILES)
             try:
-                send_mail(
-                    subject=f'New Order Request #{order_request.order_number}',
-                    message=(
-                        f'New order received:\n\n'
-                        f'Order Number: {order_request.order_number}\n'
-                        f'Name: {order_request.full_name}\n'
-                        f'Email: {order_request.email}\n'
-                        f'Phone: {order_request.phone}\n'
-                        f'Service: {order_request.get_service_type_display()}\n\n'
-                        f'Project Details:\n{order_request.message}\n\n'
-                        f'Attachment: {"Yes" if order_request.attachment else "No"}'
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[settings.ADMIN_EMAIL],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+                submissions.submit(form.save(commit=False))
+            except submissions.SubmissionFailed:
+                return _submission_failed(request, 'order.html', form)
 
             messages.success(request, _('Thank you! Your order has been submitted successfully. We will contact you shortly.'))
             return redirect('order_success')
@@ -131,6 +111,16 @@ def order(request):
     return render(request, 'order.html', context)
 
 
+def _submission_failed(request, template_name, form):
+    """Show the form again, filled in, with a 503 asking the user to resubmit."""
+    messages.error(request, _('We could not save your submission just now. Please try again in a minute.'))
+    response = render(request, template_name, {'form': form}, status=503)
+    response['Retry-After'] = str(submissions.RETRY_AFTER)
+    return response
+
+
+@conditional_page
+@cache_public_page
 def privacy_policy(request):
     """Privacy Policy page view."""
     return render(request, 'privacy.html')
@@ -149,6 +139,30 @@ def order_success(request):
     return render(request, 'success.html', context)
 
 
+def readiness(request):
+    """200 once this worker has finished warming up (``core.warmup``), 503 before."""
+    if warmup.is_ready():
+        return HttpResponse('ready', content_type='text/plain')
+    return HttpResponse('warming up', content_type='text/plain', status=503)
+
+
+@never_cache
+def metrics_view(request):
+    """
+    Prometheus metrics of every worker (``core.metrics``). With
+    ``METRICS_TOKEN`` set, scrapers must send it as a bearer token.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        token = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+        if not constant_time_compare(token, settings.METRICS_TOKEN):
+            response = HttpResponse('unauthorized', content_type='text/plain', status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def custom_404(request, exception=None):
     """Custom 404 error handler."""
     return render(request, '404.html', status=404)
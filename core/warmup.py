@@ -0,0 +1,110 @@
+"""
+Worker warm-up, run from ``academiq/wsgi.py`` and ``academiq/asgi.py``.
+
+Without it the first requests after a restart pay for compiling the
+templates, loading the ``en``/``ar`` message catalogs, populating the
+URL resolvers of every language and opening the database. ``warm_up()``
+does all of that at boot instead, then calls ``gc.freeze()``: the objects
+built so far are moved out of the garbage collector's reach, so a
+pre-forking server (``gunicorn --preload``) does not copy their memory
+pages into every worker the first time the collector walks them.
+
+The database connection is opened, tuned and used to load the catalog
+snapshot, then closed again: a SQLite connection must not be inherited by
+forked workers, and each worker reconnects on its first query.
+
+``is_ready()`` turns true once the warm-up has finished; ``/ready/``
+reports it to the load balancer.
+"""
+
+import gc
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import resolve, reverse
+from django.utils import translation
+
+from . import catalog, language_urls
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def compile_templates():
+    """Compile every project template into the cached template loader."""
+    count = 0
+    for engine in settings.TEMPLATES:
+        for directory in engine.get('DIRS', []):
+            for path in sorted(Path(directory).rglob('*.html')):
+                get_template(path.relative_to(directory).as_posix())
+                count += 1
+    return count
+
+
+def load_languages():
+    """Load the message catalog of every language."""
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext('Home')
+    return len(settings.LANGUAGES)
+
+
+def resolve_urls():
+    """Populate the URL resolvers of every language and the language-switch map."""
+    routes = language_urls.route_map()
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            for path, versions in routes.items():
+                if versions[code] == path:
+                    resolve(path)
+            reverse('admin:index')
+    return len(routes)
+
+
+def open_database():
+    """Connect and tune each database, load the catalog, then disconnect before any fork."""
+    for alias in settings.DATABASES:
+        connections[alias].ensure_connection()
+    catalog.get_catalog()
+    connections.close_all()
+    return len(settings.DATABASES)
+
+
+STEPS = [
+    ('templates', compile_templates),
+    ('languages', load_languages),
+    ('urls', resolve_urls),
+    ('databases', open_database),
+]
+
+
+def warm_up():
+    """Run every warm-up step, freeze the heap and mark the process ready."""
+    if settings.WARMUP_ENABLED:
+        started = time.perf_counter()
+        done = []
+        for name, step in STEPS:
+            step_started = time.perf_counter()
+            try:
+                count = step()
+            except Exception:
+                # A cold start is slower, not broken; serve anyway.
+                logger.exception('Warm-up step %r failed', name)
+                continue
+            done.append(f'{count} {name} in {(time.perf_counter() - step_started) * 1000:.0f} ms')
+        gc.freeze()
+        logger.info(
+            'Warm-up finished in %.0f ms: %s; %d objects frozen',
+            (time.perf_counter() - started) * 1000, ', '.join(done), gc.get_freeze_count(),
+        )
+    _ready.set()
@@ -0,0 +1,153 @@
+"""
+Optional single-writer queue for form submissions.
+
+SQLite allows one writer at a time. Instead of every web worker competing
+for the write lock, ``manage.py run_write_queue`` owns a Unix socket; the
+workers send their submissions to it (``submit()``) and wait for the
+reply. One writer thread collects whatever arrives within
+``WRITE_QUEUE_MAX_WAIT`` seconds, up to ``WRITE_QUEUE_BATCH_SIZE``
+submissions, and saves the batch in a single short transaction, with a
+savepoint per submission so one bad row does not fail the others. A
+worker only answers the user after the batch has committed.
+
+A submission still queued half of ``WRITE_QUEUE_TIMEOUT`` after it arrived
+is dropped with an error reply rather than written: its worker may have
+stopped waiting by the time the batch commits, and treats any
+``WriteQueueError`` as "not saved", so the user can submit again without
+creating a duplicate.
+"""
+
+import json
+import logging
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+from django.conf import settings
+from django.core import serializers
+from django.db import DatabaseError, close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueError(Exception):
+    pass
+
+
+class WriteQueueUnavailable(WriteQueueError):
+    """The writer could not be reached; nothing was sent."""
+
+
+def submit(instance, path=None, timeout=None):
+    """Have the writer save ``instance``; returns its new primary key."""
+    payload = serializers.serialize('json', [instance]).encode('utf-8')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout or settings.WRITE_QUEUE_TIMEOUT)
+    with sock:
+        try:
+            sock.connect(str(path or settings.WRITE_QUEUE_SOCKET))
+        except OSError as exc:
+            # Not running, or too busy to accept (timeout, EAGAIN on a full backlog).
+            raise WriteQueueUnavailable(exc)
+        try:
+            sock.sendall(payload + b'\n')
+            reply = sock.makefile('rb').readline()
+        except OSError as exc:
+            raise WriteQueueError(f'No reply from the write queue: {exc}')
+    if not reply:
+        raise WriteQueueError('The write queue closed the connection')
+    try:
+        result = json.loads(reply)
+    except ValueError as exc:
+        raise WriteQueueError(f'Unreadable reply from the write queue: {exc}')
+    if 'error' in result:
+        raise WriteQueueError(result['error'])
+    return result['pk']
+
+
+class PendingWrite:
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.expires = time.monotonic() + settings.WRITE_QUEUE_TIMEOUT / 2
+        self.result = None
+        self.done = threading.Event()
+
+
+class WriteQueueHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        payload = self.rfile.readline()
+        if not payload:
+            return
+        pending = PendingWrite(payload)
+        self.server.pending.put(pending)
+        pending.done.wait()
+        self.wfile.write(json.dumps(pending.result).encode('utf-8') + b'\n')
+
+
+class WriteQueueServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Accepts submissions on ``path`` (one thread per connection) and saves
+    each with ``save(instance)`` from a single writer thread, inside the
+    batch transaction. Call ``serve_forever()``.
+    """
+
+    daemon_threads = True
+    # Every web worker may connect at once; the default backlog of 5 refuses them.
+    request_queue_size = 1024
+
+    def __init__(self, path, save, batch_size=None, max_wait=None):
+        self.save = save
+        self.pending = queue.Queue()
+        self.batch_size = batch_size or settings.WRITE_QUEUE_BATCH_SIZE
+        self.max_wait = settings.WRITE_QUEUE_MAX_WAIT if max_wait is None else max_wait
+        self.batches = self.written = 0
+        super().__init__(str(path), WriteQueueHandler)
+        self.writer = threading.Thread(target=self.write_batches, name='write-queue', daemon=True)
+
+    def serve_forever(self, poll_interval=0.5):
+        self.writer.start()
+        super().serve_forever(poll_interval)
+
+    def write_batches(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            self.write(batch)
+
+    def write(self, batch):
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                for pending in batch:
+                    if time.monotonic() > pending.expires:
+                        logger.warning('Write queue dropped a submission that waited too long')
+                        pending.result = {'error': 'Expired before it was written'}
+                        continue
+                    try:
+                        with transaction.atomic():
+                            instance = next(serializers.deserialize('json', pending.payload)).object
+                            self.save(instance)
+                        pending.result = {'pk': instance.pk}
+                    except Exception as exc:
+                        logger.exception('Write queue could not save a submission')
+                        pending.result = {'error': f'{type(exc).__name__}: {exc}'}
+        except DatabaseError as exc:
+            logger.exception('Write queue batch of %d failed to commit', len(batch))
+            for pending in batch:
+                pending.result = {'error': f'{type(exc).__name__}: {exc}'}
+        else:
+            self.batches += 1
+            self.written += sum('pk' in pending.result for pending in batch)
+        finally:
+            for pending in batch:
+                pending.done.set()
@@ -4,24 +4,52 @@ Django Template Prettifier
 IMPORTANT: This script is SAFE for Django templates.
 It fixes split template tags WITHOUT breaking them.
 
-Usage: python prettify.py [file_path]
-If no file_path is given, it processes all HTML files in templates/
+Usage: python prettify.py [--check] [--jobs N] [--no-cache] [path ...]
+Each path is a template file or a directory searched recursively for .html
+files. If no path is given, it processes templates/ and every app's
+templates/ directory.
+
+--check    Write nothing; print a diff of what would change and exit 1 if
+           any file needs fixing (for CI and pre-commit hooks).
+--jobs N   Worker processes (default: one per CPU; small runs stay in
+           this process).
+--no-cache Ignore the cache of files already known to be clean.
+
+Files that were clean last time are remembered in .prettify-cache (by
+size, mtime and content hash) and skipped while they stay unchanged.
 """
 
+import argparse
+import difflib
+import hashlib
+import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, '.prettify-cache')
+# Bump when fix_django_tags() changes, so every file is looked at again.
+CACHE_VERSION = 1
+SKIP_DIRS = {'.git', 'node_modules', 'venv', '.venv', 'staticfiles', '__pycache__'}
+# Below this many files a process pool costs more than it saves.
+MIN_PARALLEL_FILES = 64
+
+BLOCK_TAG_RE = re.compile(r'\{%.*?%\}', re.DOTALL)
+VARIABLE_TAG_RE = re.compile(r'\{\{.*?\}\}', re.DOTALL)
 
 
 def fix_django_tags(content):
     """
     Fix Django template tags that have been split across multiple lines.
     This is the ONLY safe formatting operation for Django templates.
-    
+
     Examples of what this fixes:
         {% trans "Hello
             World" %}  ->  {% trans "Hello World" %}
-        
+
         {% url 'home'
             %}  ->  {% url 'home' %}
     """
@@ -39,46 +67,167 @@ def fix_django_tags(content):
         return tag
 
     # Match {% ... %} and {{ ... }} across multiple lines (non-greedy)
-    content = re.sub(r'\{%.*?%\}', normalize_tag, content, flags=re.DOTALL)
-    content = re.sub(r'\{\{.*?\}\}', normalize_tag, content, flags=re.DOTALL)
-    
+    content = BLOCK_TAG_RE.sub(normalize_tag, content)
+    content = VARIABLE_TAG_RE.sub(normalize_tag, content)
+
     return content
 
 
-def prettify_template(file_path):
-    """Process a single template file."""
-    if not os.path.exists(file_path):
-        print(f"  File not found: {file_path}")
+def template_dirs(root=BASE_DIR):
+    """templates/ and every app's templates/ directory under ``root``."""
+    for dirpath, dirnames, _filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+        if os.path.basename(dirpath) == 'templates':
+            dirnames[:] = []
+            yield dirpath
+
+
+def find_templates(paths):
+    """Every .html file named in or found (recursively) under ``paths``."""
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+                for fname in sorted(filenames):
+                    if fname.endswith('.html'):
+                        yield os.path.join(dirpath, fname)
+        else:
+            yield path
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('files', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(files):
+    try:
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': files}, f, indent=0, sort_keys=True)
+    except OSError as exc:
+        print(f"  Could not write {CACHE_FILE}: {exc}")
+
+
+def is_cached(entry, stat, content=None):
+    """True if the file is still the clean one in ``entry`` ([size, mtime_ns, sha256])."""
+    if not entry:
         return False
-    
+    size, mtime_ns, digest = entry
+    if content is None:
+        return size == stat.st_size and mtime_ns == stat.st_mtime_ns
+    return hashlib.sha256(content.encode('utf-8')).hexdigest() == digest
+
+
+def prettify_template(file_path, check=False, cache_entry=None):
+    """
+    Process a single template file. Returns ``(status, detail, cache_entry,
+    milliseconds)``; status is FIXED, OK, CACHED or MISSING, detail is the
+    diff in check mode and cache_entry is set when the file is clean.
+    """
+    started = time.perf_counter()
+
+    def result(status, detail='', entry=None):
+        return status, detail, entry, (time.perf_counter() - started) * 1000
+
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return result('MISSING')
+    if is_cached(cache_entry, stat):
+        return result('CACHED', entry=cache_entry)
+
     with open(file_path, 'r', encoding='utf-8') as f:
         original = f.read()
-    
+    entry = [stat.st_size, stat.st_mtime_ns, hashlib.sha256(original.encode('utf-8')).hexdigest()]
+    # Touched but unchanged (a checkout, a save without edits).
+    if is_cached(cache_entry, stat, original):
+        return result('CACHED', entry=entry)
+
     fixed = fix_django_tags(original)
-    
-    if fixed != original:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(fixed)
-        print(f"  FIXED: {file_path}")
-        return True
-    else:
-        print(f"  OK: {file_path} (no changes needed)")
-        return False
 
+    if fixed == original:
+        return result('OK', entry=entry)
+    if check:
+        diff = ''.join(difflib.unified_diff(
+            original.splitlines(keepends=True), fixed.splitlines(keepends=True),
+            fromfile=file_path, tofile=f'{file_path} (fixed)',
+        ))
+        return result('FIXED', diff)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(fixed)
+    stat = os.stat(file_path)
+    return result('FIXED', entry=[stat.st_size, stat.st_mtime_ns, hashlib.sha256(fixed.encode('utf-8')).hexdigest()])
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        # Process specific file
-        prettify_template(sys.argv[1])
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+def _prettify_one(args):
+    return prettify_template(*args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fix Django template tags split across lines.')
+    parser.add_argument('paths', nargs='*', help='Template files or directories (default: all template dirs)')
+    parser.add_argument('--check', action='store_true', help='Print a diff and exit 1 instead of writing')
+    parser.add_argument('--jobs', type=int, default=available_cpus(), help='Worker processes')
+    parser.add_argument('--no-cache', action='store_true', help='Look at every file again')
+    args = parser.parse_args(argv)
+
+    paths = args.paths or list(template_dirs())
+    if not paths:
+        print(f"Templates directory not found under {BASE_DIR}")
+        return 1
+    files = list(dict.fromkeys(os.path.abspath(path) for path in find_templates(paths)))
+    cache = {} if args.no_cache else load_cache()
+    tasks = [(path, args.check, cache.get(os.path.relpath(path, BASE_DIR))) for path in files]
+
+    started = time.perf_counter()
+    if args.jobs > 1 and len(tasks) >= MIN_PARALLEL_FILES:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_prettify_one, tasks, chunksize=max(1, len(tasks) // (args.jobs * 4))))
     else:
-        # Process all HTML files in templates/
-        templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-        if os.path.isdir(templates_dir):
-            count = 0
-            for fname in sorted(os.listdir(templates_dir)):
-                if fname.endswith('.html'):
-                    if prettify_template(os.path.join(templates_dir, fname)):
-                        count += 1
-            print(f"\nDone. Fixed {count} file(s).")
+        results = [_prettify_one(task) for task in tasks]
+    elapsed = (time.perf_counter() - started) * 1000
+
+    counts = {}
+    for path, (status, detail, entry, ms) in zip(files, results):
+        counts[status] = counts.get(status, 0) + 1
+        name = os.path.relpath(path, BASE_DIR)
+        if entry:
+            cache[name] = entry
         else:
-            print(f"Templates directory not found: {templates_dir}")
+            cache.pop(name, None)
+        if status == 'MISSING':
+            print(f"  File not found: {name}")
+        elif status == 'FIXED':
+            print(f"  {'WOULD FIX' if args.check else 'FIXED'}: {name} ({ms:.1f} ms)")
+            if detail:
+                sys.stdout.write(detail)
+        elif status == 'OK':
+            print(f"  OK: {name} (no changes needed, {ms:.1f} ms)")
+        else:
+            print(f"  OK: {name} (unchanged since last run, {ms:.1f} ms)")
+    if not args.no_cache:
+        save_cache({name: entry for name, entry in cache.items() if os.path.exists(os.path.join(BASE_DIR, name))})
+
+    fixed = counts.get('FIXED', 0)
+    print(
+        f"\nDone in {elapsed:.0f} ms. {'Would fix' if args.check else 'Fixed'} {fixed} file(s); "
+        f"{counts.get('CACHED', 0)} of {len(files)} skipped as unchanged."
+    )
+    if counts.get('MISSING'):
+        return 1
+    return 1 if args.check and fixed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())